@@ -0,0 +1,72 @@
+"""
+Benchmark of bulk execution under different loads
+
+Feeds tasks with random (Poisson) arrivals into an ``AsyncBulkCall`` whose
+command takes a fixed overhead plus a small time per task, similar to calling
+``condor_q`` or ``squeue`` via SSH. Compares static bulk settings to adaptive
+bulk settings at low and at high load.
+
+Usage: python benchmarks/bulk_call.py [number of tasks]
+
+Reports the mean and maximum latency of tasks and the number of commands
+executed for each load and setting.
+"""
+
+from tardis.utilities.asyncbulkcall import AsyncBulkCall
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+COMMAND_OVERHEAD = 0.05
+TASK_OVERHEAD = 0.0001
+
+
+class SimulatedCommand:
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self, *tasks):
+        self.calls += 1
+        await asyncio.sleep(COMMAND_OVERHEAD + TASK_OVERHEAD * len(tasks))
+        return tasks
+
+
+async def task_latency(execution, task) -> float:
+    start = time.perf_counter()
+    await execution(task)
+    return time.perf_counter() - start
+
+
+async def run_load(execution, count: int, rate: float):
+    random.seed(count)
+    tasks = []
+    for task in range(count):
+        tasks.append(asyncio.ensure_future(task_latency(execution, task)))
+        await asyncio.sleep(random.expovariate(rate))
+    return await asyncio.gather(*tasks)
+
+
+def main(count=500):
+    settings = {
+        "static": dict(size=100, delay=1.0),
+        "adaptive": dict(size=1000, delay=1.0, min_delay=0.01),
+    }
+    print(f"{count} tasks per load, command overhead {COMMAND_OVERHEAD}s")
+    for rate in (20, 2000):
+        for setting, parameters in settings.items():
+            command = SimulatedCommand()
+            execution = AsyncBulkCall(command, **parameters)
+            latencies = asyncio.run(run_load(execution, count, rate))
+            print(
+                f"  {rate:>5} tasks/s {setting:<9}"
+                f" mean {statistics.mean(latencies) * 1000:>7.1f} ms"
+                f" max {max(latencies) * 1000:>7.1f} ms"
+                f" {command.calls:>4} commands"
+            )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
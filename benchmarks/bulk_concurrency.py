@@ -0,0 +1,88 @@
+"""
+Benchmark of bulk execution with a saturated concurrency limit
+
+Feeds tasks with random (Poisson) arrivals into an ``AsyncBulkCall`` whose
+command queries a simulated shared scheduler, similar to calling ``condor_q``
+against a shared schedd. The scheduler handles one query at a time, so
+concurrent queries queue up at the scheduler and each one takes longer.
+Compares unlimited concurrency to several concurrency limits at a load that
+keeps all permitted commands busy.
+
+Usage: python benchmarks/bulk_concurrency.py [number of tasks] [tasks per second]
+
+Reports the throughput and the mean and maximum latency of tasks, the number
+of commands executed and the peak number of commands running at once for each
+concurrency limit.
+"""
+
+from tardis.utilities.asyncbulkcall import AsyncBulkCall
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+
+COMMAND_OVERHEAD = 0.02
+TASK_OVERHEAD = 0.0001
+
+
+class SharedScheduler:
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.peak = 0
+        self._lock = asyncio.Lock()
+
+    async def __call__(self, *tasks):
+        self.calls += 1
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            async with self._lock:
+                await asyncio.sleep(COMMAND_OVERHEAD + TASK_OVERHEAD * len(tasks))
+        finally:
+            self.active -= 1
+        return tasks
+
+
+async def task_latency(execution, task) -> float:
+    start = time.perf_counter()
+    await execution(task)
+    return time.perf_counter() - start
+
+
+async def run_load(execution, count: int, rate: float):
+    random.seed(count)
+    tasks = []
+    for task in range(count):
+        tasks.append(asyncio.ensure_future(task_latency(execution, task)))
+        await asyncio.sleep(random.expovariate(rate))
+    return await asyncio.gather(*tasks)
+
+
+def main(count=2000, rate=2000):
+    print(
+        f"{count} tasks at {rate} tasks/s, command overhead {COMMAND_OVERHEAD}s"
+        " on a scheduler serving one command at a time"
+    )
+    for concurrent in (None, 1, 2, 4, 8):
+        scheduler = SharedScheduler()
+        execution = AsyncBulkCall(
+            scheduler, size=100, delay=0.01, concurrent=concurrent
+        )
+        start = time.perf_counter()
+        latencies = asyncio.run(run_load(execution, count, rate))
+        duration = time.perf_counter() - start
+        print(
+            f"  concurrent {str(concurrent):>4}"
+            f" {count / duration:>7.0f} tasks/s"
+            f" mean {statistics.mean(latencies) * 1000:>7.1f} ms"
+            f" max {max(latencies) * 1000:>7.1f} ms"
+            f" {scheduler.calls:>4} commands"
+            f" {scheduler.peak:>3} at once"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,85 @@
+"""
+Memory benchmark of the bookkeeping of drones
+
+Compares the bytes per drone for storing the resource attributes of drones
+as an ``AttributeDict`` (before) and as ``DroneAttributes`` (after).
+
+Usage: python benchmarks/drone_memory.py [number of drones]
+"""
+
+from tardis.interfaces.siteadapter import ResourceStatus
+from tardis.resources.drone import Drone
+from tardis.utilities.attributedict import AttributeDict
+
+import gc
+import sys
+import tracemalloc
+
+
+class BenchmarkSiteAgent:
+    site_name = "BenchmarkSite"
+    machine_type = "m1.benchmark"
+    machine_meta_data = {"Cores": 8, "Memory": 16, "Disk": 160}
+
+    @staticmethod
+    def drone_uuid(uuid):
+        return f"benchmarksite-{uuid}"
+
+
+class BenchmarkBatchSystemAgent:
+    machine_meta_data_translation_mapping = {
+        "Cores": 1,
+        "Memory": 1024,
+        "Disk": 1024 * 1024,
+    }
+
+
+def create_drones(count, attribute_type=None):
+    site_agent, batch_system_agent = BenchmarkSiteAgent(), BenchmarkBatchSystemAgent()
+    drones = []
+    for index in range(count):
+        drone = Drone(site_agent=site_agent, batch_system_agent=batch_system_agent)
+        drone.resource_attributes.update(
+            remote_resource_uuid=str(index), resource_status=ResourceStatus.Running
+        )
+        if attribute_type is not None:
+            drone.resource_attributes = attribute_type(drone.resource_attributes)
+        drones.append(drone)
+    return drones
+
+
+def bytes_per_drone(count, attribute_type=None):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        drones = create_drones(count, attribute_type)
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    attributes = sum(attributes_size(drone.resource_attributes) for drone in drones)
+    return used / count, attributes / count
+
+
+def attributes_size(resource_attributes):
+    """Size of the resource attributes container, excluding the values"""
+    extra = getattr(resource_attributes, "_extra", None)
+    return sys.getsizeof(resource_attributes) + (
+        0 if extra is None else sys.getsizeof(extra)
+    )
+
+
+def main(count=10000):
+    before, before_attributes = bytes_per_drone(count, AttributeDict)
+    after, after_attributes = bytes_per_drone(count)
+    print(f"{count} drones")
+    print(
+        f"  before: {before:.0f} bytes per drone ({before_attributes:.0f} attributes)"
+    )
+    print(f"  after:  {after:.0f} bytes per drone ({after_attributes:.0f} attributes)")
+    print(f"  saved:  {before - after:.0f} bytes per drone")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
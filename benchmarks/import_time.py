@@ -0,0 +1,105 @@
+"""
+Import-time benchmark of tardis cold starts
+
+Measures the time the COBalD daemon and the REST service of a minimal
+deployment spend importing tardis on startup, each in a fresh interpreter.
+The daemon loads all YAML constructors and configuration sections tardis
+registers as entry points in ``setup.py``, plus the pool factory and the
+adapters of an HTCondor batch system with a single Slurm site. The REST
+service loads its app after the configuration of the SqliteRegistry.
+
+Usage: python benchmarks/import_time.py [repeat]
+
+Reports the best time out of several repetitions and which heavy optional
+packages were imported.
+"""
+
+import ast
+import os
+import subprocess
+import sys
+
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_PACKAGES = (
+    "asyncssh",
+    "pyotp",
+    "kubernetes_asyncio",
+    "elasticsearch",
+    "fastapi",
+    "uvicorn",
+)
+
+MINIMAL_DEPLOYMENT = """
+import tardis.resources.poolfactory
+import tardis.adapters.batchsystems.htcondor
+import tardis.adapters.sites.slurm
+import tardis.utilities.executors.shellexecutor
+"""
+
+REST_SERVICE = """
+import os, tempfile
+from tardis.configuration.configuration import Configuration
+db_file = os.path.join(tempfile.mkdtemp(), "drone_registry.db")
+Configuration({"Plugins": {"SqliteRegistry": {"db_file": db_file}}, "Sites": []})
+import tardis.rest.app.main
+"""
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+exec(sys.argv[2])
+duration = time.perf_counter() - start
+heavy = [package for package in sys.argv[1].split(",") if package in sys.modules]
+print(duration, ",".join(heavy) or "-")
+"""
+
+
+def load_entry_points(*groups) -> str:
+    """Code loading the entry points of ``groups`` in ``setup.py`` like COBalD"""
+    with open(os.path.join(REPOSITORY, "setup.py")) as setup_py:
+        tree = ast.parse(setup_py.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.keyword) and node.arg == "entry_points":
+            declared = ast.literal_eval(node.value)
+            break
+    else:
+        raise RuntimeError("no entry_points found in setup.py")
+    code = ["import importlib"]
+    for group in groups:
+        for entry_point in declared.get(group, ()):
+            module, _, name = entry_point.partition("=")[2].strip().partition(":")
+            code.append(f"getattr(importlib.import_module({module!r}), {name!r})")
+    return "\n".join(code)
+
+
+def import_time(code: str, repeat: int):
+    results = []
+    for _ in range(repeat):
+        duration, heavy = subprocess.run(
+            [sys.executable, "-c", PROBE, ",".join(HEAVY_PACKAGES), code],
+            cwd=REPOSITORY,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        results.append((float(duration), heavy))
+    return min(results)
+
+
+def main(repeat=5):
+    scenarios = {
+        "daemon": load_entry_points(
+            "cobald.config.yaml_constructors", "cobald.config.sections"
+        )
+        + MINIMAL_DEPLOYMENT,
+        "rest service": REST_SERVICE,
+    }
+    print(f"import time of a minimal deployment, best of {repeat}")
+    for scenario, code in scenarios.items():
+        duration, heavy = import_time(code, repeat)
+        print(f"  {scenario:<14} {duration * 1000:>8.1f} ms  imports: {heavy}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,84 @@
+"""
+Micro-benchmark of the drone state machine
+
+Measures how many state transitions a single core evaluates per second, by
+running the processing pipeline of drone states against agents that answer
+immediately.
+
+Usage: python benchmarks/state_transitions.py [number of transitions] [repeat]
+
+Reports the best rate out of several repetitions.
+"""
+
+from tardis.interfaces.batchsystemadapter import MachineStatus
+from tardis.interfaces.siteadapter import ResourceStatus
+from tardis.resources.dronestates import AvailableState
+from tardis.resources.dronestates import DrainingState
+from tardis.resources.dronestates import IntegratingState
+from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.droneattributes import DroneAttributes
+
+from datetime import datetime
+import asyncio
+import sys
+import time
+
+
+class BenchmarkSiteAgent:
+    def __init__(self, resource_status):
+        self._resource_status = AttributeDict(resource_status=resource_status)
+
+    async def resource_status(self, resource_attributes):
+        return self._resource_status
+
+
+class BenchmarkBatchSystemAgent:
+    def __init__(self, machine_status):
+        self._machine_status = machine_status
+
+    async def get_machine_status(self, drone_uuid):
+        return self._machine_status
+
+
+class BenchmarkDrone:
+    demand = 8.0
+    minimum_lifetime = None
+
+    def __init__(self, resource_status, machine_status):
+        self.site_agent = BenchmarkSiteAgent(resource_status)
+        self.batch_system_agent = BenchmarkBatchSystemAgent(machine_status)
+        self.resource_attributes = DroneAttributes(
+            drone_uuid="benchmark-0123456789", updated=datetime.now()
+        )
+        self._supply = 8.0
+
+    @staticmethod
+    def drain_requested():
+        return False
+
+
+async def transitions(state, drone, count):
+    run_processing_pipeline = state.run_processing_pipeline
+    start = time.perf_counter()
+    for _ in range(count):
+        await run_processing_pipeline(drone)
+    return count / (time.perf_counter() - start)
+
+
+def main(count=100000, repeat=5):
+    print(f"{count} transitions per state, best of {repeat}")
+    for state, resource_status, machine_status in (
+        (IntegratingState, ResourceStatus.Running, MachineStatus.Available),
+        (AvailableState, ResourceStatus.Running, MachineStatus.Available),
+        (DrainingState, ResourceStatus.Booting, MachineStatus.Draining),
+    ):
+        drone = BenchmarkDrone(resource_status, machine_status)
+        rate = max(asyncio.run(transitions(state, drone, count)) for _ in range(repeat))
+        print(
+            f"  {state.__name__:<16} {resource_status.name:<8}"
+            f" {machine_status.name:<12} {rate:>10.0f} transitions/s"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -63,13 +63,13 @@ setup(
             "hash_credentials = tardis.rest.hash_credentials.__main__:hash_credentials_cli",  # noqa: B950
         ],
         "cobald.config.yaml_constructors": [
-            "TardisPoolFactory = tardis.resources.poolfactory:create_composite_pool",
-            "TardisPeriodicValue = tardis.utilities.simulators.periodicvalue:PeriodicValue",  # noqa: B950
-            "TardisRandomGauss = tardis.utilities.simulators.randomgauss:RandomGauss",
-            "TardisRestApi = tardis.rest.service:RestService",
-            "TardisDupingSSHExecutor = tardis.utilities.executors.sshexecutor:DupingSSHExecutor",  # noqa: B950
-            "TardisSSHExecutor = tardis.utilities.executors.sshexecutor:SSHExecutor",
-            "TardisShellExecutor = tardis.utilities.executors.shellexecutor:ShellExecutor",  # noqa: B950
+            "TardisPoolFactory = tardis.configuration.factories:TardisPoolFactory",
+            "TardisPeriodicValue = tardis.configuration.factories:TardisPeriodicValue",  # noqa: B950
+            "TardisRandomGauss = tardis.configuration.factories:TardisRandomGauss",
+            "TardisRestApi = tardis.configuration.factories:TardisRestApi",
+            "TardisDupingSSHExecutor = tardis.configuration.factories:TardisDupingSSHExecutor",  # noqa: B950
+            "TardisSSHExecutor = tardis.configuration.factories:TardisSSHExecutor",
+            "TardisShellExecutor = tardis.configuration.factories:TardisShellExecutor",  # noqa: B950
         ],
         "cobald.config.sections": [
             "tardis = tardis.configuration.configuration:Configuration"
@@ -11,14 +11,74 @@ from ...utilities.attributedict import AttributeDict
 
 from functools import partial
 from shlex import quote
-from typing import Iterable
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple
 import logging
+import time
 
 logger = logging.getLogger("cobald.runtime.tardis.adapters.batchsystem.htcondor")
 
+_STATUS_MAPPING = {
+    ("Unclaimed", "Idle"): MachineStatus.Available,
+    ("Drained", "Retiring"): MachineStatus.Draining,
+    ("Drained", "Idle"): MachineStatus.Drained,
+    ("Owner", "Idle"): MachineStatus.NotAvailable,
+}
+
+# attributes of a slot, any other attribute queried is a resource ratio
+_SLOT_ATTRIBUTES = frozenset(
+    ("Machine", "Name", "State", "Activity", "TardisDroneUuid", "LastHeardFrom")
+)
+
+
+class HTCondorSlotStatus(NamedTuple):
+    """
+    Status of a partitionable slot in HTCondor, parsed once per ``condor_status``
+
+    The ``resource_ratios`` are empty if any of them is undefined or not a number,
+    in which case ``allocation`` and ``utilisation`` are ``0.0``.
+    """
+
+    name: str
+    state: str
+    activity: str
+    machine_status: MachineStatus
+    resource_ratios: Tuple[float, ...]
+    allocation: float
+    utilisation: float
+    last_heard_from: Optional[int] = None
+
+    @classmethod
+    def from_row(cls, row: dict) -> "HTCondorSlotStatus":
+        try:
+            resource_ratios = tuple(
+                float(value)
+                for key, value in row.items()
+                if key not in _SLOT_ATTRIBUTES
+            )
+        except (ValueError, TypeError):
+            resource_ratios = ()
+        last_heard_from = row.get("LastHeardFrom")
+        return cls(
+            name=row["Name"],
+            state=row["State"],
+            activity=row["Activity"],
+            machine_status=_STATUS_MAPPING.get(
+                (row["State"], row["Activity"]), MachineStatus.NotAvailable
+            ),
+            resource_ratios=resource_ratios,
+            allocation=max(resource_ratios, default=0.0),
+            utilisation=min(resource_ratios, default=0.0),
+            last_heard_from=(
+                None if last_heard_from is None else int(float(last_heard_from))
+            ),
+        )
+
 
 async def htcondor_status_updater(
-    options: AttributeDict, attributes: AttributeDict, executor: Executor
+    options: AttributeDict,
+    attributes: AttributeDict,
+    executor: Executor,
+    constraint: str = "PartitionableSlot=?=True",
 ) -> dict:
     """
     Helper function to call ``condor_status -af`` asynchronously and to translate
@@ -29,9 +89,13 @@ async def htcondor_status_updater(
         ``condor_status -af ... -pool htcondor.example``
     :type options: AttributeDict
     :param attributes: Additional fields to add to output of the
-        ``condor_status -af`` response.
+        ``condor_status -af`` response. Fields other than the slot attributes
+        are parsed as resource ratios.
     :type attributes: AttributeDict
-    :return: Dictionary containing the output of the ``condor_status`` command
+    :param constraint: ClassAd expression constraining the slots to query
+    :type constraint: str
+    :return: Dictionary mapping drones to the
+        :py:class:`~.HTCondorSlotStatus` of their slot
     :rtype: dict
     """
 
@@ -39,7 +103,7 @@ async def htcondor_status_updater(
 
     options_string = htcondor_cmd_option_formatter(options)
 
-    cmd = f"condor_status {attributes_string} -constraint PartitionableSlot=?=True"
+    cmd = f"condor_status {attributes_string} -constraint {quote(constraint)}"
 
     if options_string:
         cmd = f"{cmd} {options_string}"
@@ -56,7 +120,7 @@ async def htcondor_status_updater(
             replacements=dict(undefined=None),
         ):
             status_key = row["TardisDroneUuid"] or row["Machine"].split(".")[0]
-            htcondor_status[status_key] = row
+            htcondor_status[status_key] = HTCondorSlotStatus.from_row(row)
 
     except CommandExecutionFailure as cef:
         logger.warning(f"condor_status could not be executed due to {cef}!")
@@ -66,6 +130,71 @@ async def htcondor_status_updater(
         return htcondor_status
 
 
+class HTCondorStatusUpdater(object):
+    """
+    Incremental ``condor_status`` query merging changed slots into the status
+
+    :param options: Additional options for the condor_status call
+    :param attributes: Fields to add to the output, must include ``LastHeardFrom``
+    :param executor: The executor used to run ``condor_status``
+    :param constraint: Constraint of the slots to query
+    :param full_update_interval: Time in seconds between full queries
+
+    Only slots the collector has heard from since the newest ``LastHeardFrom``
+    of the previous query are queried, and merged into the previous status.
+    Slots that vanished from the collector are dropped by a full query of all
+    slots every ``full_update_interval`` seconds.
+    """
+
+    def __init__(
+        self,
+        options: AttributeDict,
+        attributes: AttributeDict,
+        executor: Executor,
+        constraint: str = "PartitionableSlot=?=True",
+        full_update_interval: float = 15 * 60,
+    ):
+        self._options = options
+        self._attributes = attributes
+        self._executor = executor
+        self._constraint = constraint
+        self._full_update_interval = full_update_interval
+        self._status: Dict[str, HTCondorSlotStatus] = {}
+        # newest LastHeardFrom in the clock of the collector
+        self._last_heard_from: Optional[int] = None
+        self._last_full_update = -float("inf")
+
+    async def __call__(self) -> dict:
+        now = time.monotonic()
+        full_update = (
+            self._last_heard_from is None
+            or now - self._last_full_update >= self._full_update_interval
+        )
+        constraint = (
+            self._constraint
+            if full_update
+            else f"{self._constraint} && LastHeardFrom >= {self._last_heard_from}"
+        )
+        changes = await htcondor_status_updater(
+            self._options, self._attributes, self._executor, constraint
+        )
+        # the previous status is provided to readers and must not change
+        status = {} if full_update else dict(self._status)
+        status.update(changes)
+        self._status = status
+        if full_update:
+            self._last_full_update = now
+        self._last_heard_from = max(
+            (
+                slot.last_heard_from
+                for slot in changes.values()
+                if slot.last_heard_from is not None
+            ),
+            default=self._last_heard_from,
+        )
+        return status
+
+
 class HTCondorAdapter(BatchSystemAdapter):
     """
     :py:class:`~tardis.adapters.batchsystems.htcondor.HTCondorAdapter` implements
@@ -93,14 +222,53 @@ class HTCondorAdapter(BatchSystemAdapter):
         # Escape htcondor expressions and add them to attributes
         attributes.update({key: quote(value) for key, value in self.ratios.items()})
 
-        self._htcondor_status = AsyncCacheMap(
-            update_coroutine=partial(
+        constraint = "PartitionableSlot=?=True"
+        if getattr(config.BatchSystem, "only_tardis_slots", False):
+            constraint = f"{constraint} && TardisDroneUuid =!= undefined"
+        if getattr(config.BatchSystem, "delta_updates", False):
+            attributes.update(LastHeardFrom="LastHeardFrom")
+            update_coroutine = HTCondorStatusUpdater(
+                self.htcondor_options,
+                attributes,
+                self._executor,
+                constraint=constraint,
+                full_update_interval=getattr(
+                    config.BatchSystem, "full_update_interval", 15
+                )
+                * 60,
+            )
+        else:
+            update_coroutine = partial(
                 htcondor_status_updater,
                 self.htcondor_options,
                 attributes,
                 self._executor,
-            ),
+                constraint=constraint,
+            )
+
+        max_staleness = getattr(config.BatchSystem, "max_staleness", None)
+        self._htcondor_status = AsyncCacheMap(
+            update_coroutine=update_coroutine,
             max_age=config.BatchSystem.max_age * 60,
+            stale_while_revalidate=getattr(
+                config.BatchSystem, "stale_while_revalidate", False
+            ),
+            refresh_ahead=getattr(config.BatchSystem, "refresh_ahead", None),
+            max_staleness=None if max_staleness is None else max_staleness * 60,
+            name="condor_status",
+        )
+
+    def add_status_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """
+        Register a listener to be called with the uuids of all drones whose
+        machine status has changed when refreshing the cached status.
+
+        :param listener: Callable taking the set of changed drone uuids
+        :type listener: Callable[[Set[str]], None]
+        :return: None
+        """
+        self._htcondor_status.add_change_listener(
+            listener, view=lambda status: status.machine_status
         )
 
     async def disintegrate_machine(self, drone_uuid: str) -> None:
@@ -126,7 +294,7 @@ class HTCondorAdapter(BatchSystemAdapter):
         """
         await self._htcondor_status.update_status()
         try:
-            slot_name = self._htcondor_status[drone_uuid]["Name"]
+            slot_name = self._htcondor_status[drone_uuid].name
         except KeyError:
             return
 
@@ -176,14 +344,9 @@ class HTCondorAdapter(BatchSystemAdapter):
         """
         await self._htcondor_status.update_status()
         try:
-            htcondor_status = self._htcondor_status[drone_uuid]
-            return [
-                float(value)
-                for key, value in htcondor_status.items()
-                if key in self.ratios.keys()
-            ]
-        except (KeyError, ValueError, TypeError):
-            return []
+            return self._htcondor_status[drone_uuid].resource_ratios
+        except KeyError:
+            return ()
 
     async def get_allocation(self, drone_uuid: str) -> float:
         """
@@ -196,7 +359,11 @@ class HTCondorAdapter(BatchSystemAdapter):
         :return: The allocation of a worker node as described above.
         :rtype: float
         """
-        return max(await self.get_resource_ratios(drone_uuid), default=0.0)
+        await self._htcondor_status.update_status()
+        try:
+            return self._htcondor_status[drone_uuid].allocation
+        except KeyError:
+            return 0.0
 
     async def get_machine_status(self, drone_uuid: str) -> MachineStatus:
         """
@@ -210,23 +377,11 @@ class HTCondorAdapter(BatchSystemAdapter):
             NotAvailable)
         :rtype: MachineStatus
         """
-        status_mapping = {
-            ("Unclaimed", "Idle"): MachineStatus.Available,
-            ("Drained", "Retiring"): MachineStatus.Draining,
-            ("Drained", "Idle"): MachineStatus.Drained,
-            ("Owner", "Idle"): MachineStatus.NotAvailable,
-        }
-
         await self._htcondor_status.update_status()
         try:
-            machine_status = self._htcondor_status[drone_uuid]
+            return self._htcondor_status[drone_uuid].machine_status
         except KeyError:
             return MachineStatus.NotAvailable
-        else:
-            return status_mapping.get(
-                (machine_status["State"], machine_status["Activity"]),
-                MachineStatus.NotAvailable,
-            )
 
     async def get_utilisation(self, drone_uuid: str) -> float:
         """
@@ -240,7 +395,11 @@ class HTCondorAdapter(BatchSystemAdapter):
         :return: The utilisation of a worker node as described above.
         :rtype: float
         """
-        return min(await self.get_resource_ratios(drone_uuid), default=0.0)
+        await self._htcondor_status.update_status()
+        try:
+            return self._htcondor_status[drone_uuid].utilisation
+        except KeyError:
+            return 0.0
 
     @property
     def machine_meta_data_translation_mapping(self) -> AttributeDict:
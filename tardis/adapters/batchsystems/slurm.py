@@ -4,7 +4,7 @@ import logging
 
 from functools import partial
 
-from typing import Iterable
+from typing import Callable, Iterable, NamedTuple, Set, Tuple
 
 from ...configuration.configuration import Configuration
 from ...exceptions.executorexceptions import CommandExecutionFailure
@@ -17,6 +17,72 @@ from ...utilities.executors.shellexecutor import ShellExecutor
 from ...utilities.asynccachemap import AsyncCacheMap
 from ...utilities.attributedict import AttributeDict
 
+# '*' means the machine didn't respond for a while
+# 'allocated+' means that node is allocated to one or more active jobs plus one
+# or more jobs in COMPLETING
+_STATUS_MAPPING = {
+    "allocated": MachineStatus.Available,
+    "allocated+": MachineStatus.Available,
+    "mixed": MachineStatus.Available,
+    "idle": MachineStatus.Available,
+    "completing": MachineStatus.Available,
+    "draining": MachineStatus.Draining,
+    "down": MachineStatus.NotAvailable,
+    "down*": MachineStatus.Drained,
+    "drained": MachineStatus.NotAvailable,
+    "drained*": MachineStatus.Drained,
+    "fail": MachineStatus.Drained,
+    "failing": MachineStatus.Drained,
+    "future": MachineStatus.Drained,
+    "maint": MachineStatus.Drained,
+    "reboot": MachineStatus.Drained,
+    "power_down": MachineStatus.Drained,
+    "powering_down": MachineStatus.Drained,
+    "reserved": MachineStatus.NotAvailable,
+    "unknown": MachineStatus.Drained,
+    "power_up": MachineStatus.NotAvailable,
+}
+
+
+class SlurmNodeStatus(NamedTuple):
+    """
+    Status of a node in SLURM, parsed once per ``sinfo``
+
+    The ``resource_ratios`` are the ratios of allocated over total CPUs and
+    memory. They are empty if the node reports no CPUs or memory, in which case
+    ``allocation`` and ``utilisation`` are ``0.0``.
+    """
+
+    machine: str
+    state: str
+    machine_status: MachineStatus
+    resource_ratios: Tuple[float, ...]
+    allocation: float
+    utilisation: float
+
+    @classmethod
+    def from_row(cls, row: dict) -> "SlurmNodeStatus":
+        # cpusstate is formatted as allocated/idle/other/total
+        cpus = [float(elem) for elem in row["CPUs"].split("/")]
+        total_mem = float(row["TotalMem"])
+        try:
+            resource_ratios = (
+                (cpus[3] - cpus[1]) / cpus[3],
+                float(row["AllocMem"]) / total_mem,
+            )
+        except ZeroDivisionError:
+            resource_ratios = ()
+        return cls(
+            machine=row["Machine"],
+            state=row["State"],
+            machine_status=_STATUS_MAPPING.get(
+                row["State"], MachineStatus.NotAvailable
+            ),
+            resource_ratios=resource_ratios,
+            allocation=max(resource_ratios, default=0.0),
+            utilisation=min(resource_ratios, default=0.0),
+        )
+
 
 async def slurm_status_updater(
     options: AttributeDict, attributes: AttributeDict, executor: Executor
@@ -28,7 +94,8 @@ async def slurm_status_updater(
     :type options: AttributeDict
     :param attributes: Formatting options for ``sinfo``
     :type attributes: AttributeDict
-    :return: Dictionary containing the output of the ``sinfo`` command
+    :return: Dictionary mapping drones to the :py:class:`~.SlurmNodeStatus` of
+        their node
     :rtype: dict
     """
 
@@ -54,14 +121,10 @@ async def slurm_status_updater(
             skipinitialspace=True,
             skiptrailingspace=True,
         ):
-            row["CPUs"] = [float(elem) for elem in row["CPUs"].split("/")]
-            row["TotalMem"] = float(row["TotalMem"])
-            row["FreeMem"] = row["TotalMem"] - float(row["AllocMem"])
-
             status_key = row["Features"]
 
             if status_key is not None:
-                slurm_status[status_key] = row
+                slurm_status[status_key] = SlurmNodeStatus.from_row(row)
 
     except CommandExecutionFailure as ex:
         logging.warning(f"SLURM's sinfo could not be executed! {str(ex)}")
@@ -96,11 +159,31 @@ class SlurmAdapter(BatchSystemAdapter):
             "Machine": "nodehost",
         }
 
+        max_staleness = getattr(config.BatchSystem, "max_staleness", None)
         self._slurm_status = AsyncCacheMap(
             update_coroutine=partial(
                 slurm_status_updater, self.slurm_options, attributes, self._executor
             ),
             max_age=config.BatchSystem.max_age * 60,
+            stale_while_revalidate=getattr(
+                config.BatchSystem, "stale_while_revalidate", False
+            ),
+            refresh_ahead=getattr(config.BatchSystem, "refresh_ahead", None),
+            max_staleness=None if max_staleness is None else max_staleness * 60,
+            name="sinfo",
+        )
+
+    def add_status_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """
+        Register a listener to be called with the uuids of all drones whose
+        machine status has changed when refreshing the cached status.
+
+        :param listener: Callable taking the set of changed drone uuids
+        :type listener: Callable[[Set[str]], None]
+        :return: None
+        """
+        self._slurm_status.add_change_listener(
+            listener, view=lambda status: status.machine_status
         )
 
     async def disintegrate_machine(self, drone_uuid: str) -> None:
@@ -127,7 +210,7 @@ class SlurmAdapter(BatchSystemAdapter):
         """
         await self._slurm_status.update_status()
         try:
-            machine = self._slurm_status[drone_uuid]["Machine"]
+            machine = self._slurm_status[drone_uuid].machine
         except KeyError:
             return
 
@@ -162,16 +245,9 @@ class SlurmAdapter(BatchSystemAdapter):
 
         await self._slurm_status.update_status()
         try:
-            slurm_status = self._slurm_status[drone_uuid]
+            return self._slurm_status[drone_uuid].resource_ratios
         except KeyError:
-            return {}
-        else:
-            return (
-                (slurm_status["CPUs"][3] - slurm_status["CPUs"][1])
-                / slurm_status["CPUs"][3],
-                (slurm_status["TotalMem"] - slurm_status["FreeMem"])
-                / slurm_status["TotalMem"],
-            )
+            return ()
 
     async def get_allocation(self, drone_uuid: str) -> float:
         """
@@ -185,7 +261,11 @@ class SlurmAdapter(BatchSystemAdapter):
         :return: The allocation of a worker node as described above.
         :rtype: float
         """
-        return max(await self.get_resource_ratios(drone_uuid), default=0.0)
+        await self._slurm_status.update_status()
+        try:
+            return self._slurm_status[drone_uuid].allocation
+        except KeyError:
+            return 0.0
 
     async def get_machine_status(self, drone_uuid: str) -> MachineStatus:
         """
@@ -200,41 +280,11 @@ class SlurmAdapter(BatchSystemAdapter):
         :rtype: MachineStatus
         """
 
-        # '*' means the machine didn't respond for a while
-        # 'allocated+' means that node is allocated to one or more active jobs plus one
-        # or more jobs in COMPLETING
-        status_mapping = {
-            "allocated": MachineStatus.Available,
-            "allocated+": MachineStatus.Available,
-            "mixed": MachineStatus.Available,
-            "idle": MachineStatus.Available,
-            "completing": MachineStatus.Available,
-            "draining": MachineStatus.Draining,
-            "down": MachineStatus.NotAvailable,
-            "down*": MachineStatus.Drained,
-            "drained": MachineStatus.NotAvailable,
-            "drained*": MachineStatus.Drained,
-            "fail": MachineStatus.Drained,
-            "failing": MachineStatus.Drained,
-            "future": MachineStatus.Drained,
-            "maint": MachineStatus.Drained,
-            "reboot": MachineStatus.Drained,
-            "power_down": MachineStatus.Drained,
-            "powering_down": MachineStatus.Drained,
-            "reserved": MachineStatus.NotAvailable,
-            "unknown": MachineStatus.Drained,
-            "power_up": MachineStatus.NotAvailable,
-        }
-
         await self._slurm_status.update_status()
         try:
-            machine_status = self._slurm_status[drone_uuid]
+            return self._slurm_status[drone_uuid].machine_status
         except KeyError:
             return MachineStatus.NotAvailable
-        else:
-            return status_mapping.get(
-                machine_status["State"], MachineStatus.NotAvailable
-            )
 
     async def get_utilisation(self, drone_uuid: str) -> float:
         """
@@ -248,7 +298,11 @@ class SlurmAdapter(BatchSystemAdapter):
         :return: The utilization of a worker node as described above.
         :rtype: float
         """
-        return min(await self.get_resource_ratios(drone_uuid), default=0.0)
+        await self._slurm_status.update_status()
+        try:
+            return self._slurm_status[drone_uuid].utilisation
+        except KeyError:
+            return 0.0
 
     @property
     def machine_meta_data_translation_mapping(self) -> AttributeDict:
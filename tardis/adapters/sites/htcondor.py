@@ -1,4 +1,4 @@
-from typing import Iterable, Tuple, Awaitable, Mapping
+from typing import Iterable, List, Tuple, Awaitable, Mapping, Optional, Union
 from ...exceptions.executorexceptions import CommandExecutionFailure
 from ...exceptions.tardisexceptions import TardisError
 from ...exceptions.tardisexceptions import TardisResourceStatusUpdateFailed
@@ -8,7 +8,7 @@ from ...interfaces.executor import Executor
 from ...utilities.attributedict import AttributeDict
 from ...utilities.staticmapping import StaticMapping
 from ...utilities.executors.shellexecutor import ShellExecutor
-from ...utilities.asyncbulkcall import AsyncBulkCall
+from ...utilities.asyncbulkcall import AsyncBulkCall, BulkPriority
 from ...utilities.utils import (
     csv_parser,
     drone_environment_to_str,
@@ -18,6 +18,7 @@ from ...utilities.utils import (
 
 from contextlib import contextmanager
 from functools import partial
+from operator import attrgetter
 from string import Template
 
 import warnings
@@ -85,6 +86,10 @@ SUBMIT_ID_PATTERN = re.compile(r"Proc\s(\d+\.\d+)")
 JDL_QUEUE_PATTERN = re.compile(r"^queue\s*\d*\s*$", flags=re.MULTILINE)
 
 
+class CondorSubmitRejected(CommandExecutionFailure):
+    """``condor_submit`` was rejected by the schedd without submitting any job"""
+
+
 def _submit_description(resource_jdls: Tuple[JDL, ...]) -> str:
     commands = []
     for jdl in resource_jdls:
@@ -118,10 +123,23 @@ async def condor_submit(
     command = (
         f"condor_submit -verbose -maxjobs {len(resource_jdls)} {submit_option_string}"
     )
-    response = await executor.run_command(
-        command,
-        stdin_input=_submit_description(resource_jdls),
-    )
+    try:
+        response = await executor.run_command(
+            command,
+            stdin_input=_submit_description(resource_jdls),
+        )
+    except CommandExecutionFailure as cef:
+        # a lost connection gives no exit code of condor_submit itself, and the
+        # schedd may have committed all jobs before the connection was lost
+        if cef.exit_code in (None, 255):
+            raise
+        raise CondorSubmitRejected(
+            message=cef.message,
+            exit_code=cef.exit_code,
+            stdout=cef.stdout,
+            stderr=cef.stderr,
+            stdin=cef.stdin,
+        ) from cef
     return (
         SUBMIT_ID_PATTERN.search(line).group(1)
         for line in response.stdout.splitlines()
@@ -229,6 +247,16 @@ class HTCondorAdapter(SiteAdapter):
 
         bulk_size = getattr(self.configuration, "bulk_size", 100)
         bulk_delay = getattr(self.configuration, "bulk_delay", 1.0)
+        bulk_min_delay = getattr(self.configuration, "bulk_min_delay", None)
+        bulk_concurrent = getattr(self.configuration, "bulk_concurrent", None)
+        bulk_priority_delays = {
+            BulkPriority[priority]: delay
+            for priority, delay in getattr(
+                self.configuration, "bulk_priority_delays", {"High": bulk_delay / 10}
+            ).items()
+        }
+        # statistics of bulk commands are kept apart per site and machine type
+        bulk_name_prefix = f"{site_name.lower()}_{machine_type.lower()}"
 
         self._condor_submit = AsyncBulkCall(
             partial(
@@ -238,12 +266,24 @@ class HTCondorAdapter(SiteAdapter):
             ),
             size=bulk_size,
             delay=bulk_delay,
+            priority_delays=bulk_priority_delays,
+            concurrent=bulk_concurrent,
+            min_delay=bulk_min_delay,
+            # a rejected condor_submit commits no job, retry to isolate bad JDLs
+            bisect=(CondorSubmitRejected,),
+            name=f"{bulk_name_prefix}_condor_submit",
         )
         self._condor_suspend, self._condor_rm, self._condor_q = (
             AsyncBulkCall(
                 partial(tool, executor=self._executor),
                 size=bulk_size,
                 delay=bulk_delay,
+                priority_delays=bulk_priority_delays,
+                concurrent=bulk_concurrent,
+                min_delay=bulk_min_delay,
+                # calls for the same job share one slot in the bulk command
+                key=attrgetter("remote_resource_uuid"),
+                name=f"{bulk_name_prefix}_{tool.__name__}",
             )
             for tool in (condor_suspend, condor_rm, condor_q)
         )
@@ -271,6 +311,25 @@ class HTCondorAdapter(SiteAdapter):
     async def deploy_resource(
         self, resource_attributes: AttributeDict
     ) -> AttributeDict:
+        job_id = await self._condor_submit(self._submit_jdl(resource_attributes))
+        return self.handle_response(AttributeDict(JobId=job_id))
+
+    async def deploy_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Union[AttributeDict, Exception]]:
+        job_ids = await self._condor_submit.call_many(
+            self._submit_jdl(resource) for resource in resource_attributes
+        )
+        return [
+            (
+                job_id
+                if isinstance(job_id, Exception)
+                else self.handle_response(AttributeDict(JobId=job_id))
+            )
+            for job_id in job_ids
+        ]
+
+    def _submit_jdl(self, resource_attributes: AttributeDict) -> str:
         jdl_file = self.machine_type_configuration.jdl
         with open(jdl_file, "r") as f:
             jdl_template = Template(f.read())
@@ -280,7 +339,7 @@ class HTCondorAdapter(SiteAdapter):
             resource_attributes.obs_machine_meta_data_translation_mapping,
         )
 
-        submit_jdl = jdl_template.substitute(
+        return jdl_template.substitute(
             machine_meta_data_translation(
                 self.machine_meta_data,
                 self.htcondor_machine_meta_data_translation_mapping,
@@ -293,15 +352,31 @@ class HTCondorAdapter(SiteAdapter):
             ),
         )
 
-        job_id = await self._condor_submit(submit_jdl)
-        response = AttributeDict(JobId=job_id)
-
-        return self.handle_response(response)
-
     async def resource_status(
         self, resource_attributes: AttributeDict
     ) -> AttributeDict:
-        return self.handle_response(await self._condor_q(resource_attributes))
+        # status checks of booting resources go ahead of routine polls
+        priority = (
+            BulkPriority.Normal
+            if resource_attributes.get("resource_status") is ResourceStatus.Booting
+            else BulkPriority.Low
+        )
+        return self.handle_response(
+            await self._condor_q(resource_attributes, priority=priority)
+        )
+
+    async def resource_status_many(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Union[AttributeDict, Exception]]:
+        responses = await self._condor_q.call_many(resource_attributes)
+        return [
+            (
+                response
+                if isinstance(response, Exception)
+                else self.handle_response(response)
+            )
+            for response in responses
+        ]
 
     async def stop_resource(self, resource_attributes: AttributeDict) -> None:
         """
@@ -309,18 +384,53 @@ class HTCondorAdapter(SiteAdapter):
         therefore condor_suspend is called!
         """
         resource_uuid = resource_attributes.remote_resource_uuid
-        if await self._condor_suspend(resource_attributes):
+        if await self._condor_suspend(resource_attributes, priority=BulkPriority.High):
             return
         logger.debug(f"condor_suspend failed for {resource_uuid}")
         raise TardisResourceStatusUpdateFailed
 
+    async def stop_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Optional[Exception]]:
+        return await self._bulk_outcomes(
+            "condor_suspend", resource_attributes, self._condor_suspend
+        )
+
     async def terminate_resource(self, resource_attributes: AttributeDict) -> None:
         resource_uuid = resource_attributes.remote_resource_uuid
-        if await self._condor_rm(resource_attributes):
+        if await self._condor_rm(resource_attributes, priority=BulkPriority.High):
             return
         logger.debug(f"condor_rm failed for {resource_uuid}")
         raise TardisResourceStatusUpdateFailed
 
+    async def terminate_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Optional[Exception]]:
+        return await self._bulk_outcomes(
+            "condor_rm", resource_attributes, self._condor_rm
+        )
+
+    @staticmethod
+    async def _bulk_outcomes(
+        tool: str,
+        resource_attributes: Iterable[AttributeDict],
+        bulk_call: AsyncBulkCall[AttributeDict, bool],
+    ) -> List[Optional[Exception]]:
+        """Translate the success of a bulk ``tool`` to the outcome per resource"""
+        resource_attributes = list(resource_attributes)
+        outcomes = []
+        for resource, success in zip(  # noqa B905
+            resource_attributes, await bulk_call.call_many(resource_attributes)
+        ):
+            if isinstance(success, Exception):
+                outcomes.append(success)
+            elif success:
+                outcomes.append(None)
+            else:
+                logger.debug(f"{tool} failed for {resource.remote_resource_uuid}")
+                outcomes.append(TardisResourceStatusUpdateFailed())
+        return outcomes
+
     @contextmanager
     def handle_exceptions(self):
         try:
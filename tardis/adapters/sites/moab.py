@@ -6,7 +6,7 @@ from ...interfaces.executor import Executor
 from ...interfaces.siteadapter import ResourceStatus
 from ...interfaces.siteadapter import SiteAdapter
 from ...utilities.staticmapping import StaticMapping
-from ...utilities.asyncbulkcall import AsyncBulkCall
+from ...utilities.asyncbulkcall import AsyncBulkCall, BulkPriority
 from ...utilities.attributedict import AttributeDict
 from ...utilities.executors.shellexecutor import ShellExecutor
 from ...utilities.utils import (
@@ -18,7 +18,8 @@ from ...utilities.utils import (
 from asyncio import TimeoutError
 from contextlib import contextmanager
 from functools import partial
-from typing import Iterable, Mapping, Tuple
+from operator import attrgetter
+from typing import Iterable, List, Mapping, Tuple, Union
 
 import asyncssh
 import logging
@@ -135,11 +136,28 @@ class MoabAdapter(SiteAdapter):
 
         bulk_size = getattr(self.configuration, "bulk_size", 100)
         bulk_delay = getattr(self.configuration, "bulk_delay", 1.0)
+        bulk_min_delay = getattr(self.configuration, "bulk_min_delay", None)
+        bulk_concurrent = getattr(self.configuration, "bulk_concurrent", None)
+        bulk_priority_delays = {
+            BulkPriority[priority]: delay
+            for priority, delay in getattr(
+                self.configuration, "bulk_priority_delays", {"High": bulk_delay / 10}
+            ).items()
+        }
+
+        # statistics of bulk commands are kept apart per site and machine type
+        bulk_name_prefix = f"{site_name.lower()}_{machine_type.lower()}"
 
         self._showq = AsyncBulkCall(
             partial(showq, executor=self._executor),
             size=bulk_size,
             delay=bulk_delay,
+            priority_delays=bulk_priority_delays,
+            concurrent=bulk_concurrent,
+            min_delay=bulk_min_delay,
+            # calls for the same job share one slot in the bulk command
+            key=attrgetter("remote_resource_uuid"),
+            name=f"{bulk_name_prefix}_showq",
         )
 
     async def deploy_resource(
@@ -163,7 +181,28 @@ class MoabAdapter(SiteAdapter):
     async def resource_status(
         self, resource_attributes: AttributeDict
     ) -> AttributeDict:
-        return self.handle_response(await self._showq(resource_attributes))
+        # status checks of booting resources go ahead of routine polls
+        priority = (
+            BulkPriority.Normal
+            if resource_attributes.get("resource_status") is ResourceStatus.Booting
+            else BulkPriority.Low
+        )
+        return self.handle_response(
+            await self._showq(resource_attributes, priority=priority)
+        )
+
+    async def resource_status_many(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Union[AttributeDict, Exception]]:
+        responses = await self._showq.call_many(resource_attributes)
+        return [
+            (
+                response
+                if isinstance(response, Exception)
+                else self.handle_response(response)
+            )
+            for response in responses
+        ]
 
     async def terminate_resource(self, resource_attributes: AttributeDict) -> None:
         request_command = f"canceljob {resource_attributes.remote_resource_uuid}"
@@ -2,11 +2,16 @@ from ..interfaces.batchsystemadapter import BatchSystemAdapter
 from ..interfaces.batchsystemadapter import MachineStatus
 from ..utilities.attributedict import AttributeDict
 
+from typing import Callable, Set
+
 
 class BatchSystemAgent(BatchSystemAdapter):
     def __init__(self, batch_system_adapter: BatchSystemAdapter):
         self._batch_system_adapter = batch_system_adapter
 
+    def add_status_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        return self._batch_system_adapter.add_status_listener(listener)
+
     async def disintegrate_machine(self, drone_uuid: str) -> None:
         return await self._batch_system_adapter.disintegrate_machine(drone_uuid)
 
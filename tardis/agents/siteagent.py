@@ -1,21 +1,83 @@
 from ..interfaces.siteadapter import SiteAdapter
 from ..utilities.attributedict import AttributeDict
+from ..utilities.asyncbulkcall import AsyncBulkCall
 from ..utilities.attributedict import convert_to_attribute_dict
+from ..utilities.circuitbreaker import CircuitBreaker
+
+from contextlib import contextmanager
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from typing import Union
+import sys
+import time
 
 
 class SiteAgent(SiteAdapter):
-    def __init__(self, site_adapter: SiteAdapter):
+    def __init__(
+        self,
+        site_adapter: SiteAdapter,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        bulk_delay: Optional[float] = None,
+    ):
         self._site_adapter = site_adapter
+        # shared by all agents of a site, short-circuits calls while it fails
+        self._circuit_breaker = circuit_breaker
+        # collect deployments, stops and terminations of drones into bulk calls,
+        # with statistics kept apart per site and machine type
+        self._bulk_deploy, self._bulk_stop, self._bulk_terminate = (
+            (None, None, None)
+            if bulk_delay is None
+            else (
+                AsyncBulkCall(
+                    partial(_call_bulk_method, bulk_method),
+                    size=sys.maxsize,
+                    delay=bulk_delay,
+                    name=(
+                        f"{site_adapter.site_name.lower()}"
+                        f"_{site_adapter.machine_type.lower()}"
+                        f"_{bulk_method.__name__}"
+                    ),
+                )
+                for bulk_method in (
+                    self.deploy_resources,
+                    self.stop_resources,
+                    self.terminate_resources,
+                )
+            )
+        )
+        # resource status queried in bulk ahead of the next drone state update,
+        # with the time until which it may be used
+        self._resource_status_snapshot: Dict[str, Tuple[float, AttributeDict]] = {}
+
+    def add_status_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        return self._site_adapter.add_status_listener(listener)
 
     async def deploy_resource(
         self, resource_attributes: AttributeDict
     ) -> AttributeDict:
-        with self.handle_exceptions():
+        if self._bulk_deploy is not None:
+            return await self._bulk_deploy(resource_attributes)
+        with self._guarded_call():
             response = await self._site_adapter.deploy_resource(
                 resource_attributes=resource_attributes
             )
             return convert_to_attribute_dict(response)
 
+    async def deploy_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Union[AttributeDict, Exception]]:
+        responses = await self._bulk_call(
+            self._site_adapter.deploy_resources, resource_attributes
+        )
+        return [
+            (
+                response
+                if isinstance(response, Exception)
+                else convert_to_attribute_dict(response)
+            )
+            for response in responses
+        ]
+
     def drone_uuid(self, uuid) -> str:
         return self._site_adapter.drone_uuid(uuid=uuid)
 
@@ -35,6 +97,18 @@ class SiteAgent(SiteAdapter):
     def drone_heartbeat_interval(self) -> int:
         return self._site_adapter.drone_heartbeat_interval
 
+    @property
+    def drone_heartbeat_intervals(self) -> Dict[str, int]:
+        return self._site_adapter.drone_heartbeat_intervals
+
+    @property
+    def drone_heartbeat_backoff(self) -> float:
+        return self._site_adapter.drone_heartbeat_backoff
+
+    @property
+    def drone_heartbeat_max_interval(self) -> Optional[int]:
+        return self._site_adapter.drone_heartbeat_max_interval
+
     @property
     def drone_minimum_lifetime(self) -> int:
         return self._site_adapter.drone_minimum_lifetime
@@ -47,20 +121,132 @@ class SiteAgent(SiteAdapter):
     def machine_type(self) -> str:
         return self._site_adapter.machine_type
 
+    async def prefetch_resource_status(
+        self, resource_attributes: Iterable[AttributeDict], max_age: float
+    ) -> None:
+        """
+        Query the status of many resources at once. Each successfully queried
+        status is used by the next :py:meth:`resource_status` call of the
+        corresponding drone within ``max_age`` seconds instead of querying the
+        resource provider again. Older status is discarded.
+        """
+        resource_attributes = list(resource_attributes)
+        snapshot = self._resource_status_snapshot
+        now = time.monotonic()
+        expired = [
+            drone_uuid
+            for drone_uuid, (expires, _) in snapshot.items()
+            if expires <= now
+        ]
+        for drone_uuid in expired:
+            del snapshot[drone_uuid]
+        for resource in resource_attributes:
+            snapshot.pop(resource.drone_uuid, None)
+        responses = await self.resource_status_many(resource_attributes)
+        expires = time.monotonic() + max_age
+        for resource, response in zip(resource_attributes, responses):  # noqa B905
+            if not isinstance(response, Exception):
+                snapshot[resource.drone_uuid] = (expires, response)
+
     async def resource_status(
         self, resource_attributes: AttributeDict
     ) -> AttributeDict:
-        with self._site_adapter.handle_exceptions():
+        try:
+            expires, response = self._resource_status_snapshot.pop(
+                resource_attributes.drone_uuid
+            )
+        except (KeyError, AttributeError):
+            pass
+        else:
+            if expires > time.monotonic():
+                return response
+        return await self._resource_status(resource_attributes)
+
+    async def _resource_status(
+        self, resource_attributes: AttributeDict
+    ) -> AttributeDict:
+        with self._guarded_call():
             return await self._site_adapter.resource_status(resource_attributes)
 
+    async def resource_status_many(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Union[AttributeDict, Exception]]:
+        return await self._bulk_call(
+            self._site_adapter.resource_status_many, resource_attributes
+        )
+
     @property
     def site_name(self) -> str:
         return self._site_adapter.site_name
 
     async def stop_resource(self, resource_attributes: AttributeDict):
-        with self._site_adapter.handle_exceptions():
+        if self._bulk_stop is not None:
+            return await self._bulk_stop(resource_attributes)
+        with self._guarded_call():
             return await self._site_adapter.stop_resource(resource_attributes)
 
+    async def stop_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Optional[Exception]]:
+        return await self._bulk_call(
+            self._site_adapter.stop_resources, resource_attributes
+        )
+
     async def terminate_resource(self, resource_attributes: AttributeDict):
-        with self._site_adapter.handle_exceptions():
+        if self._bulk_terminate is not None:
+            return await self._bulk_terminate(resource_attributes)
+        with self._guarded_call():
             return await self._site_adapter.terminate_resource(resource_attributes)
+
+    async def terminate_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Optional[Exception]]:
+        return await self._bulk_call(
+            self._site_adapter.terminate_resources, resource_attributes
+        )
+
+    async def _bulk_call(
+        self, bulk_call, resource_attributes: Iterable[AttributeDict]
+    ) -> List:
+        """
+        Call a bulk method of the site adapter, translating the exception of each
+        resource as well as of the entire call via :py:meth:`handle_exceptions`
+        """
+        with self._guarded_call():
+            results = await bulk_call(list(resource_attributes))
+        return [
+            (
+                self._translate_exception(result)
+                if isinstance(result, Exception)
+                else result
+            )
+            for result in results
+        ]
+
+    @contextmanager
+    def _guarded_call(self) -> Iterator[None]:
+        """
+        Guard a call of the site adapter by the circuit breaker of the site, if
+        any, and translate its exceptions via :py:meth:`handle_exceptions`
+        """
+        if self._circuit_breaker is None:
+            with self._site_adapter.handle_exceptions():
+                yield
+        else:
+            with self._circuit_breaker.guard():
+                with self._site_adapter.handle_exceptions():
+                    yield
+
+    def _translate_exception(self, exception: Exception) -> Exception:
+        try:
+            with self._site_adapter.handle_exceptions():
+                raise exception
+        except Exception as translated:
+            return translated
+        # exceptions suppressed by the site adapter are passed on as they are
+        return exception
+
+
+async def _call_bulk_method(bulk_method, *resource_attributes: AttributeDict) -> List:
+    """Adapt a bulk method of the :py:class:`~.SiteAgent` to a bulk command"""
+    return await bulk_method(resource_attributes)
@@ -1,10 +1,7 @@
 from ..interfaces.borg import Borg
 from ..utilities.attributedict import AttributeDict
 from ..utilities.attributedict import convert_to_attribute_dict
-
-# Need to import all pyyaml loadable classes (bootstrapping problem) FIX ME
-from ..utilities.executors import *  # noqa: F403, F401
-from ..utilities.simulators import *  # noqa: F403, F401
+from .utilities import enable_lazy_yaml_load
 
 from cobald.daemon.config.mapping import Translator
 from cobald.daemon.plugins import constraints as plugin_constraints
@@ -14,6 +11,24 @@ import os
 import yaml
 
 
+# pyyaml loadable classes are imported only once their tag is used
+enable_lazy_yaml_load(
+    "!SSHExecutor", "tardis.utilities.executors.sshexecutor", "SSHExecutor"
+)
+enable_lazy_yaml_load(
+    "!DupingSSHExecutor", "tardis.utilities.executors.sshexecutor", "DupingSSHExecutor"
+)
+enable_lazy_yaml_load(
+    "!ShellExecutor", "tardis.utilities.executors.shellexecutor", "ShellExecutor"
+)
+enable_lazy_yaml_load(
+    "!PeriodicValue", "tardis.utilities.simulators.periodicvalue", "PeriodicValue"
+)
+enable_lazy_yaml_load(
+    "!RandomGauss", "tardis.utilities.simulators.randomgauss", "RandomGauss"
+)
+
+
 def translate_config(obj):
     if isinstance(obj, AttributeDict):
         translated_obj = AttributeDict(obj)
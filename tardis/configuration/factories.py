@@ -0,0 +1,27 @@
+"""
+Factories of all YAML tags tardis registers with COBalD
+
+COBalD loads every registered YAML tag on startup. The factories import their
+implementation only once their tag is used, so that loading the tags does not
+import the dependencies of unused features, for example of the REST service.
+"""
+
+from .utilities import LazyFactory
+
+TardisPoolFactory = LazyFactory("tardis.resources.poolfactory", "create_composite_pool")
+TardisPeriodicValue = LazyFactory(
+    "tardis.utilities.simulators.periodicvalue", "PeriodicValue"
+)
+TardisRandomGauss = LazyFactory(
+    "tardis.utilities.simulators.randomgauss", "RandomGauss"
+)
+TardisRestApi = LazyFactory("tardis.rest.service", "RestService", eager=True)
+TardisDupingSSHExecutor = LazyFactory(
+    "tardis.utilities.executors.sshexecutor", "DupingSSHExecutor", eager=True
+)
+TardisSSHExecutor = LazyFactory(
+    "tardis.utilities.executors.sshexecutor", "SSHExecutor", eager=True
+)
+TardisShellExecutor = LazyFactory(
+    "tardis.utilities.executors.shellexecutor", "ShellExecutor"
+)
@@ -1,23 +1,76 @@
 from cobald.daemon.plugins import YAMLTagSettings
+
+from importlib import import_module
+from typing import Any, Callable
 import yaml
 
 
+def yaml_class_factory(cls) -> Callable[[yaml.SafeLoader, yaml.nodes.Node], Any]:
+    """Create a PyYAML constructor creating instances of ``cls``"""
+
+    def class_factory(loader, node):
+        settings = YAMLTagSettings.fetch(cls)
+        new_cls = cls
+        if isinstance(node, yaml.nodes.MappingNode):
+            parameters = loader.construct_mapping(node, deep=settings.eager)
+            new_cls = cls(**parameters)
+        elif isinstance(node, yaml.nodes.ScalarNode):
+            new_cls = cls()
+        elif isinstance(node, yaml.nodes.SequenceNode):
+            parameters = loader.construct_sequence(node, deep=settings.eager)
+            new_cls = cls(*parameters)
+        return new_cls
+
+    return class_factory
+
+
 def enable_yaml_load(tag):
     def yaml_load_decorator(cls):
-        def class_factory(loader, node):
-            settings = YAMLTagSettings.fetch(cls)
-            new_cls = cls
-            if isinstance(node, yaml.nodes.MappingNode):
-                parameters = loader.construct_mapping(node, deep=settings.eager)
-                new_cls = cls(**parameters)
-            elif isinstance(node, yaml.nodes.ScalarNode):
-                new_cls = cls()
-            elif isinstance(node, yaml.nodes.SequenceNode):
-                parameters = loader.construct_sequence(node, deep=settings.eager)
-                new_cls = cls(*parameters)
-            return new_cls
-
-        yaml.add_constructor(tag, class_factory, Loader=yaml.SafeLoader)
+        yaml.add_constructor(tag, yaml_class_factory(cls), Loader=yaml.SafeLoader)
         return cls
 
     return yaml_load_decorator
+
+
+def enable_lazy_yaml_load(tag: str, module: str, name: str) -> None:
+    """
+    Enable loading the class ``name`` of ``module`` via the YAML ``tag``, importing
+    the ``module`` only once the ``tag`` is used for the first time
+    """
+
+    def lazy_class_factory(loader, node):
+        cls = getattr(import_module(module), name)
+        return yaml_class_factory(cls)(loader, node)
+
+    yaml.add_constructor(tag, lazy_class_factory, Loader=yaml.SafeLoader)
+
+
+class LazyFactory(object):
+    """
+    Factory importing the callable ``name`` of ``module`` on its first call
+
+    :param module: absolute name of the module providing the callable
+    :param name: name of the callable in the module
+    :param eager: whether the YAML content must be evaluated eagerly, as for
+        :py:func:`cobald.daemon.plugins.yaml_tag`
+
+    A :py:class:`~.LazyFactory` can be registered as a YAML constructor entry
+    point in place of the actual callable, so that loading the entry point
+    does not import the ``module`` and its dependencies.
+    """
+
+    def __init__(self, module: str, name: str, *, eager: bool = False):
+        self._module = module
+        self._name = name
+        YAMLTagSettings(eager=eager).mark(self)
+
+    @property
+    def factory(self) -> Callable:
+        """The actual callable, imported on first access"""
+        return getattr(import_module(self._module), self._name)
+
+    def __call__(self, *args, **kwargs):
+        return self.factory(*args, **kwargs)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self._module!r}, {self._name!r})"
@@ -20,3 +20,7 @@ class TardisQuotaExceeded(Exception):
 
 class TardisResourceStatusUpdateFailed(Exception):
     pass
+
+
+class TardisSiteUnavailable(TardisResourceStatusUpdateFailed):
+    pass
@@ -3,6 +3,7 @@ from ..utilities.attributedict import AttributeDict
 from abc import ABCMeta
 from abc import abstractmethod
 from enum import Enum
+from typing import Callable, Set
 
 
 class MachineStatus(Enum):
@@ -18,6 +19,19 @@ class BatchSystemAdapter(metaclass=ABCMeta):
     integration and management of resources in the overlay batch system.
     """
 
+    def add_status_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """
+        Register a listener to be called with the uuids of all drones whose
+        machine status has changed in the overlay batch system. By default,
+        no changes are published. Batch system adapters able to detect changes,
+        for example when refreshing their cached status, should override this.
+
+        :param listener: Callable taking the set of changed drone uuids
+        :type listener: Callable[[Set[str]], None]
+        :return: None
+        """
+        return None
+
     @abstractmethod
     async def disintegrate_machine(self, drone_uuid: str) -> None:
         """
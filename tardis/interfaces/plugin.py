@@ -1,11 +1,75 @@
 from abc import ABCMeta
 from abc import abstractmethod
+from functools import cached_property
+from typing import Iterable, Optional, Tuple, TYPE_CHECKING
 
+from tardis.configuration.configuration import Configuration
 from tardis.interfaces.state import State
 from tardis.utilities.attributedict import AttributeDict
 
+if TYPE_CHECKING:
+    from tardis.utilities.asyncbulkcall import BulkStatistics
+    from tardis.utilities.asynccachemap import CacheStatistics
+    from tardis.utilities.circuitbreaker import CircuitState
+
 
 class Plugin(metaclass=ABCMeta):
     @abstractmethod
     async def notify(self, state: State, resource_attributes: AttributeDict) -> None:
         return NotImplemented
+
+    async def notify_many(self, events: Iterable[Tuple[State, AttributeDict]]) -> None:
+        """
+        Notify the plugin about many state changes of drones at once, in order.
+        By default, :py:meth:`notify` is called for each event after another.
+        Plugins may override it to use bulk operations of their backend.
+        """
+        for state, resource_attributes in events:
+            await self.notify(state, resource_attributes)
+
+    def notify_circuit_state(self, site_name: str, state: "CircuitState") -> None:
+        """
+        Notify the plugin about a change of the circuit breaker state of a site.
+        By default, the change is ignored. Plugins may override it to monitor
+        the availability of sites.
+        """
+        return None
+
+    def notify_bulk_execution(self, statistics: "BulkStatistics") -> None:
+        """
+        Notify the plugin about the statistics of a bulk command executed by an
+        adapter. By default, the statistics are ignored. Plugins may override it
+        to monitor the bulk commands of adapters.
+        """
+        return None
+
+    def notify_cache_update(self, statistics: "CacheStatistics") -> None:
+        """
+        Notify the plugin about the health of a cache of an adapter after each
+        update. By default, the statistics are ignored. Plugins may override it
+        to monitor whether adapters work on outdated data.
+        """
+        return None
+
+    def notify_spawn_state(self, name: str, queue_depth: int, rate: float) -> None:
+        """
+        Notify the plugin about a change of the number of drones waiting to
+        deploy their resource or of the rate they are deployed at. By default,
+        the change is ignored. Plugins may override it to monitor deployments.
+        """
+        return None
+
+    @cached_property
+    def notify_timeout(self) -> Optional[float]:
+        """
+        Time in seconds after which a pending notification of the plugin is given up.
+        It is configured via the ``notify_timeout`` option of the plugin and
+        defaults to :py:data:`None` for no timeout.
+        """
+        try:
+            plugin_configuration = getattr(
+                Configuration().Plugins, self.__class__.__name__
+            )
+        except AttributeError:
+            return None
+        return getattr(plugin_configuration, "notify_timeout", None)
@@ -6,9 +6,10 @@ from abc import ABCMeta, abstractmethod
 from cobald.utility.primitives import infinity as inf
 from enum import Enum
 from functools import lru_cache
-from pydantic import BaseModel, conint, validator
-from typing import Optional
+from pydantic import BaseModel, confloat, conint, root_validator, validator
+from typing import Callable, Dict, Iterable, List, Optional, Set, Union
 
+import asyncio
 import logging
 
 logger = logging.getLogger("cobald.runtime.tardis.interfaces.site")
@@ -24,6 +25,18 @@ class SiteConfigurationModel(BaseModel):
     quota: Optional[int] = inf
     drone_minimum_lifetime: Optional[conint(gt=0)] = None
     drone_heartbeat_interval: Optional[conint(ge=0)] = 60
+    drone_heartbeat_intervals: Optional[Dict[str, conint(ge=0)]] = {}
+    drone_heartbeat_backoff: Optional[confloat(ge=1)] = 1.0
+    drone_heartbeat_max_interval: Optional[conint(ge=0)] = None
+    drone_heartbeat_jitter: Optional[confloat(ge=0, le=1)] = 0.1
+    drone_concurrent_updates: Optional[conint(gt=0)] = None
+    drone_heartbeat_tick: Optional[confloat(gt=0)] = None
+    drone_restore_ramp: Optional[confloat(ge=0)] = 0
+    drone_bulk_delay: Optional[confloat(gt=0)] = None
+    drone_spawn_rate: Optional[confloat(gt=0)] = None
+    drone_spawn_burst: Optional[conint(gt=0)] = 1
+    circuit_breaker_threshold: Optional[conint(gt=0)] = None
+    circuit_breaker_cool_down: Optional[confloat(gt=0)] = 60
 
     class Config:
         extra = "forbid"
@@ -33,6 +46,32 @@ class SiteConfigurationModel(BaseModel):
         assert quota != 0, "Zero quota is not a reasonable value"
         return quota
 
+    @validator("drone_heartbeat_intervals")
+    def heartbeat_intervals_validator(
+        cls, intervals: Optional[Dict[str, int]]  # noqa B902
+    ):
+        import tardis.resources.dronestates
+        from .state import State
+
+        state_names = {
+            name
+            for name, state in vars(tardis.resources.dronestates).items()
+            if isinstance(state, type)
+            and issubclass(state, State)
+            and state is not State
+        }
+        unknown = sorted(set(intervals or ()) - state_names)
+        assert not unknown, f"Unknown drone states {', '.join(unknown)}"
+        return intervals
+
+    @root_validator(skip_on_failure=True)
+    def heartbeat_backoff_validator(cls, values):  # noqa B902
+        assert (
+            values["drone_heartbeat_backoff"] == 1
+            or values["drone_heartbeat_max_interval"] is not None
+        ), "drone_heartbeat_backoff requires a drone_heartbeat_max_interval"
+        return values
+
 
 class ResourceStatus(Enum):
     """
@@ -53,6 +92,18 @@ class SiteAdapter(metaclass=ABCMeta):
     opportunistic resources.
     """
 
+    def add_status_listener(self, listener: Callable[[Set[str]], None]) -> None:
+        """
+        Register a listener to be called with the uuids of all drones whose
+        resource status has changed at the resource provider. By default, no
+        changes are published. Site adapters able to detect changes, for example
+        from a watch stream of the resource provider, should override this.
+        :param listener: Callable taking the set of changed drone uuids
+        :type listener: Callable[[Set[str]], None]
+        :return: None
+        """
+        return None
+
     @property
     def configuration(self) -> AttributeDict:
         """
@@ -77,6 +128,22 @@ class SiteAdapter(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    async def deploy_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Union[AttributeDict, Exception]]:
+        """
+        Method to deploy many new resources at a resource provider at once.
+        By default, :py:meth:`deploy_resource` is called for each resource.
+        Adapters may override it to use bulk operations of the resource provider.
+        :param resource_attributes: Describing attributes of each resource,
+        defined in the :py:class:`~tardis.resources.drone.Drone` implementation!
+        :type resource_attributes: Iterable[AttributeDict]
+        :return: Updated describing attributes of each resource or the exception
+        raised when deploying it.
+        :rtype: List[Union[AttributeDict, Exception]]
+        """
+        return await self._fan_out(self.deploy_resource, resource_attributes)
+
     def drone_environment(
         self, drone_uuid: str, meta_data_translation_mapping: AttributeDict
     ) -> dict:
@@ -110,6 +177,39 @@ class SiteAdapter(metaclass=ABCMeta):
         """
         return self.site_configuration.drone_heartbeat_interval
 
+    @property
+    def drone_heartbeat_intervals(self) -> Dict[str, int]:
+        """
+        Property that returns the configuration parameter drone_heartbeat_intervals.
+        It maps the names of drone states to the heartbeat interval used in that
+        state instead of the drone_heartbeat_interval.
+        :return: The heartbeat intervals of the drone per state
+        :rtype: Dict[str, int]
+        """
+        return self.site_configuration.drone_heartbeat_intervals
+
+    @property
+    def drone_heartbeat_backoff(self) -> float:
+        """
+        Property that returns the configuration parameter drone_heartbeat_backoff.
+        It describes the factor by which the heartbeat interval grows for every
+        consecutive update of the drone status not changing its state.
+        :return: The heartbeat backoff factor of the drone
+        :rtype: float
+        """
+        return self.site_configuration.drone_heartbeat_backoff
+
+    @property
+    def drone_heartbeat_max_interval(self) -> Optional[int]:
+        """
+        Property that returns the configuration parameter
+        drone_heartbeat_max_interval. It describes the heartbeat interval up to
+        which the heartbeat backoff is applied.
+        :return: The maximum heartbeat interval of the drone
+        :rtype: int, None
+        """
+        return self.site_configuration.drone_heartbeat_max_interval
+
     @property
     def drone_minimum_lifetime(self) -> [int, None]:
         """
@@ -143,6 +243,24 @@ class SiteAdapter(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    @staticmethod
+    async def _fan_out(
+        resource_call, resource_attributes: Iterable[AttributeDict]
+    ) -> List:
+        """
+        Helper to call a single resource method for each resource concurrently,
+        providing the exception raised for a resource in place of its result.
+        Cancellations are raised instead, since they provide no result.
+        """
+        results = await asyncio.gather(
+            *(resource_call(resource) for resource in resource_attributes),
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, BaseException) and not isinstance(result, Exception):
+                raise result
+        return results
+
     @staticmethod
     def handle_response(
         response, key_translator: dict, translator_functions: dict, **additional_content
@@ -232,6 +350,22 @@ class SiteAdapter(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    async def resource_status_many(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Union[AttributeDict, Exception]]:
+        """
+        Method to check the status of many resources at a resource provider at
+        once. By default, :py:meth:`resource_status` is called for each resource.
+        Adapters may override it to use bulk operations of the resource provider.
+        :param resource_attributes: Describing attributes of each resource,
+        defined in the :py:class:`~tardis.resources.drone.Drone` implementation!
+        :type resource_attributes: Iterable[AttributeDict]
+        :return: Updated describing attributes of each resource or the exception
+        raised when checking its status.
+        :rtype: List[Union[AttributeDict, Exception]]
+        """
+        return await self._fan_out(self.resource_status, resource_attributes)
+
     @property
     @lru_cache(maxsize=16)
     def site_configuration(self) -> AttributeDict:
@@ -284,6 +418,21 @@ class SiteAdapter(metaclass=ABCMeta):
         """
         raise NotImplementedError
 
+    async def stop_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Optional[Exception]]:
+        """
+        Method to stop many resources at a resource provider at once.
+        By default, :py:meth:`stop_resource` is called for each resource.
+        Adapters may override it to use bulk operations of the resource provider.
+        :param resource_attributes: Describing attributes of each resource,
+        defined in the :py:class:`~tardis.resources.drone.Drone` implementation!
+        :type resource_attributes: Iterable[AttributeDict]
+        :return: None or the exception raised when stopping each resource.
+        :rtype: List[Optional[Exception]]
+        """
+        return await self._fan_out(self.stop_resource, resource_attributes)
+
     @abstractmethod
     async def terminate_resource(self, resource_attributes: AttributeDict) -> None:
         """
@@ -295,3 +444,18 @@ class SiteAdapter(metaclass=ABCMeta):
         :return: None
         """
         raise NotImplementedError
+
+    async def terminate_resources(
+        self, resource_attributes: Iterable[AttributeDict]
+    ) -> List[Optional[Exception]]:
+        """
+        Method to terminate many resources at a resource provider at once.
+        By default, :py:meth:`terminate_resource` is called for each resource.
+        Adapters may override it to use bulk operations of the resource provider.
+        :param resource_attributes: Describing attributes of each resource,
+        defined in the :py:class:`~tardis.resources.drone.Drone` implementation!
+        :type resource_attributes: Iterable[AttributeDict]
+        :return: None or the exception raised when terminating each resource.
+        :rtype: List[Optional[Exception]]
+        """
+        return await self._fan_out(self.terminate_resource, resource_attributes)
@@ -1,10 +1,12 @@
-from typing import List, TYPE_CHECKING
+from typing import List, Mapping, TYPE_CHECKING, Union
 
 from abc import ABCMeta, abstractmethod
 
+from .batchsystemadapter import MachineStatus
 from ..utilities.pipeline import PipelineProcessor
 
 if TYPE_CHECKING:
+    from tardis.interfaces.siteadapter import ResourceStatus
     from tardis.resources.drone import Drone
 
 
@@ -27,9 +29,54 @@ class State(metaclass=ABCMeta):
     async def run(cls, drone: "Drone"):
         return NotImplemented
 
+    @classmethod
+    def transition_table(
+        cls,
+    ) -> "Mapping[ResourceStatus, Union[State, Mapping[MachineStatus, State]]]":
+        """
+        Lookup table of the next state, compiled once from :py:attr:`transition`
+
+        The :py:attr:`transition` maps each resource status to the name of the
+        next state or, if the next state depends on the machine status as well,
+        to a mapping of each machine status to the name of the next state. When
+        any next state depends on the machine status, a next state given by name
+        only applies to every machine status.
+
+        Since states do not hold any data, the table provides a ready-made
+        instance of each next state instead of its name.
+        """
+        try:
+            return cls.__dict__["_transition_table"]
+        except KeyError:
+            pass
+        states = {subclass.__name__: subclass() for subclass in State.__subclasses__()}
+        by_machine_status = any(
+            isinstance(row, dict) for row in cls.transition.values()
+        )
+        table = {}
+        for resource_status, row in cls.transition.items():
+            if isinstance(row, dict):
+                table[resource_status] = {
+                    machine_status: states[name] for machine_status, name in row.items()
+                }
+            elif by_machine_status:
+                table[resource_status] = dict.fromkeys(MachineStatus, states[row])
+            else:
+                table[resource_status] = states[row]
+        cls._transition_table = table
+        return table
+
+    @classmethod
+    def pipeline_processor(cls) -> PipelineProcessor:
+        """Processor of the :py:attr:`processing_pipeline`, created once"""
+        try:
+            return cls.__dict__["_pipeline_processor"]
+        except KeyError:
+            cls._pipeline_processor = PipelineProcessor(cls.processing_pipeline)
+            return cls._pipeline_processor
+
     @classmethod
     async def run_processing_pipeline(cls, drone: "Drone"):
-        pipeline_processor = PipelineProcessor(cls.processing_pipeline)
-        return await pipeline_processor.run_pipeline(
-            pipeline_input=cls.transition, drone=drone, current_state=cls
+        return await cls.pipeline_processor().run_pipeline(
+            pipeline_input=cls.transition_table(), drone=drone, current_state=cls
         )
@@ -2,11 +2,14 @@ from ..configuration.configuration import Configuration
 from ..interfaces.plugin import Plugin
 from ..interfaces.state import State
 from ..interfaces.siteadapter import ResourceStatus
+from ..utilities.asyncbulkcall import BulkStatistics
+from ..utilities.asynccachemap import CacheStatistics
 from ..utilities.attributedict import AttributeDict
+from ..utilities.circuitbreaker import CircuitState
 
 import logging
 from aioprometheus.service import Service
-from aioprometheus import Gauge
+from aioprometheus import Counter, Gauge, Histogram
 
 logger = logging.getLogger("cobald.runtime.tardis.plugins.prometheusmonitoring")
 
@@ -39,6 +42,45 @@ class PrometheusMonitoring(Plugin):
         for gauge in self._gauges.values():
             gauge.set({}, 0)
 
+        self._circuit_state = Gauge(
+            "site_circuit_state",
+            "Circuit breaker state of sites (0: closed, 1: half open, 2: open)",
+        )
+
+        self._cache_valid = Gauge(
+            "cache_valid", "Whether cached data of adapters is not outdated"
+        )
+        self._cache_failures = Gauge(
+            "cache_consecutive_failures", "Failed updates of caches in a row"
+        )
+        self._cache_last_update = Gauge(
+            "cache_last_update_timestamp_seconds",
+            "Time of the last successful update of caches",
+        )
+
+        self._spawn_queue_depth = Gauge(
+            "spawn_queue_depth", "Drones waiting to deploy their resource"
+        )
+        self._spawn_rate = Gauge("spawn_rate", "Deployments of drones per second")
+
+        self._bulk_commands = Counter("bulk_commands", "Executed bulk commands")
+        self._bulk_failures = Counter("bulk_failures", "Failed bulk commands")
+        self._bulk_tasks = Counter("bulk_tasks", "Tasks executed by bulk commands")
+        self._bulk_queue_depth = Gauge(
+            "bulk_queue_depth", "Tasks waiting for bulk commands"
+        )
+        self._bulk_size = Histogram(
+            "bulk_size",
+            "Tasks per bulk command",
+            buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+        )
+        self._bulk_wait = Histogram(
+            "bulk_wait_seconds", "Time tasks waited before executing in bulk"
+        )
+        self._bulk_latency = Histogram(
+            "bulk_latency_seconds", "Time bulk commands took to execute"
+        )
+
     async def start(self):
         await self._svr.start(addr=self._addr, port=self._port)
         logger.debug(f"Serving Prometheus metrics on {self._svr.metrics_url}")
@@ -71,3 +113,63 @@ class PrometheusMonitoring(Plugin):
 
         if new_status == ResourceStatus.Deleted:
             self._drones.pop(resource_attributes.drone_uuid, None)
+
+    def notify_circuit_state(self, site_name: str, state: CircuitState) -> None:
+        """
+        Update the Prometheus metric of the circuit breaker state of a site
+
+        :param site_name: Name of the site
+        :type site_name: str
+        :param state: New state of the circuit breaker of the site
+        :type state: CircuitState
+        :return: None
+        """
+        logger.debug(f"Circuit breaker of site {site_name} has changed to {state}")
+        self._circuit_state.set({"site_name": site_name}, state.value)
+
+    def notify_cache_update(self, statistics: CacheStatistics) -> None:
+        """
+        Update the Prometheus metrics of a cache after each attempted update
+
+        :param statistics: Statistics of the cache
+        :type statistics: CacheStatistics
+        :return: None
+        """
+        labels = {"cache": statistics.name}
+        self._cache_valid.set(labels, int(statistics.valid))
+        self._cache_failures.set(labels, statistics.consecutive_failures)
+        self._cache_last_update.set(labels, statistics.last_update.timestamp())
+
+    def notify_spawn_state(self, name: str, queue_depth: int, rate: float) -> None:
+        """
+        Update the Prometheus metrics of the deployments of new drones
+
+        :param name: Name of the site and machine type of the drones
+        :type name: str
+        :param queue_depth: Number of drones waiting to deploy their resource
+        :type queue_depth: int
+        :param rate: Current number of deployments per second
+        :type rate: float
+        :return: None
+        """
+        labels = {"pool": name}
+        self._spawn_queue_depth.set(labels, queue_depth)
+        self._spawn_rate.set(labels, rate)
+
+    def notify_bulk_execution(self, statistics: BulkStatistics) -> None:
+        """
+        Update the Prometheus metrics of a bulk command after each execution
+
+        :param statistics: Statistics of the bulk execution
+        :type statistics: BulkStatistics
+        :return: None
+        """
+        labels = {"command": statistics.command}
+        self._bulk_commands.inc(labels)
+        if statistics.error is not None:
+            self._bulk_failures.inc(labels)
+        self._bulk_tasks.add(labels, statistics.size)
+        self._bulk_queue_depth.set(labels, statistics.queue_depth)
+        self._bulk_size.observe(labels, statistics.size)
+        self._bulk_wait.observe(labels, statistics.wait)
+        self._bulk_latency.observe(labels, statistics.latency)
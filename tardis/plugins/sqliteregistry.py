@@ -5,7 +5,7 @@ from ..interfaces.state import State
 
 from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from typing import List, Dict, Generator
+from typing import List, Dict, Generator, Set
 import asyncio
 import logging
 import sqlite3
@@ -15,6 +15,9 @@ logger = logging.getLogger("cobald.runtime.tardis.plugins.sqliteregistry")
 
 class SqliteRegistry(Plugin):
     thread_pool_executor = ThreadPoolExecutor(max_workers=1)
+    # drones requested to drain remotely but not yet notified about any state
+    # change, shared with the registry of the REST service
+    _drain_requests: Set[str] = set()
 
     def __init__(self):
         """
@@ -35,6 +38,8 @@ class SqliteRegistry(Plugin):
             for machine_type in getattr(configuration, site.name).MachineTypes:
                 self.add_machine_types(site.name, machine_type)
 
+        self._load_drain_requests()
+
     def add_machine_types(self, site_name: str, machine_type: str) -> None:
         if self._get_machine_type(site_name, machine_type):
             logger.debug(
@@ -56,6 +61,31 @@ class SqliteRegistry(Plugin):
             sql_query, {"site_name": site_name, "machine_type": machine_type}
         )
 
+    def add_drain_request(self, drone_uuid: str) -> None:
+        """
+        Record that the drone ``drone_uuid`` has been requested to drain,
+        after its state has been set to ``DrainState`` in the database
+        """
+        self._drain_requests.add(drone_uuid)
+
+    def drain_requested(self, drone_uuid: str) -> bool:
+        """
+        Check whether the drone ``drone_uuid`` has been requested to drain
+        without querying the database
+        """
+        return drone_uuid in self._drain_requests
+
+    def _load_drain_requests(self) -> None:
+        sql_query = """
+        SELECT R.drone_uuid
+        FROM Resources R
+        JOIN ResourceStates RS ON R.state_id = RS.state_id
+        WHERE RS.state = 'DrainState'"""
+        self._drain_requests.clear()
+        self._drain_requests.update(
+            row["drone_uuid"] for row in self.execute(sql_query, {})
+        )
+
     def add_site(self, site_name: str) -> None:
         if self._get_site(site_name):
             logger.debug(
@@ -196,6 +226,8 @@ class SqliteRegistry(Plugin):
         bind_parameters = {"state": state}
         bind_parameters.update(resource_attributes)
         await self._dispatch_on_state.get(state, self.update_resource)(bind_parameters)
+        # the state of the drone in the database supersedes any drain request
+        self._drain_requests.discard(resource_attributes["drone_uuid"])
 
     async def update_resource(self, bind_parameters: Dict) -> None:
         sql_query = """UPDATE Resources SET updated = :updated,
@@ -5,6 +5,7 @@ from ..utilities.attributedict import AttributeDict
 
 import aiotelegraf
 from datetime import datetime
+from typing import Iterable, Tuple
 import logging
 import platform
 
@@ -40,8 +41,27 @@ class TelegrafMonitoring(Plugin):
         :type resource_attributes: AttributeDict
         :return: None
         """
-        logger.debug(f"Drone: {str(resource_attributes)} has changed state to {state}")
         await self.client.connect()
+        self._metric(state, resource_attributes)
+        await self.client.close()
+
+    async def notify_many(self, events: Iterable[Tuple[State, AttributeDict]]) -> None:
+        """
+        Push many state changes of drones into the telegraf server using a single
+        connection
+
+        :param events: State changes as pairs of the new state of the Drone and
+            its meta-data
+        :type events: Iterable[Tuple[State, AttributeDict]]
+        :return: None
+        """
+        await self.client.connect()
+        for state, resource_attributes in events:
+            self._metric(state, resource_attributes)
+        await self.client.close()
+
+    def _metric(self, state: State, resource_attributes: AttributeDict) -> None:
+        logger.debug(f"Drone: {str(resource_attributes)} has changed state to {state}")
         data = dict(
             state=str(state),
             created=datetime.timestamp(resource_attributes.created),
@@ -53,4 +73,3 @@ class TelegrafMonitoring(Plugin):
             drone_uuid=resource_attributes.drone_uuid,
         )
         self.client.metric(self.metric, data, tags=tags)
-        await self.client.close()
@@ -1,4 +1,4 @@
-from typing import List, Union, Optional, Type
+from typing import Awaitable, Callable, List, Union, Optional, Type
 
 from tardis.agents.batchsystemagent import BatchSystemAgent
 from tardis.agents.siteagent import SiteAgent
@@ -8,6 +8,9 @@ from tardis.interfaces.state import State
 from .dronestates import DownState, RequestState
 from ..plugins.sqliteregistry import SqliteRegistry
 from ..utilities.attributedict import AttributeDict
+from ..utilities.droneattributes import DroneAttributes
+from ..utilities.heartbeatscheduler import HeartbeatScheduler
+from ..utilities.spawnlimiter import SpawnLimiter
 from ..utilities.utils import load_states
 from cobald.daemon import service
 from cobald.interfaces import Pool
@@ -34,13 +37,23 @@ class Drone(Pool):
         state: Optional[State] = None,
         created: Optional[float] = None,
         updated: Optional[float] = None,
+        heartbeat_scheduler: Optional[HeartbeatScheduler] = None,
+        restore: Optional[Callable[["Drone"], Awaitable[None]]] = None,
+        spawn_limiter: Optional[SpawnLimiter] = None,
     ):
         self._site_agent = site_agent
         self._batch_system_agent = batch_system_agent
         self._plugins = plugins or []
         self._state = state
-
-        self.resource_attributes = AttributeDict(
+        self._heartbeat_scheduler = heartbeat_scheduler or HeartbeatScheduler()
+        # awaited before the first state update of a restored drone
+        self._restore = restore
+        # limits the rate of deploying new resources, shared per machine type
+        self._spawn_limiter = spawn_limiter
+        # number of consecutive state updates not changing the state
+        self._unchanged_heartbeats = 0
+
+        self.resource_attributes = DroneAttributes(
             site_name=self._site_agent.site_name,
             machine_type=self.site_agent.machine_type,
             obs_machine_meta_data_translation_mapping=self.batch_system_agent.machine_meta_data_translation_mapping,  # noqa B950
@@ -79,6 +92,12 @@ class Drone(Pool):
         except (IndexError, AttributeError):
             return None
 
+    def drain_requested(self) -> bool:
+        try:
+            return self._database.drain_requested(self.resource_attributes.drone_uuid)
+        except AttributeError:
+            return False
+
     @property
     def demand(self) -> float:
         return self._demand
@@ -88,8 +107,25 @@ class Drone(Pool):
         self._demand = value
 
     @property
-    def heartbeat_interval(self) -> int:
-        return self.site_agent.drone_heartbeat_interval
+    def heartbeat_scheduler(self) -> HeartbeatScheduler:
+        return self._heartbeat_scheduler
+
+    @property
+    def heartbeat_interval(self) -> float:
+        """
+        Time until the next state update, depending on the current state and
+        backed off for every consecutive state update not changing the state
+        """
+        site_agent = self.site_agent
+        interval = site_agent.drone_heartbeat_intervals.get(
+            self.state.__class__.__name__, site_agent.drone_heartbeat_interval
+        )
+        if not self._unchanged_heartbeats:
+            return interval
+        return min(
+            interval * site_agent.drone_heartbeat_backoff**self._unchanged_heartbeats,
+            max(interval, site_agent.drone_heartbeat_max_interval),
+        )
 
     @property
     def minimum_lifetime(self) -> [int, None]:
@@ -99,6 +135,10 @@ class Drone(Pool):
     def maximum_demand(self) -> float:
         return self.site_agent.machine_meta_data["Cores"]
 
+    @property
+    def spawn_limiter(self) -> Optional[SpawnLimiter]:
+        return self._spawn_limiter
+
     @property
     def supply(self) -> float:
         return self._supply
@@ -119,21 +159,35 @@ class Drone(Pool):
             # initiate the first state change here
             #
             # In addition, all necessary attributes in `resource_attributes`
-            # `AttributeDict` need to be present and have meaningful defaults.
+            # `DroneAttributes` need to be present and have meaningful defaults.
             # `resource_status` should be set to `ResourceStatus.Booting` on
             # newly created drones by default.
             self.resource_attributes.resource_status = ResourceStatus.Booting
             await self.set_state(RequestState())
+        elif self._restore is not None:
+            await self._restore(self)
         while True:
             current_state = self.state
-            await current_state.run(self)
+            spawn_limiter = self.spawn_limiter
+            if spawn_limiter is not None and isinstance(current_state, RequestState):
+                # wait for the deployment outside the concurrency limit of
+                # updates, waiting drones must not block updates of the others
+                await spawn_limiter.acquire()
+            await self.heartbeat_scheduler.update(current_state.run, self)
             if isinstance(current_state, DownState):
                 logger.debug(
                     f"Garbage Collect Drone: {self.resource_attributes.drone_uuid}"
                 )
                 self._demand = 0
                 return
-            await asyncio.sleep(self.heartbeat_interval)
+            # states are recreated on every transition, even to the same state
+            if type(self.state) is not type(current_state):
+                self._unchanged_heartbeats = 0
+            elif self.site_agent.drone_heartbeat_backoff > 1 and (
+                self.heartbeat_interval < self.site_agent.drone_heartbeat_max_interval
+            ):
+                self._unchanged_heartbeats += 1
+            await self.heartbeat_scheduler.sleep(self.heartbeat_interval, key=self)
 
     def register_plugins(self, observer: Union[List[Plugin], Plugin]) -> None:
         self._plugins.append(observer)
@@ -155,5 +209,34 @@ class Drone(Pool):
         return self._state
 
     async def notify_plugins(self) -> None:
-        for plugin in self._plugins:
-            await plugin.notify(self.state, self.resource_attributes)
+        """
+        Notify all plugins concurrently about the current state, each of them
+        isolated from failures and timeouts of the others
+        """
+        await asyncio.gather(
+            *(
+                self._notify_plugin(plugin, self.state, self.resource_attributes)
+                for plugin in self._plugins
+            )
+        )
+
+    @staticmethod
+    async def _notify_plugin(
+        plugin: Plugin, state: State, resource_attributes: AttributeDict
+    ) -> None:
+        plugin_name = plugin.__class__.__name__
+        try:
+            await asyncio.wait_for(
+                plugin.notify(state, resource_attributes), timeout=plugin.notify_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Notifying plugin {plugin_name} about {state} of drone"
+                f" {resource_attributes.drone_uuid} timed out"
+                f" after {plugin.notify_timeout}s"
+            )
+        except Exception as err:
+            logger.warning(
+                f"Notifying plugin {plugin_name} about {state} of drone"
+                f" {resource_attributes.drone_uuid} failed: {err!r}"
+            )
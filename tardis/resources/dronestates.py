@@ -2,8 +2,11 @@ from collections import defaultdict
 from datetime import datetime
 import asyncio
 import logging
+import time
 
 from typing import TYPE_CHECKING
+from typing import Iterable
+from typing import Set
 from typing import Type
 
 from ..exceptions.tardisexceptions import TardisAuthError
@@ -18,6 +21,7 @@ from ..utilities.pipeline import StopProcessing
 
 if TYPE_CHECKING:
     from tardis.resources.drone import Drone
+    from tardis.utilities.heartbeatscheduler import HeartbeatScheduler
 
 logger = logging.getLogger("cobald.runtime.tardis.resources.dronestates")
 
@@ -28,16 +32,14 @@ async def batchsystem_machine_status(
     machine_status = await drone.batch_system_agent.get_machine_status(
         drone_uuid=drone.resource_attributes["drone_uuid"]
     )
-    return state_transition[machine_status]()
+    return state_transition[machine_status]
 
 
 async def check_remote_draining(
     state_transition, drone: "Drone", current_state: Type[State]
 ):
-    database_state = await drone.database_state()
-
-    if database_state is DrainState and database_state is not current_state:
-        raise StopProcessing(last_result=database_state())
+    if current_state is not DrainState and drone.drain_requested():
+        raise StopProcessing(last_result=DrainState())
     return state_transition
 
 
@@ -76,37 +78,82 @@ async def resource_status(state_transition, drone: "Drone", current_state: Type[
         #  Try to cleanup crashed resources
         raise StopProcessing(last_result=CleanupState()) from tdc
     else:
-        return state_transition[drone.resource_attributes.resource_status]()
+        return state_transition[drone.resource_attributes.resource_status]
+
+
+async def prefetch_resource_status(drones: Iterable["Drone"], max_age: float) -> None:
+    """
+    Query the resource status of many drones in bulk ahead of their next state
+    update within ``max_age`` seconds. Only drones whose current state processes
+    the resource status are taken into account.
+    """
+    resources = defaultdict(list)
+    for drone in drones:
+        if resource_status in drone.state.processing_pipeline:
+            resources[drone.site_agent].append(drone.resource_attributes)
+    await asyncio.gather(
+        *(
+            site_agent.prefetch_resource_status(resource_attributes, max_age)
+            for site_agent, resource_attributes in resources.items()
+        )
+    )
+
+
+def wake_drones(heartbeat_scheduler: "HeartbeatScheduler", drone_uuids: Set[str]):
+    """
+    Wake up all drones waiting for their next heartbeat whose status is known to
+    have changed, so that they react without waiting out their heartbeat interval.
+    """
+    woken = heartbeat_scheduler.wake(
+        lambda drone: drone.resource_attributes.drone_uuid in drone_uuids
+    )
+    logger.debug(f"Woke up {woken} drones due to status changes")
 
 
 class RequestState(State):
     @classmethod
     async def run(cls, drone: "Drone"):
         logger.info(f"Drone {drone.resource_attributes} in RequestState")
+        # the drone has acquired a deployment token before running this state
+        spawn_limiter = drone.spawn_limiter
+        if spawn_limiter is not None and not drone.demand:
+            # no resource has been deployed, nothing to clean up
+            spawn_limiter.release()
+            await drone.set_state(DownState())
+            return
+        started = time.monotonic()
         try:
             drone.resource_attributes.update(
                 await drone.site_agent.deploy_resource(drone.resource_attributes)
             )
+        except TardisQuotaExceeded:
+            if spawn_limiter is None:
+                await drone.set_state(DownState())
+            else:
+                # slow down and retry at the next heartbeat
+                spawn_limiter.throttle(started=started)
+                await drone.set_state(RequestState())
         except (
             TardisAuthError,
             TardisTimeout,
-            TardisQuotaExceeded,
             TardisResourceStatusUpdateFailed,
         ):
             await drone.set_state(DownState())
         except TardisDroneCrashed:
             await drone.set_state(CleanupState())
         else:
+            if spawn_limiter is not None:
+                spawn_limiter.recover()
             await drone.set_state(BootingState())
 
 
 class BootingState(State):
     transition = {
-        ResourceStatus.Booting: lambda: BootingState(),
-        ResourceStatus.Running: lambda: IntegrateState(),
-        ResourceStatus.Deleted: lambda: DownState(),
-        ResourceStatus.Stopped: lambda: CleanupState(),
-        ResourceStatus.Error: lambda: CleanupState(),
+        ResourceStatus.Booting: "BootingState",
+        ResourceStatus.Running: "IntegrateState",
+        ResourceStatus.Deleted: "DownState",
+        ResourceStatus.Stopped: "CleanupState",
+        ResourceStatus.Error: "CleanupState",
     }
 
     processing_pipeline = [check_demand, resource_status]
@@ -129,16 +176,16 @@ class IntegrateState(State):
 
 class IntegratingState(State):
     transition = {
-        ResourceStatus.Running: lambda: {
-            MachineStatus.NotAvailable: lambda: IntegratingState(),
-            MachineStatus.Available: lambda: AvailableState(),
-            MachineStatus.Draining: lambda: DrainingState(),
-            MachineStatus.Drained: lambda: DisintegrateState(),
+        ResourceStatus.Running: {
+            MachineStatus.NotAvailable: "IntegratingState",
+            MachineStatus.Available: "AvailableState",
+            MachineStatus.Draining: "DrainingState",
+            MachineStatus.Drained: "DisintegrateState",
         },
-        ResourceStatus.Booting: lambda: defaultdict(lambda: BootingState),
-        ResourceStatus.Deleted: lambda: defaultdict(lambda: DownState),
-        ResourceStatus.Stopped: lambda: defaultdict(lambda: CleanupState),
-        ResourceStatus.Error: lambda: defaultdict(lambda: CleanupState),
+        ResourceStatus.Booting: "BootingState",
+        ResourceStatus.Deleted: "DownState",
+        ResourceStatus.Stopped: "CleanupState",
+        ResourceStatus.Error: "CleanupState",
     }
 
     processing_pipeline = [resource_status, batchsystem_machine_status]
@@ -151,16 +198,16 @@ class IntegratingState(State):
 
 class AvailableState(State):
     transition = {
-        ResourceStatus.Running: lambda: {
-            MachineStatus.Available: lambda: AvailableState(),
-            MachineStatus.NotAvailable: lambda: ShutDownState(),
-            MachineStatus.Draining: lambda: DrainingState(),
-            MachineStatus.Drained: lambda: DisintegrateState(),
+        ResourceStatus.Running: {
+            MachineStatus.Available: "AvailableState",
+            MachineStatus.NotAvailable: "ShutDownState",
+            MachineStatus.Draining: "DrainingState",
+            MachineStatus.Drained: "DisintegrateState",
         },
-        ResourceStatus.Booting: lambda: defaultdict(lambda: BootingState),
-        ResourceStatus.Deleted: lambda: defaultdict(lambda: DownState),
-        ResourceStatus.Stopped: lambda: defaultdict(lambda: CleanupState),
-        ResourceStatus.Error: lambda: defaultdict(lambda: CleanupState),
+        ResourceStatus.Booting: "BootingState",
+        ResourceStatus.Deleted: "DownState",
+        ResourceStatus.Stopped: "CleanupState",
+        ResourceStatus.Error: "CleanupState",
     }
 
     processing_pipeline = [
@@ -202,18 +249,18 @@ class DrainState(State):
 
 class DrainingState(State):
     transition = {
-        ResourceStatus.Running: lambda: {
-            MachineStatus.Draining: lambda: DrainingState(),
-            MachineStatus.Available: lambda: DrainState(),
-            MachineStatus.Drained: lambda: DisintegrateState(),
-            MachineStatus.NotAvailable: lambda: ShutDownState(),
+        ResourceStatus.Running: {
+            MachineStatus.Draining: "DrainingState",
+            MachineStatus.Available: "DrainState",
+            MachineStatus.Drained: "DisintegrateState",
+            MachineStatus.NotAvailable: "ShutDownState",
         },
         # In case the job is retried by HTCondor, resources can transition to
         # BootingState again. In this case the job should be removed.
-        ResourceStatus.Booting: lambda: defaultdict(lambda: CleanupState),
-        ResourceStatus.Deleted: lambda: defaultdict(lambda: DownState),
-        ResourceStatus.Stopped: lambda: defaultdict(lambda: CleanupState),
-        ResourceStatus.Error: lambda: defaultdict(lambda: CleanupState),
+        ResourceStatus.Booting: "CleanupState",
+        ResourceStatus.Deleted: "DownState",
+        ResourceStatus.Stopped: "CleanupState",
+        ResourceStatus.Error: "CleanupState",
     }
     processing_pipeline = [resource_status, batchsystem_machine_status]
 
@@ -237,11 +284,11 @@ class ShutDownState(State):
     transition = {
         # In case the job is retried by HTCondor, resources can transition to
         # BootingState again. In this case the job should be removed.
-        ResourceStatus.Booting: lambda: CleanupState(),
-        ResourceStatus.Running: lambda: ShuttingDownState(),
-        ResourceStatus.Stopped: lambda: CleanupState(),
-        ResourceStatus.Deleted: lambda: DownState(),
-        ResourceStatus.Error: lambda: CleanupState(),
+        ResourceStatus.Booting: "CleanupState",
+        ResourceStatus.Running: "ShuttingDownState",
+        ResourceStatus.Stopped: "CleanupState",
+        ResourceStatus.Deleted: "DownState",
+        ResourceStatus.Error: "CleanupState",
     }
 
     processing_pipeline = [resource_status]
@@ -270,11 +317,11 @@ class ShuttingDownState(State):
     transition = {
         # In case the job is retried by HTCondor, resources can transition to
         # BootingState again. In this case the job should be removed.
-        ResourceStatus.Booting: lambda: CleanupState(),
-        ResourceStatus.Running: lambda: ShuttingDownState(),
-        ResourceStatus.Stopped: lambda: CleanupState(),
-        ResourceStatus.Deleted: lambda: DownState(),
-        ResourceStatus.Error: lambda: CleanupState(),
+        ResourceStatus.Booting: "CleanupState",
+        ResourceStatus.Running: "ShuttingDownState",
+        ResourceStatus.Stopped: "CleanupState",
+        ResourceStatus.Deleted: "DownState",
+        ResourceStatus.Error: "CleanupState",
     }
     processing_pipeline = [resource_status]
 
@@ -290,11 +337,11 @@ class ShuttingDownState(State):
 
 class CleanupState(State):
     transition = {
-        ResourceStatus.Booting: lambda: CleanupState(),
-        ResourceStatus.Running: lambda: DrainState(),
-        ResourceStatus.Stopped: lambda: CleanupState(),
-        ResourceStatus.Deleted: lambda: DownState(),
-        ResourceStatus.Error: lambda: CleanupState(),
+        ResourceStatus.Booting: "CleanupState",
+        ResourceStatus.Running: "DrainState",
+        ResourceStatus.Stopped: "CleanupState",
+        ResourceStatus.Deleted: "DownState",
+        ResourceStatus.Error: "CleanupState",
     }
     processing_pipeline = [resource_status]
 
@@ -5,7 +5,17 @@ from tardis.interfaces.state import State
 from ..agents.batchsystemagent import BatchSystemAgent
 from ..agents.siteagent import SiteAgent
 from ..configuration.configuration import Configuration
+from ..interfaces.siteadapter import SiteConfigurationModel
 from ..resources.drone import Drone
+from ..resources.dronestates import prefetch_resource_status
+from ..resources.dronestates import wake_drones
+from ..resources.restoreramp import RestoreRamp
+from ..utilities.asyncbulkcall import add_bulk_listener
+from ..utilities.asynccachemap import add_cache_listener
+from ..utilities.circuitbreaker import CircuitBreaker
+from ..utilities.heartbeatscheduler import HeartbeatScheduler
+from ..utilities.plugineventqueue import PluginEventQueue
+from ..utilities.spawnlimiter import SpawnLimiter
 from ..utilities.utils import load_states
 
 from cobald.composite.weighted import WeightedComposite
@@ -33,6 +43,10 @@ def create_composite_pool(configuration: str = None) -> WeightedComposite:
     batch_system_agent = BatchSystemAgent(batch_system_adapter=batch_system_adapter())
 
     plugins = load_plugins()
+    # plugins monitor the bulk commands and caches of all adapters
+    for plugin in plugins.values():
+        add_bulk_listener(plugin.notify_bulk_execution)
+        add_cache_listener(plugin.notify_cache_update)
 
     for site in configuration.Sites:
         site_composites = []
@@ -40,21 +54,39 @@ def create_composite_pool(configuration: str = None) -> WeightedComposite:
             import_module(name=f"tardis.adapters.sites.{site.adapter.lower()}"),
             f"{site.adapter}Adapter",
         )
+        site_configuration = SiteConfigurationModel(**site)
+        heartbeat_scheduler = create_heartbeat_scheduler(site_configuration)
+        drone_restore_ramp = site_configuration.drone_restore_ramp
+        circuit_breaker = create_circuit_breaker(site_configuration, plugins)
+        # wake up drones as soon as a change of their status is published
+        status_listener = partial(wake_drones, heartbeat_scheduler)
+        batch_system_agent.add_status_listener(status_listener)
         for machine_type in getattr(configuration, site.name).MachineTypes:
             site_agent = SiteAgent(
-                site_adapter(machine_type=machine_type, site_name=site.name)
+                site_adapter(machine_type=machine_type, site_name=site.name),
+                circuit_breaker=circuit_breaker,
+                bulk_delay=site_configuration.drone_bulk_delay,
             )
+            site_agent.add_status_listener(status_listener)
 
             check_pointed_resources = get_drones_to_restore(plugins, site, machine_type)
+            # spread restored drones instead of updating all of them at once
+            restore_ramp = (
+                RestoreRamp(ramp=drone_restore_ramp) if drone_restore_ramp else None
+            )
             check_pointed_drones = [
                 create_drone(
                     site_agent=site_agent,
                     batch_system_agent=batch_system_agent,
                     plugins=plugins.values(),
+                    heartbeat_scheduler=heartbeat_scheduler,
+                    restore=restore_ramp,
                     **resource_attributes,
                 )
                 for resource_attributes in check_pointed_resources
             ]
+            if restore_ramp is not None:
+                restore_ramp.add_drones(check_pointed_drones)
 
             # create drone factory for COBalD FactoryPool
             drone_factory = partial(
@@ -62,6 +94,10 @@ def create_composite_pool(configuration: str = None) -> WeightedComposite:
                 site_agent=site_agent,
                 batch_system_agent=batch_system_agent,
                 plugins=plugins.values(),
+                heartbeat_scheduler=heartbeat_scheduler,
+                spawn_limiter=create_spawn_limiter(
+                    site_configuration, machine_type, plugins
+                ),
             )
 
             site_composites.append(
@@ -89,6 +125,9 @@ def create_drone(
     state: Optional[State] = None,
     created: float = None,
     updated: float = None,
+    heartbeat_scheduler: Optional[HeartbeatScheduler] = None,
+    restore: Optional[RestoreRamp] = None,
+    spawn_limiter: Optional[SpawnLimiter] = None,
 ):
     return Drone(
         site_agent=site_agent,
@@ -99,9 +138,70 @@ def create_drone(
         state=state,
         created=created,
         updated=updated,
+        heartbeat_scheduler=heartbeat_scheduler,
+        restore=restore,
+        spawn_limiter=spawn_limiter,
+    )
+
+
+def create_circuit_breaker(
+    site_configuration, plugins: dict
+) -> Optional[CircuitBreaker]:
+    """
+    Create the circuit breaker shared by all agents of a site, if a threshold is
+    configured for the site. Plugins are notified about its state changes.
+    """
+    if site_configuration.circuit_breaker_threshold is None:
+        return None
+    circuit_breaker = CircuitBreaker(
+        name=site_configuration.name,
+        failure_threshold=site_configuration.circuit_breaker_threshold,
+        cool_down=site_configuration.circuit_breaker_cool_down,
+    )
+    for plugin in plugins.values():
+        circuit_breaker.add_state_listener(plugin.notify_circuit_state)
+    return circuit_breaker
+
+
+def create_heartbeat_scheduler(site_configuration) -> HeartbeatScheduler:
+    """
+    Create the heartbeat scheduler shared by all drones of a site. In tick mode,
+    the resource status of all drones due in the same tick is queried in bulk
+    and used during that tick only.
+    """
+    tick = site_configuration.drone_heartbeat_tick
+    return HeartbeatScheduler(
+        jitter=site_configuration.drone_heartbeat_jitter,
+        concurrent=site_configuration.drone_concurrent_updates,
+        tick=tick,
+        prepare=(
+            partial(prefetch_resource_status, max_age=tick)
+            if tick is not None
+            else None
+        ),
     )
 
 
+def create_spawn_limiter(
+    site_configuration, machine_type: str, plugins: dict
+) -> Optional[SpawnLimiter]:
+    """
+    Create the spawn limiter shared by all new drones of a machine type, if a
+    spawn rate is configured for the site. Plugins are notified about changes
+    of its queue depth and rate.
+    """
+    if site_configuration.drone_spawn_rate is None:
+        return None
+    spawn_limiter = SpawnLimiter(
+        rate=site_configuration.drone_spawn_rate,
+        burst=site_configuration.drone_spawn_burst,
+        name=f"{site_configuration.name.lower()}_{machine_type.lower()}",
+    )
+    for plugin in plugins.values():
+        spawn_limiter.add_state_listener(plugin.notify_spawn_state)
+    return spawn_limiter
+
+
 def get_drones_to_restore(plugins: dict, site, machine_type: str):
     """Restore check_pointed resources from previously running tardis instance"""
     try:
@@ -123,9 +223,20 @@ def load_plugins():
     else:
 
         def create_instance(plugin):
-            return getattr(
+            instance = getattr(
                 import_module(name=f"tardis.plugins.{plugin.lower()}"), f"{plugin}"
             )()
+            # optionally decouple the plugin from drones by an event queue
+            event_queue = plugin_configuration[plugin].get("event_queue")
+            if event_queue is None:
+                return instance
+            if plugin == "SqliteRegistry":
+                # drones and the restore of drones query the registry directly
+                raise ValueError(
+                    "SqliteRegistry does not support an 'event_queue', it must"
+                    " store each state change before the drone proceeds"
+                )
+            return PluginEventQueue(instance, **event_queue)
 
         return {
             plugin: create_instance(plugin) for plugin in plugin_configuration.keys()
@@ -0,0 +1,67 @@
+from .dronestates import prefetch_resource_status
+
+from typing import Dict, Iterable, List, Optional, TYPE_CHECKING
+import asyncio
+import logging
+
+if TYPE_CHECKING:
+    from .drone import Drone
+
+logger = logging.getLogger("cobald.runtime.tardis.resources.restoreramp")
+
+
+class RestoreRamp(object):
+    """
+    Staggered start of drones restored from a previously running tardis instance
+
+    :param ramp: time window in seconds to spread the first state update of the
+        restored drones over
+
+    Instead of all restored drones updating their state at once, the resource
+    status of all of them is first queried in bulk, one query per site and
+    machine type. The drones then start with their known resource status, their
+    first state updates evenly spread over the ``ramp`` window.
+
+    The :py:class:`~.RestoreRamp` is awaited by each restored drone before its
+    first state update, see :py:meth:`~.__call__`.
+    """
+
+    def __init__(self, ramp: float):
+        self._ramp = ramp
+        self._drones: List["Drone"] = []
+        # delay of the first state update of each drone
+        self._delays: Dict["Drone", float] = {}
+        # task querying the resource status of all drones in bulk
+        self._warm_up: Optional[asyncio.Task] = None
+        self._verify_settings()
+
+    def _verify_settings(self):
+        if not self._ramp >= 0:
+            raise ValueError(f"expected 'ramp' >= 0, got {self._ramp!r} instead")
+
+    def add_drones(self, drones: Iterable["Drone"]) -> None:
+        """Add restored ``drones`` to spread over the ramp window"""
+        self._drones.extend(drones)
+        step = self._ramp / len(self._drones) if self._drones else 0.0
+        self._delays = {drone: index * step for index, drone in enumerate(self._drones)}
+
+    async def __call__(self, drone: "Drone") -> None:
+        """Wait until the first state update of a restored ``drone`` is due"""
+        if self._warm_up is None:
+            self._warm_up = asyncio.ensure_future(self._warm_up_drones())
+        # a drone being cancelled must not cancel warming up the others
+        await asyncio.shield(self._warm_up)
+        await asyncio.sleep(self._delays.pop(drone, 0.0))
+
+    async def _warm_up_drones(self) -> None:
+        drones, self._drones = self._drones, []
+        try:
+            # the first state updates of all drones are due within the ramp window
+            await prefetch_resource_status(drones, max_age=self._ramp)
+        except Exception as err:
+            logger.warning(
+                f"Querying the resource status of {len(drones)} restored drones"
+                f" failed: {err!r}"
+            )
+        else:
+            logger.debug(f"Queried the resource status of {len(drones)} drones")
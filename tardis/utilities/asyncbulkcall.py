@@ -1,10 +1,17 @@
-from functools import cached_property
-from typing import TypeVar, Generic, Iterable, List, Tuple, Optional, Set
+from enum import IntEnum
+from functools import cached_property, partial
+from itertools import count
+from typing import TypeVar, Generic, Iterable, List, Mapping, Tuple, Optional, Set
+from typing import Callable, Dict, Hashable, NamedTuple, Sequence, Type, Union
 from typing_extensions import Protocol
 import asyncio
+import logging
+import math
 import time
 import sys
 
+logger = logging.getLogger("cobald.runtime.tardis.utilities.asyncbulkcall")
+
 
 T = TypeVar("T")
 R = TypeVar("R")
@@ -16,13 +23,139 @@ class BulkCommand(Protocol[T, R]):
 
     A bulk command must take an arbitrary number of tasks and is expected to provide
     an iterable of one result per task. Alternatively, it may provide a single
-    :py:data:`None` value to indicate that there is no result. An unhandled
-    :py:class:`Exception` means that all tasks failed with that :py:class:`Exception`.
+    :py:data:`None` value to indicate that there is no result. An :py:class:`Exception`
+    provided in place of a result means that only its task failed with that
+    :py:class:`Exception`. An unhandled :py:class:`Exception` means that all tasks
+    failed with that :py:class:`Exception`.
     """
 
     async def __call__(self, *__tasks: T) -> Optional[Iterable[R]]: ...  # noqa E704
 
 
+class BulkPriority(IntEnum):
+    """
+    Priority classes of tasks queued in an :py:class:`~.AsyncBulkCall`
+    """
+
+    High = 0
+    Normal = 1
+    Low = 2
+
+
+#: queued task as (priority, tie breaker, arrival time, task, result)
+QueueItem = Tuple[BulkPriority, int, float, T, "asyncio.Future[R]"]
+
+
+class BulkStatistics(NamedTuple):
+    """Statistics of a single bulk execution as provided to bulk listeners"""
+
+    #: name of the :py:class:`~.AsyncBulkCall` that executed the bulk
+    command: str
+    #: number of tasks passed to the command
+    size: int
+    #: number of tasks still waiting in the queue when the bulk started
+    queue_depth: int
+    #: time in seconds the oldest task of the bulk waited before execution
+    wait: float
+    #: time in seconds the command took to execute
+    latency: float
+    #: exception the command failed with, if any
+    error: Optional[Exception]
+
+
+_bulk_listeners: List[Callable[[BulkStatistics], None]] = []
+
+
+def add_bulk_listener(listener: Callable[[BulkStatistics], None]) -> None:
+    """
+    Add a ``listener`` called with the :py:class:`~.BulkStatistics` of every bulk
+    executed by any :py:class:`~.AsyncBulkCall`
+    """
+    _bulk_listeners.append(listener)
+
+
+def remove_bulk_listener(listener: Callable[[BulkStatistics], None]) -> None:
+    """Remove a ``listener`` previously added via :py:func:`~.add_bulk_listener`"""
+    _bulk_listeners.remove(listener)
+
+
+class AdaptiveBulkController(object):
+    """
+    Controller tuning the size and delay of bulks to the observed load
+
+    :param max_size: upper bound of the bulk size
+    :param max_delay: upper bound of the bulk delay
+    :param min_delay: lower bound of the bulk delay
+    :param smoothing: weight of each new observation in the moving averages
+
+    The controller keeps moving averages of the time between arriving tasks and
+    of the command latency. At low load, when less than two tasks are expected
+    to arrive within ``max_delay``, waiting for more tasks is pointless and bulks
+    are executed after ``min_delay``. At higher load, bulks are collected about
+    as long as a command takes, since collecting more tasks for a slow command
+    pays off more. The bulk size is chosen to hold twice the tasks expected
+    within the delay, up to ``max_size``.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_delay: float,
+        min_delay: float,
+        smoothing: float = 0.2,
+    ):
+        self._max_size = max_size
+        self._max_delay = max_delay
+        self._min_delay = min_delay
+        self._smoothing = smoothing
+        # moving averages are unknown before the first observations
+        self._interarrival: Optional[float] = None
+        self._latency: Optional[float] = None
+        self._last_arrival: Optional[float] = None
+
+    @property
+    def rate(self) -> float:
+        """Moving average of tasks arriving per second"""
+        if self._interarrival is None:
+            return 0.0
+        return 1 / self._interarrival if self._interarrival > 0 else math.inf
+
+    @property
+    def delay(self) -> float:
+        """Current maximum time window for tasks to execute in one bulk"""
+        if self._latency is None or self.rate * self._max_delay < 2:
+            return self._min_delay
+        return min(self._max_delay, max(self._min_delay, self._latency))
+
+    @property
+    def size(self) -> int:
+        """Current maximum number of tasks to execute in one bulk"""
+        expected = 2 * self.rate * self.delay
+        if expected >= self._max_size:
+            return self._max_size
+        return max(1, math.ceil(expected))
+
+    def arrived(self) -> None:
+        """Observe the arrival of a task"""
+        now = time.monotonic()
+        if self._last_arrival is not None:
+            interarrival = now - self._last_arrival
+            if self._interarrival is None:
+                self._interarrival = interarrival
+            else:
+                self._interarrival += self._smoothing * (
+                    interarrival - self._interarrival
+                )
+        self._last_arrival = now
+
+    def executed(self, latency: float) -> None:
+        """Observe the ``latency`` of a command execution"""
+        if self._latency is None:
+            self._latency = latency
+        else:
+            self._latency += self._smoothing * (latency - self._latency)
+
+
 class AsyncBulkCall(Generic[T, R]):
     """
     Framework for queueing and executing several tasks via bulk commands
@@ -31,6 +164,16 @@ class AsyncBulkCall(Generic[T, R]):
     :param size: maximum number of tasks to execute in one bulk
     :param delay: maximum time window for tasks to execute in one bulk
     :param concurrent: how often the `command` may be executed at the same time
+    :param priority_delays: maximum time window for tasks of specific priority
+        classes, overriding ``delay``
+    :param min_delay: minimum time window for tasks to execute in one bulk, enables
+        adapting ``size`` and ``delay`` to the load if set
+    :param key: callable providing a hashable key of each task, enables sharing
+        one execution between identical tasks if set
+    :param name: name of the ``command`` in statistics, defaults to the name of
+        the ``command`` callable
+    :param bisect: exception types of the ``command`` on which to retry the tasks
+        of a failed bulk in two halves
 
     Given some bulk-task callable ``(T, ...) -> (R, ...)`` (the ``command``),
     :py:class:`~.BulkExecution` represents a single-task callable ``(T) -> R``.
@@ -49,9 +192,49 @@ class AsyncBulkCall(Generic[T, R]):
     before starting to execute them. The ``concurrent`` parameter controls
     how many bulks may run at once; when concurrency is low tasks
     may be waiting for execution even past ``size`` and ``delay``.
+    While all ``concurrent`` commands are running, tasks keep queueing and the
+    next bulk is only collected once a command has finished.
     Possible values for ``concurrent`` are :py:data:`None` for unlimited concurrency
     or an integer above 0 to set a precise concurrency limit.
 
+    Each task may be queued with a :py:class:`~.BulkPriority`. Tasks of higher
+    priority are executed first and each priority class may have its own delay
+    budget via ``priority_delays``. A bulk is executed as soon as the delay of
+    any of its tasks has passed, so that a time-sensitive task flushes a bulk
+    early while routine tasks are collected for the full ``delay``. A delay of
+    0 for a priority class executes its tasks with the next bulk right away.
+
+    If a ``min_delay`` is given, the ``size`` and ``delay`` are upper bounds
+    only and an :py:class:`~.AdaptiveBulkController` tunes the actual bulks to
+    the arrival rate of tasks and the latency of the ``command``. This executes
+    tasks with little delay at low load and collects large bulks at high load.
+
+    If a ``key`` is given, tasks with the same key that are executed in the same
+    bulk are considered identical. Only the first of them is passed to the
+    ``command`` and its result is provided to all of them.
+
+    If the ``command`` fails with one of the ``bisect`` exception types, the tasks
+    of the bulk are split in two halves that are executed again one after another.
+    If only one half fails again, it is split further, until a failing task is
+    executed on its own and only its result is the exception. This keeps a single
+    bad task from failing an entire bulk, at the cost of about ``2 * log2(size)``
+    extra commands per bad task. If both halves fail, the failure is attributed
+    to the ``command`` instead of specific tasks and each half fails with its
+    exception, so a ``command`` failing for all tasks runs only three times.
+    Only use ``bisect`` for commands that are safe to retry.
+
+    Callers that already hold many tasks can use :py:meth:`~.call_many` to
+    execute them in bulks right away instead of queueing each task.
+
+    Tasks whose callers stop waiting are still executed, but their results are
+    discarded. If the ``command`` itself is cancelled, all tasks of the bulk are
+    cancelled as well.
+
+    After each bulk execution, all listeners added via
+    :py:func:`~.add_bulk_listener` are called with the :py:class:`~.BulkStatistics`
+    of the bulk. This allows monitoring the queue depth, bulk sizes, waiting
+    times, latencies and failures of each ``command``.
+
     .. note::
 
         If the ``command`` requires additional arguments,
@@ -65,61 +248,141 @@ class AsyncBulkCall(Generic[T, R]):
         size: int,
         delay: float,
         concurrent: Optional[int] = None,
+        priority_delays: Optional[Mapping[BulkPriority, float]] = None,
+        min_delay: Optional[float] = None,
+        key: Optional[Callable[[T], Hashable]] = None,
+        name: Optional[str] = None,
+        bisect: Tuple[Type[Exception], ...] = (),
     ):
         self._command = command
+        self._bisect = bisect
+        self._name = _command_name(command) if name is None else name
+        self._key = key
         self._size = size
         self._delay = delay
         self._concurrency = sys.maxsize if concurrent is None else concurrent
+        self._delays = {priority: delay for priority in BulkPriority}
+        self._delays.update(priority_delays or {})
+        self._tie_breaker = count()
+        self._min_delay = min_delay
+        self._controller = (
+            None
+            if min_delay is None
+            else AdaptiveBulkController(size, delay, min_delay=min_delay)
+        )
         # task handling dispatch from queue to command execution
         self._dispatch_task: Optional[asyncio.Task] = None
         # tasks handling individual command executions
         self._bulk_tasks: Set[asyncio.Task] = set()
         self._verify_settings()
 
+    @property
+    def name(self) -> str:
+        return self._name
+
     @cached_property
     def _concurrent(self) -> "asyncio.BoundedSemaphore":
         """synchronized counter for active commands"""
         return asyncio.BoundedSemaphore(value=self._concurrency)
 
     @cached_property
-    def _queue(self) -> "asyncio.Queue[Tuple[T, asyncio.Future[R]]]":
-        """queue of outstanding tasks"""
-        return asyncio.Queue()
+    def _queue(self) -> "asyncio.PriorityQueue[QueueItem]":
+        """queue of outstanding tasks, ordered by priority"""
+        return asyncio.PriorityQueue()
 
     def _verify_settings(self):
         if not isinstance(self._size, int) or self._size <= 0:
             raise ValueError(f"expected 'size' > 0, got {self._size!r} instead")
         if self._delay <= 0:
             raise ValueError(f"expected 'delay' > 0, got {self._delay!r} instead")
+        for priority, delay in self._delays.items():
+            if not isinstance(priority, BulkPriority) or delay < 0:
+                raise ValueError(
+                    "'priority_delays' must map BulkPriority to delays >= 0"
+                    f", got {priority!r}: {delay!r} instead"
+                )
+        if self._min_delay is not None and not 0 <= self._min_delay <= self._delay:
+            raise ValueError(
+                "expected 0 <= 'min_delay' <= 'delay'"
+                f", got {self._min_delay!r} instead"
+            )
+        if not all(
+            isinstance(failure, type) and issubclass(failure, Exception)
+            for failure in self._bisect
+        ):
+            raise ValueError(
+                "'bisect' must be a tuple of Exception types"
+                f", got {self._bisect!r} instead"
+            )
         if not isinstance(self._concurrency, int) or self._concurrency <= 0:
             raise ValueError(
                 "'concurrent' must be None or an integer above 0"
                 f", got {self._concurrency!r} instead"
             )
 
-    async def __call__(self, __task: T) -> R:
+    async def __call__(
+        self, __task: T, priority: BulkPriority = BulkPriority.Normal
+    ) -> R:
         """Queue a ``task`` for bulk execution and return the result when available"""
         result: "asyncio.Future[R]" = asyncio.get_event_loop().create_future()
+        if self._controller is not None:
+            self._controller.arrived()
         # queue item first so that the dispatch task does not finish before
-        self._queue.put_nowait((__task, result))
+        self._queue.put_nowait(
+            (priority, next(self._tie_breaker), time.monotonic(), __task, result)
+        )
         # ensure there is a worker to dispatch items for command execution
         if self._dispatch_task is None:
             self._dispatch_task = asyncio.ensure_future(self._bulk_dispatch())
         return await result
 
+    async def call_many(self, tasks: Iterable[T]) -> "List[Union[R, Exception]]":
+        """
+        Execute ``tasks`` in bulks right away and provide the result of each task
+
+        Tasks are partitioned into bulks of at most ``size`` tasks, but do not wait
+        for any ``delay``. Bulks still respect the ``concurrent`` limit. If a task
+        failed, its exception is provided in place of its result. If the
+        execution of any task is cancelled, the call is cancelled as well.
+        """
+        tasks = tuple(tasks)
+        arrival = time.monotonic()
+        loop = asyncio.get_event_loop()
+        futures = [loop.create_future() for _ in tasks]
+        unique_tasks, unique_futures = self._deduplicate(tasks, futures)
+        bulks = (
+            slice(start, start + self._size)
+            for start in range(0, len(unique_tasks), self._size)
+        )
+        await asyncio.gather(
+            *(
+                self._bulk_execute_now(
+                    unique_tasks[bulk], unique_futures[bulk], arrival
+                )
+                for bulk in bulks
+            )
+        )
+        return [_outcome(future) for future in futures]
+
     async def _bulk_dispatch(self):
         """Collect tasks into bulks and dispatch them for command execution"""
         while not self._queue.empty():
-            bulk = list(zip(*(await self._get_bulk())))  # noqa B905
-            if not bulk:
-                continue
-            tasks, futures = bulk
             # limit concurrent bulk execution
             # We must make sure *here* that a new bulk can be launched, but
-            # we must release the claim *in the task* when it is done.
+            # we must release the claim *in the task* when it is done. Waiting
+            # *before* collecting the bulk lets tasks pile up in the queue while
+            # all commands are busy, so that the next bulk picks up all of them.
             await self._concurrent.acquire()
-            task = asyncio.ensure_future(self._bulk_execute(tuple(tasks), futures))
-            task.add_done_callback(lambda _: self._concurrent.release)
+            try:
+                bulk = await self._get_bulk()
+            except BaseException:
+                self._concurrent.release()
+                raise
+            _, _, arrivals, tasks, futures = zip(*bulk)  # noqa B905
+            tasks, futures = self._deduplicate(tasks, futures)
+            task = asyncio.ensure_future(
+                self._bulk_execute_claimed(tasks, futures, min(arrivals))
+            )
             # track tasks via strong references to avoid them being garbage collected.
             # see bpo#44665
             self._bulk_tasks.add(task)
@@ -129,14 +392,16 @@ class AsyncBulkCall(Generic[T, R]):
             await asyncio.sleep(0)
         self._dispatch_task = None
 
-    async def _get_bulk(self) -> "List[Tuple[T, asyncio.Future[R]]]":
+    async def _get_bulk(self) -> "List[QueueItem]":
         """Fetch the next bulk from the internal queue"""
-        max_items, queue = self._size, self._queue
+        max_items, delays = self._bulk_limits()
+        queue = self._queue
         # always pull in at least one item asynchronously
         # this avoids stalling for very low delays and efficiently waits for items
         results = [await queue.get()]
         queue.task_done()
-        deadline = time.monotonic() + self._delay
+        start = time.monotonic()
+        deadline = start + delays[results[0][0]]
         while len(results) < max_items and time.monotonic() < deadline:
             try:
                 if queue.empty():
@@ -150,14 +415,127 @@ class AsyncBulkCall(Generic[T, R]):
             else:
                 results.append(item)
                 queue.task_done()
+                # the delay of each task counts from joining the bulk at the earliest
+                priority, _, arrival, *_ = item
+                deadline = min(deadline, max(arrival, start) + delays[priority])
         return results
 
+    def _deduplicate(
+        self, tasks: Sequence[T], futures: "Sequence[asyncio.Future[R]]"
+    ) -> "Tuple[Tuple[T, ...], List[asyncio.Future[R]]]":
+        """Merge tasks with the same ``key`` to share one execution"""
+        if self._key is None:
+            return tuple(tasks), list(futures)
+        key = self._key
+        waiters: "Dict[Hashable, Tuple[T, List[asyncio.Future[R]]]]" = {}
+        for task, future in zip(tasks, futures):  # noqa B905
+            waiters.setdefault(key(task), (task, []))[1].append(future)
+        if len(waiters) == len(tasks):
+            return tuple(tasks), list(futures)
+        unique_tasks, unique_futures = [], []
+        loop = asyncio.get_event_loop()
+        for task, task_futures in waiters.values():
+            unique_tasks.append(task)
+            if len(task_futures) == 1:
+                unique_futures.append(task_futures[0])
+            else:
+                shared = loop.create_future()
+                shared.add_done_callback(partial(_fan_out, task_futures))
+                unique_futures.append(shared)
+        return tuple(unique_tasks), unique_futures
+
+    def _bulk_limits(self) -> Tuple[int, Mapping[BulkPriority, float]]:
+        """The current maximum size of a bulk and delay of each priority"""
+        controller = self._controller
+        if controller is None:
+            return self._size, self._delays
+        delay = controller.delay
+        return controller.size, {
+            priority: min(delay, priority_delay)
+            for priority, priority_delay in self._delays.items()
+        }
+
+    async def _bulk_execute_now(
+        self,
+        tasks: Tuple[T, ...],
+        futures: "List[asyncio.Future[R]]",
+        arrival: float,
+    ) -> None:
+        """Execute several ``tasks`` in bulk as soon as concurrency allows"""
+        async with self._concurrent:
+            await self._bulk_execute(tasks, futures, arrival)
+
+    async def _bulk_execute_claimed(
+        self,
+        tasks: Tuple[T, ...],
+        futures: "List[asyncio.Future[R]]",
+        arrival: float,
+    ) -> None:
+        """Execute several ``tasks`` in bulk and release the claimed concurrency"""
+        try:
+            await self._bulk_execute(tasks, futures, arrival)
+        finally:
+            self._concurrent.release()
+
     async def _bulk_execute(
-        self, tasks: Tuple[T, ...], futures: "List[asyncio.Future[R]]"
+        self,
+        tasks: Tuple[T, ...],
+        futures: "List[asyncio.Future[R]]",
+        arrival: float,
     ) -> None:
         """Execute several ``tasks`` in bulk and set their ``futures``' result"""
+        error = await self._bulk_attempt(tasks, futures, arrival)
+        if error is None:
+            return
+        if len(tasks) > 1:
+            await self._bulk_bisect(tasks, futures, arrival)
+        else:
+            _fail(futures, error)
+
+    async def _bulk_bisect(
+        self,
+        tasks: Tuple[T, ...],
+        futures: "List[asyncio.Future[R]]",
+        arrival: float,
+    ) -> None:
+        """Retry the ``tasks`` of a failed bulk in halves to isolate bad tasks"""
+        middle = len(tasks) // 2
+        halves = (
+            (tasks[:middle], futures[:middle]),
+            (tasks[middle:], futures[middle:]),
+        )
+        errors = [
+            await self._bulk_attempt(half_tasks, half_futures, arrival)
+            for half_tasks, half_futures in halves
+        ]
+        for (half_tasks, half_futures), half_error in zip(halves, errors):  # noqa B905
+            if half_error is None:
+                continue
+            # both halves failing points to the command instead of specific tasks
+            if all(errors) or len(half_tasks) == 1:
+                _fail(half_futures, half_error)
+            else:
+                await self._bulk_bisect(half_tasks, half_futures, arrival)
+
+    async def _bulk_attempt(
+        self,
+        tasks: Tuple[T, ...],
+        futures: "List[asyncio.Future[R]]",
+        arrival: float,
+    ) -> Optional[Exception]:
+        """
+        Execute several ``tasks`` in bulk once and set their ``futures``' result
+
+        If the bulk fails with one of the ``bisect`` exception types, the
+        ``futures`` are left pending and the exception is returned instead.
+        """
+        start = time.monotonic()
+        queue_depth = self._queue.qsize()
+        error = None
         try:
             results = await self._command(*tasks)
+            if self._controller is not None:
+                self._controller.executed(time.monotonic() - start)
             # make sure we can cleanly match input to output
             results = [None] * len(futures) if results is None else list(results)
             if len(results) != len(futures):
@@ -166,8 +544,77 @@ class AsyncBulkCall(Generic[T, R]):
                     f", expected {len(futures)} results or 'None'"
                 )
         except Exception as task_exception:
+            error = task_exception
+        except BaseException:
+            # a cancelled command provides no results, do not leave tasks waiting
             for future in futures:
-                future.set_exception(task_exception)
+                future.cancel()
+            raise
         else:
             for future, result in zip(futures, results):  # noqa B905
-                future.set_result(result)
+                # callers may have stopped waiting for the result
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        bisect = error is not None and isinstance(error, self._bisect)
+        if error is not None and not bisect:
+            _fail(futures, error)
+        if _bulk_listeners:
+            self._publish(
+                BulkStatistics(
+                    command=self._name,
+                    size=len(tasks),
+                    queue_depth=queue_depth,
+                    wait=start - arrival,
+                    latency=time.monotonic() - start,
+                    error=error,
+                )
+            )
+        return error if bisect else None
+
+    @staticmethod
+    def _publish(statistics: BulkStatistics) -> None:
+        """Provide the ``statistics`` of a bulk execution to all bulk listeners"""
+        for listener in _bulk_listeners:
+            try:
+                listener(statistics)
+            except Exception as err:
+                # monitoring must never break the execution of tasks
+                logger.warning(f"Bulk listener {listener!r} failed: {err!r}")
+
+
+def _command_name(command: Callable) -> str:
+    """Name of a ``command``, looking through :py:func:`~functools.partial`"""
+    while isinstance(command, partial):
+        command = command.func
+    return getattr(command, "__name__", type(command).__name__)
+
+
+def _fail(futures: "List[asyncio.Future[R]]", error: Exception) -> None:
+    """Fail all ``futures`` whose callers are still waiting with the ``error``"""
+    for future in futures:
+        if not future.done():
+            future.set_exception(error)
+
+
+def _outcome(future: "asyncio.Future[R]") -> "Union[R, Exception]":
+    """Result of a done ``future`` or the exception it failed with"""
+    if future.cancelled():
+        raise asyncio.CancelledError()
+    return future.exception() or future.result()
+
+
+def _fan_out(futures: "List[asyncio.Future[R]]", shared: "asyncio.Future[R]"):
+    """Provide the outcome of a ``shared`` execution to all its ``futures``"""
+    for future in futures:
+        if future.done():
+            continue
+        if shared.cancelled():
+            future.cancel()
+        elif shared.exception() is not None:
+            future.set_exception(shared.exception())
+        else:
+            future.set_result(shared.result())
@@ -1,22 +1,133 @@
 from ..exceptions.executorexceptions import CommandExecutionFailure
+from .asyncbulkcall import _command_name
 from collections.abc import Mapping
 from datetime import datetime
 from datetime import timedelta
+from typing import Any, Callable, List, NamedTuple, Optional, Set, Tuple
 
 import asyncio
 import logging
 import json
+import random
+import weakref
 
 logger = logging.getLogger("cobald.runtime.tardis.utilities.asynccachemap")
 
+_NEVER_UPDATED = datetime.fromtimestamp(0)
+
+
+class CacheStatistics(NamedTuple):
+    """Health of the data of a cache after each update as provided to listeners"""
+
+    #: name of the :py:class:`~.AsyncCacheMap` that attempted the update
+    name: str
+    #: whether the data is not older than the maximum staleness
+    valid: bool
+    #: number of updates that failed since the last successful update
+    consecutive_failures: int
+    #: time of the last successful update
+    last_update: datetime
+
+
+_cache_listeners: List[Callable[[CacheStatistics], None]] = []
+
+
+def add_cache_listener(listener: Callable[[CacheStatistics], None]) -> None:
+    """
+    Add a ``listener`` called with the :py:class:`~.CacheStatistics` after every
+    update attempted by any :py:class:`~.AsyncCacheMap`
+    """
+    _cache_listeners.append(listener)
+
+
+def remove_cache_listener(listener: Callable[[CacheStatistics], None]) -> None:
+    """Remove a ``listener`` previously added via :py:func:`~.add_cache_listener`"""
+    _cache_listeners.remove(listener)
+
 
 class AsyncCacheMap(Mapping):
-    def __init__(self, update_coroutine, max_age: int = 60 * 15):
+    """
+    Read-only mapping caching the data provided by an ``update_coroutine``
+
+    :param update_coroutine: coroutine function providing the data as a dict
+    :param max_age: time in seconds after which the data is updated
+    :param stale_while_revalidate: whether to keep providing the expired data
+        while updating it in the background
+    :param refresh_ahead: fraction of ``max_age`` by which to refresh the data
+        ahead of its expiry in the background, enables a background refresher
+        if set
+    :param min_backoff: time in seconds to wait before retrying a failed update,
+        doubled with every consecutive failure up to ``max_age``
+    :param max_staleness: time in seconds after which the data is flagged as
+        invalid if it could not be updated
+    :param name: name of the cache in statistics, defaults to the name of the
+        ``update_coroutine``
+
+    The data is updated via :py:meth:`~.update_status` once it is older than
+    ``max_age``. By default, all callers of :py:meth:`~.update_status` wait
+    for the update to finish. With ``stale_while_revalidate``, callers return
+    right away and see the expired data until a single background update
+    replaces it at once. Only the very first update is always waited for,
+    since there is no data to provide before.
+
+    With ``refresh_ahead``, a background refresher started by the first call of
+    :py:meth:`~.update_status` keeps the data from expiring in the first place.
+    Each refresh is scheduled between ``refresh_ahead`` and half of
+    ``refresh_ahead`` times ``max_age`` before the data expires, at random to
+    spread the refreshes of several caches. The refresher runs until the cache
+    is closed via :py:meth:`~.close` or garbage collected.
+
+    If an update fails, no further update is attempted for ``min_backoff``
+    seconds. The wait doubles with every consecutive failure, up to ``max_age``,
+    so that a failing ``update_coroutine`` is not retried by every caller in the
+    meantime. The current data is kept, but is flagged as not :py:attr:`~.valid`
+    once it is older than ``max_staleness``.
+
+    After each attempted update, all listeners added via
+    :py:func:`~.add_cache_listener` are called with the
+    :py:class:`~.CacheStatistics` of the cache. This allows monitoring whether
+    its data is still valid and how often updates failed in a row.
+    """
+
+    def __init__(
+        self,
+        update_coroutine,
+        max_age: int = 60 * 15,
+        stale_while_revalidate: bool = False,
+        refresh_ahead: Optional[float] = None,
+        min_backoff: float = 1.0,
+        max_staleness: Optional[float] = None,
+        name: Optional[str] = None,
+    ):
         self._update_coroutine = update_coroutine
+        self._name = _command_name(update_coroutine) if name is None else name
         self._max_age = max_age
-        self._last_update = datetime.fromtimestamp(0)
+        self._stale_while_revalidate = stale_while_revalidate
+        self._refresh_ahead = refresh_ahead
+        self._min_backoff = min_backoff
+        self._max_staleness = max_staleness
+        self._last_update = _NEVER_UPDATED
+        self._retry_after = _NEVER_UPDATED
+        self._consecutive_failures = 0
         self._data = {}
         self._lock = None
+        self._revalidate_task: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self._change_listeners: List[
+            Tuple[Callable[[Set], None], Optional[Callable[[Any], Any]]]
+        ] = []
+        if refresh_ahead is not None and not 0 < refresh_ahead < 1:
+            raise ValueError(
+                f"expected 0 < 'refresh_ahead' < 1, got {refresh_ahead!r} instead"
+            )
+        if not min_backoff > 0:
+            raise ValueError(f"expected 'min_backoff' > 0, got {min_backoff!r} instead")
+        if max_staleness is not None and not max_staleness >= max_age:
+            raise ValueError(
+                "expected 'max_staleness' >= 'max_age'"
+                f", got {max_staleness!r} instead"
+            )
 
     @property
     def _async_lock(self):
@@ -26,26 +137,195 @@ class AsyncCacheMap(Mapping):
             self._lock = asyncio.Lock()
         return self._lock
 
+    @property
+    def name(self) -> str:
+        return self._name
+
     @property
     def last_update(self) -> datetime:
         return self._last_update
 
+    @property
+    def age(self) -> float:
+        """Time in seconds since the data was last updated"""
+        return (datetime.now() - self._last_update).total_seconds()
+
+    @property
+    def valid(self) -> bool:
+        """Whether the data is not older than the maximum staleness"""
+        return self._max_staleness is None or self.age <= self._max_staleness
+
+    @property
+    def consecutive_failures(self) -> int:
+        """Number of updates that failed since the last successful update"""
+        return self._consecutive_failures
+
+    def add_change_listener(
+        self,
+        listener: Callable[[Set], None],
+        view: Optional[Callable[[Any], Any]] = None,
+    ) -> None:
+        """
+        Register a ``listener`` called with the keys of all entries changed by an
+        update. Entries are compared by their ``view`` if given, for example to
+        ignore changes of attributes a listener is not interested in. The very
+        first update is not reported, since there is no data it could change.
+        """
+        self._change_listeners.append((listener, view))
+
+    def _notify_change_listeners(self, old_data: dict) -> None:
+        for listener, view in self._change_listeners:
+            changed = self._changed_keys(old_data, self._data, view)
+            if not changed:
+                continue
+            try:
+                listener(changed)
+            except Exception as err:
+                logger.warning(f"AsyncMap change listener {listener} failed: {err}")
+
+    @staticmethod
+    def _changed_keys(
+        old_data: dict, new_data: dict, view: Optional[Callable[[Any], Any]]
+    ) -> Set:
+        changed = old_data.keys() ^ new_data.keys()
+        changed.update(
+            key
+            for key in old_data.keys() & new_data.keys()
+            if (
+                old_data[key] != new_data[key]
+                if view is None
+                else view(old_data[key]) != view(new_data[key])
+            )
+        )
+        return changed
+
+    def _expired(self, current_time: datetime, max_age: Optional[float] = None) -> bool:
+        max_age = self._max_age if max_age is None else max_age
+        return (current_time - self._last_update) > timedelta(seconds=max_age)
+
+    def _due(self, current_time: datetime, max_age: Optional[float] = None) -> bool:
+        """Whether an update is due, unless backing off after failures"""
+        return self._expired(current_time, max_age) and (
+            current_time >= self._retry_after
+        )
+
+    def close(self) -> None:
+        """Stop all background updates of the data"""
+        self._closed = True
+        for task in (self._refresh_task, self._revalidate_task):
+            if task is not None:
+                task.cancel()
+        self._refresh_task = self._revalidate_task = None
+
     async def update_status(self) -> None:
+        if (
+            self._refresh_ahead is not None
+            and self._refresh_task is None
+            and not self._closed
+        ):
+            self._refresh_task = asyncio.ensure_future(self._refresh(weakref.ref(self)))
+        if self._stale_while_revalidate and self._last_update > _NEVER_UPDATED:
+            if self._due(datetime.now()) and self._revalidate_task is None:
+                self._revalidate_task = asyncio.ensure_future(self._revalidate())
+            return
+        await self._update()
+
+    async def _revalidate(self) -> None:
+        """Update the data in the background while the expired data is provided"""
+        try:
+            await self._update()
+        except Exception as err:
+            # nobody awaits the background update to handle its failure
+            logger.warning(f"AsyncMap background update failed: {err!r}")
+        finally:
+            self._revalidate_task = None
+
+    @staticmethod
+    async def _refresh(cache_ref: "weakref.ref[AsyncCacheMap]") -> None:
+        """Refresh the data ahead of its expiry in the background, while in use"""
+        attempted = datetime.now()
+        while True:
+            # only hold on to the cache while refreshing, so that it can be dropped
+            cache = cache_ref()
+            if cache is None:
+                return
+            refresh_age = cache._max_age * (
+                1 - cache._refresh_ahead * random.uniform(0.5, 1)
+            )
+            # wait for the refresh age, but never retry failed refreshes right away
+            due = max(cache._last_update, attempted) + timedelta(seconds=refresh_age)
+            del cache
+            await asyncio.sleep(max(0.0, (due - datetime.now()).total_seconds()))
+            cache = cache_ref()
+            if cache is None:
+                return
+            attempted = datetime.now()
+            try:
+                await cache._update(max_age=refresh_age)
+            except Exception as err:
+                logger.warning(f"AsyncMap background refresh failed: {err!r}")
+
+    async def _update(self, max_age: Optional[float] = None) -> None:
         current_time = datetime.now()
 
         async with self._async_lock:
-            if (current_time - self._last_update) > timedelta(seconds=self._max_age):
+            # data may have been updated by someone else while waiting for the lock
+            if self._due(current_time, max_age):
                 try:
                     data = await self._update_coroutine()
                 except json.decoder.JSONDecodeError as je:
                     logger.warning(
                         f"AsyncMap update_status failed: Could not decode json {je}"
                     )
+                    self._back_off(current_time)
                 except CommandExecutionFailure as cf:
                     logger.warning(f"AsyncMap update_status failed: {cf}")
+                    self._back_off(current_time)
                 else:
-                    self._data = data
+                    first_update = self._last_update == _NEVER_UPDATED
+                    old_data, self._data = self._data, data
                     self._last_update = current_time
+                    self._consecutive_failures = 0
+                    self._retry_after = _NEVER_UPDATED
+                    # the very first data is no change of anything known before
+                    if not first_update:
+                        self._notify_change_listeners(old_data)
+                if _cache_listeners:
+                    self._publish(
+                        CacheStatistics(
+                            name=self._name,
+                            valid=self.valid,
+                            consecutive_failures=self._consecutive_failures,
+                            last_update=self._last_update,
+                        )
+                    )
+
+    @staticmethod
+    def _publish(statistics: CacheStatistics) -> None:
+        """Provide the ``statistics`` of an update to all cache listeners"""
+        for listener in _cache_listeners:
+            try:
+                listener(statistics)
+            except Exception as err:
+                # monitoring must never break the update of the data
+                logger.warning(f"Cache listener {listener!r} failed: {err!r}")
+
+    def _back_off(self, current_time: datetime) -> None:
+        """Delay the next update after a failed update"""
+        self._consecutive_failures += 1
+        backoff = min(
+            self._max_age, self._min_backoff * 2 ** (self._consecutive_failures - 1)
+        )
+        self._retry_after = current_time + timedelta(seconds=backoff)
+        logger.warning(
+            f"AsyncMap update_status failed {self._consecutive_failures} times"
+            f" in a row, retrying in {backoff:.3g}s"
+        )
+        if not self.valid:
+            logger.error(
+                f"AsyncMap data is invalid, last update {self.age:.0f}s ago"
+                f" exceeds the maximum staleness of {self._max_staleness}s"
+            )
 
     def __iter__(self):
         return iter(self._data)
@@ -63,6 +343,10 @@ class AsyncCacheMap(Mapping):
         return (
             self._update_coroutine == other._update_coroutine
             and self._max_age == other._max_age
+            and self._stale_while_revalidate == other._stale_while_revalidate
+            and self._refresh_ahead == other._refresh_ahead
+            and self._min_backoff == other._min_backoff
+            and self._max_staleness == other._max_staleness
             and self._last_update == other._last_update
             and self._data == other._data
             and self._lock == other._lock
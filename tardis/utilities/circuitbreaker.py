@@ -0,0 +1,167 @@
+from ..exceptions.executorexceptions import CommandExecutionFailure
+from ..exceptions.tardisexceptions import TardisSiteUnavailable
+from ..exceptions.tardisexceptions import TardisTimeout
+
+from contextlib import contextmanager
+from enum import Enum
+from typing import Callable, Iterator, List, Optional, Tuple, Type
+import logging
+import time
+
+logger = logging.getLogger("cobald.runtime.tardis.utilities.circuitbreaker")
+
+
+class CircuitState(Enum):
+    """
+    State of a :py:class:`~.CircuitBreaker`
+    """
+
+    Closed = 0
+    HalfOpen = 1
+    Open = 2
+
+
+class CircuitBreaker(object):
+    """
+    Circuit breaker shielding a struggling resource provider from further calls
+
+    :param name: name of the guarded resource provider, e.g. the site name
+    :param failure_threshold: number of consecutive failed calls tripping the
+        circuit breaker
+    :param cool_down: time in seconds calls are short-circuited after tripping
+    :param failures: exception types counting as failed calls, also if they are
+        the cause of the exception raised by the call
+
+    While the circuit breaker is open, guarded calls fail right away with
+    :py:class:`~tardis.exceptions.tardisexceptions.TardisSiteUnavailable`
+    instead of reaching the resource provider. Once the ``cool_down`` has
+    passed, a single call is let through as a probe. Traffic resumes if the
+    probe succeeds, otherwise the circuit breaker opens for another
+    ``cool_down``. Any other outcome than one of the ``failures`` counts as a
+    success, since the resource provider did respond.
+
+    By default, only timeouts and failed commands count as failures, since
+    they affect the entire site. Failures of single resources, such as
+    removing a job that has already vanished, do not trip the circuit breaker.
+
+    Listeners added via :py:meth:`~.add_state_listener` are called with the
+    ``name`` and the new :py:class:`~.CircuitState` on every change.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        cool_down: float = 60,
+        failures: Tuple[Type[Exception], ...] = (
+            TardisTimeout,
+            CommandExecutionFailure,
+        ),
+    ):
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._cool_down = cool_down
+        self._failures = failures
+        self._state = CircuitState.Closed
+        self._consecutive_failures = 0
+        self._opened = 0.0
+        self._state_listeners: List[Callable[[str, CircuitState], None]] = []
+        self._verify_settings()
+
+    def _verify_settings(self):
+        if not isinstance(self._failure_threshold, int) or self._failure_threshold <= 0:
+            raise ValueError(
+                "'failure_threshold' must be an integer above 0"
+                f", got {self._failure_threshold!r} instead"
+            )
+        if not self._cool_down > 0:
+            raise ValueError(
+                f"expected 'cool_down' > 0, got {self._cool_down!r} instead"
+            )
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def state(self) -> CircuitState:
+        return self._state
+
+    def add_state_listener(self, listener: Callable[[str, CircuitState], None]):
+        """Add a ``listener`` called on every change of the circuit state"""
+        self._state_listeners.append(listener)
+
+    @contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        Guard a call to the resource provider, short-circuiting it while open
+
+        :raises TardisSiteUnavailable: if the circuit breaker is open
+        """
+        self._admit()
+        try:
+            yield
+        except Exception as err:
+            if self._is_failure(err):
+                self._record_failure()
+            else:
+                self._record_success()
+            raise
+        except BaseException:
+            # a cancelled probe has no outcome, let the next call probe instead
+            if self._state is CircuitState.HalfOpen:
+                self._set_state(CircuitState.Open)
+            raise
+        else:
+            self._record_success()
+
+    def _admit(self) -> None:
+        if self._state is CircuitState.Closed:
+            return
+        if (
+            self._state is CircuitState.Open
+            and time.monotonic() - self._opened >= self._cool_down
+        ):
+            self._set_state(CircuitState.HalfOpen)
+            return
+        raise TardisSiteUnavailable(
+            f"Site {self._name} is unavailable, circuit breaker is {self._state.name}"
+        )
+
+    def _is_failure(self, exception: Optional[BaseException]) -> bool:
+        # adapters translate failed commands to their own exceptions
+        while exception is not None:
+            if isinstance(exception, self._failures):
+                return True
+            exception = exception.__cause__
+        return False
+
+    def _record_failure(self) -> None:
+        self._consecutive_failures += 1
+        if self._state is CircuitState.HalfOpen or (
+            self._state is CircuitState.Closed
+            and self._consecutive_failures >= self._failure_threshold
+        ):
+            self._opened = time.monotonic()
+            self._set_state(CircuitState.Open)
+
+    def _record_success(self) -> None:
+        self._consecutive_failures = 0
+        if self._state is not CircuitState.Closed:
+            self._set_state(CircuitState.Closed)
+
+    def _set_state(self, state: CircuitState) -> None:
+        if state is CircuitState.Open:
+            logger.warning(
+                f"Circuit breaker of site {self._name} opened after"
+                f" {self._consecutive_failures} consecutive failures"
+            )
+        else:
+            logger.info(f"Circuit breaker of site {self._name} is {state.name}")
+        self._state = state
+        for listener in self._state_listeners:
+            try:
+                listener(self._name, state)
+            except Exception as err:
+                # monitoring must never break the calls to the site
+                logger.warning(f"Circuit state listener {listener!r} failed: {err!r}")
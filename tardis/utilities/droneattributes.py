@@ -0,0 +1,116 @@
+from collections.abc import MutableMapping
+from typing import Any, Hashable, Iterator
+
+
+class DroneAttributes(MutableMapping):
+    """
+    Compact, dict-like storage of the resource attributes of a drone
+
+    The attributes every drone carries are stored in ``__slots__`` instead of a
+    hash table, which considerably reduces the memory footprint of each drone.
+    Any other attribute, for example provided by a site adapter, is stored in an
+    additional :py:class:`dict` that is only created when needed.
+
+    As with an :py:class:`~tardis.utilities.attributedict.AttributeDict`, all
+    attributes are available both as items and as attributes.
+    """
+
+    __slots__ = (
+        "site_name",
+        "machine_type",
+        "obs_machine_meta_data_translation_mapping",
+        "remote_resource_uuid",
+        "created",
+        "updated",
+        "drone_uuid",
+        "resource_status",
+        "_extra",
+    )
+
+    def __init__(self, *args, **kwargs):
+        object.__setattr__(self, "_extra", None)
+        self.update(*args, **kwargs)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        if key in _FIELDS:
+            try:
+                return object.__getattribute__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in _FIELDS:
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                object.__setattr__(self, "_extra", {})
+            self._extra[key] = value
+
+    def __delitem__(self, key: Hashable) -> None:
+        if key in _FIELDS:
+            try:
+                object.__delattr__(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[Hashable]:
+        for field in _FIELDS_ORDER:
+            try:
+                object.__getattribute__(self, field)
+            except AttributeError:
+                continue
+            yield field
+        if self._extra is not None:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __contains__(self, key: object) -> bool:
+        try:
+            self[key]
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def __getattr__(self, item: str) -> Any:
+        # only called for unset slots and attributes not stored in slots
+        if item == "_extra":
+            raise AttributeError(item)
+        try:
+            return self[item]
+        except KeyError:
+            raise AttributeError(
+                f"{item} is not a valid attribute. Dict contains {str(self)}."
+            ) from None
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        self[key] = value
+
+    def __delattr__(self, item: str) -> None:
+        try:
+            del self[item]
+        except KeyError:
+            raise AttributeError(
+                f"{item} is not a valid attribute. Dict contains {str(self)}."
+            ) from None
+
+    def __reduce__(self):
+        return self.__class__, (dict(self),)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    def copy(self) -> "DroneAttributes":
+        return self.__class__(self)
+
+
+_FIELDS_ORDER = DroneAttributes.__slots__[:-1]
+_FIELDS = frozenset(_FIELDS_ORDER)
@@ -0,0 +1,171 @@
+from functools import cached_property
+from itertools import count
+from typing import Any, Awaitable, Callable, List, Optional, Set, Tuple, TypeVar
+import asyncio
+import heapq
+import logging
+import math
+import random
+import sys
+
+logger = logging.getLogger("cobald.runtime.tardis.utilities.heartbeatscheduler")
+
+
+R = TypeVar("R")
+
+
+class HeartbeatScheduler(object):
+    """
+    Shared scheduler for the heartbeats of all drones of a site
+
+    :param jitter: fraction of the heartbeat interval by which a heartbeat
+        may randomly be advanced
+    :param concurrent: how many state updates may run at the same time
+    :param tick: optional time grid in seconds to align heartbeats to
+    :param prepare: optional coroutine called with the keys of all heartbeats
+        being due at once before they are released
+
+    Instead of every drone sleeping on its own timer, all pending heartbeats
+    are kept in a single heap ordered by their due time. One timer is armed
+    for the earliest heartbeat only and wakes all drones being due at once.
+
+    Each heartbeat is randomly advanced by up to ``jitter`` times its interval.
+    Drones created or restored in the same moment thus drift apart and are
+    spread across the heartbeat interval instead of hitting the site in bursts.
+    The ``concurrent`` parameter additionally caps how many state updates may
+    run at once, possible values are :py:data:`None` for unlimited concurrency
+    or an integer above 0 to set a precise concurrency limit.
+
+    Pending heartbeats can be released ahead of time via :py:meth:`~.wake`,
+    for example when a status change of a drone has been observed.
+
+    In tick mode, due times are rounded up to multiples of ``tick`` seconds.
+    All heartbeats due in the same tick are released together as one cohort,
+    which allows to ``prepare`` them in bulk, for example by querying the status
+    of all resources of the cohort at once.
+    """
+
+    def __init__(
+        self,
+        jitter: float = 0.0,
+        concurrent: Optional[int] = None,
+        tick: Optional[float] = None,
+        prepare: Optional[Callable[[List[Any]], Awaitable[None]]] = None,
+    ):
+        self._jitter = jitter
+        self._concurrency = sys.maxsize if concurrent is None else concurrent
+        self._tick = tick
+        self._prepare = prepare
+        # pending heartbeats as (due time, tie breaker, key, future)
+        self._heartbeats: List[Tuple[float, int, Any, asyncio.Future]] = []
+        self._tie_breaker = count()
+        # timer waking up the earliest heartbeat
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_due = 0.0
+        # tasks preparing cohorts, see bpo#44665
+        self._prepare_tasks: Set[asyncio.Task] = set()
+        self._verify_settings()
+
+    @cached_property
+    def _concurrent(self) -> "asyncio.Semaphore":
+        """synchronized counter for active state updates"""
+        return asyncio.Semaphore(value=self._concurrency)
+
+    def _verify_settings(self):
+        if not 0 <= self._jitter <= 1:
+            raise ValueError(
+                f"expected 0 <= 'jitter' <= 1, got {self._jitter!r} instead"
+            )
+        if not isinstance(self._concurrency, int) or self._concurrency <= 0:
+            raise ValueError(
+                "'concurrent' must be None or an integer above 0"
+                f", got {self._concurrency!r} instead"
+            )
+        if self._tick is not None and not self._tick > 0:
+            raise ValueError(
+                f"'tick' must be None or above 0, got {self._tick!r} instead"
+            )
+
+    @property
+    def pending(self) -> int:
+        """Number of heartbeats currently waiting to be due"""
+        return sum(not heartbeat.done() for *_, heartbeat in self._heartbeats)
+
+    async def sleep(self, interval: float, key: Any = None) -> None:
+        """
+        Wait for the next heartbeat being due after at most ``interval`` seconds
+
+        The ``key`` identifies the heartbeat when preparing its cohort.
+        """
+        loop = asyncio.get_running_loop()
+        heartbeat = loop.create_future()
+        due = loop.time() + interval * (1 - self._jitter * random.random())
+        if self._tick is not None:
+            due = math.ceil(due / self._tick) * self._tick
+        heapq.heappush(self._heartbeats, (due, next(self._tie_breaker), key, heartbeat))
+        self._arm_timer(loop)
+        await heartbeat
+
+    def wake(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Release all pending heartbeats right away whose key matches ``predicate``
+
+        :return: the number of released heartbeats
+        """
+        woken = 0
+        for *_, key, heartbeat in self._heartbeats:
+            if not heartbeat.done() and predicate(key):
+                heartbeat.set_result(None)
+                woken += 1
+        return woken
+
+    async def update(
+        self, state_update: Callable[..., Awaitable[R]], *args, **kwargs
+    ) -> R:
+        """Run a ``state_update`` once a concurrency slot is available"""
+        async with self._concurrent:
+            return await state_update(*args, **kwargs)
+
+    def _arm_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Ensure that the timer fires for the earliest pending heartbeat"""
+        due = self._heartbeats[0][0]
+        if self._timer is not None:
+            if self._timer_due <= due:
+                return
+            self._timer.cancel()
+        self._timer_due = due
+        self._timer = loop.call_at(due, self._wake_up, loop)
+
+    def _wake_up(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Release all heartbeats being due"""
+        self._timer = None
+        # the event loop may fire the timer slightly early within its resolution
+        now = max(loop.time(), self._timer_due)
+        heartbeats, cohort = self._heartbeats, []
+        while heartbeats and heartbeats[0][0] <= now:
+            *_, key, heartbeat = heapq.heappop(heartbeats)
+            if not heartbeat.done():  # heartbeat may have been cancelled
+                cohort.append((key, heartbeat))
+        if heartbeats:
+            self._arm_timer(loop)
+        if self._prepare is None:
+            self._release(cohort)
+        elif cohort:
+            task = asyncio.ensure_future(self._prepare_cohort(cohort))
+            self._prepare_tasks.add(task)
+            task.add_done_callback(self._prepare_tasks.discard)
+
+    async def _prepare_cohort(self, cohort: List[Tuple[Any, asyncio.Future]]) -> None:
+        """Prepare all heartbeats being due at once before releasing them"""
+        try:
+            await self._prepare([key for key, _ in cohort])
+        except Exception as err:
+            logger.warning(f"Preparing {len(cohort)} heartbeats failed: {err!r}")
+        finally:
+            self._release(cohort)
+
+    @staticmethod
+    def _release(cohort: List[Tuple[Any, asyncio.Future]]) -> None:
+        for _, heartbeat in cohort:
+            if not heartbeat.done():
+                heartbeat.set_result(None)
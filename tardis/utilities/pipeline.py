@@ -1,6 +1,3 @@
-import asyncio
-
-
 class StopProcessing(BaseException):
     def __init__(self, last_result):
         self._last_result = last_result
@@ -20,11 +17,8 @@ class PipelineProcessor(object):
 
     async def run_pipeline(self, pipeline_input, *args, **kwargs):
         try:
-            pipeline = asyncio.Future()
-            pipeline.set_result(pipeline_input)
-
             for func_call in self._processing_pipeline:
-                pipeline = func_call(await pipeline, *args, **kwargs)
-            return await pipeline
+                pipeline_input = await func_call(pipeline_input, *args, **kwargs)
+            return pipeline_input
         except StopProcessing as ex:
             return ex.last_result
@@ -0,0 +1,184 @@
+from ..interfaces.plugin import Plugin
+from ..interfaces.state import State
+from .asyncbulkcall import BulkStatistics
+from .asynccachemap import CacheStatistics
+from .attributedict import AttributeDict
+from .circuitbreaker import CircuitState
+
+from collections import deque
+from functools import cached_property
+from typing import Deque, List, NamedTuple, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger("cobald.runtime.tardis.utilities.plugineventqueue")
+
+
+class PluginEvent(NamedTuple):
+    """State change of a drone as delivered to plugins"""
+
+    state: State
+    resource_attributes: AttributeDict
+
+
+class PluginEventQueue(Plugin):
+    """
+    Queue decoupling the state changes of drones from notifying a plugin
+
+    :param plugin: the plugin to deliver events to
+    :param batch_size: maximum number of events to deliver to the plugin at once
+    :param flush_interval: maximum time in seconds to collect events before
+        delivering them to the plugin
+    :param max_size: maximum number of events waiting to be delivered
+    :param overflow: how to handle new events while ``max_size`` events are
+        waiting, either ``"drop"`` or ``"coalesce"``
+
+    Notifying the queue about a state change is a non-blocking operation that
+    stores a compact :py:class:`~.PluginEvent` holding a shallow copy of the
+    resource attributes. Events are delivered in order to the plugin via its
+    :py:meth:`~tardis.interfaces.plugin.Plugin.notify_many` method, as soon as
+    ``batch_size`` events are waiting or after ``flush_interval`` seconds.
+
+    When the queue is full, new events are dropped and counted in
+    :py:attr:`~.dropped`. With the ``"coalesce"`` overflow policy, a new event
+    instead replaces a waiting event of the same drone, if there is one.
+    """
+
+    overflow_policies = ("drop", "coalesce")
+
+    def __init__(
+        self,
+        plugin: Plugin,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_size: int = 10000,
+        overflow: str = "drop",
+    ):
+        self._plugin = plugin
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._max_size = max_size
+        self._overflow = overflow
+        self._events: Deque[PluginEvent] = deque()
+        # task delivering events to the plugin while there are any
+        self._flush_task: Optional[asyncio.Task] = None
+        #: number of events dropped since the queue was full
+        self.dropped = 0
+        self._verify_settings()
+
+    @cached_property
+    def _batch_ready(self) -> asyncio.Event:
+        """signal that a full batch is waiting to be delivered"""
+        return asyncio.Event()
+
+    def _verify_settings(self):
+        if not isinstance(self._batch_size, int) or self._batch_size <= 0:
+            raise ValueError(
+                f"expected 'batch_size' > 0, got {self._batch_size!r} instead"
+            )
+        if not self._flush_interval > 0:
+            raise ValueError(
+                f"expected 'flush_interval' > 0, got {self._flush_interval!r} instead"
+            )
+        if not isinstance(self._max_size, int) or self._max_size < self._batch_size:
+            raise ValueError(
+                f"expected 'max_size' >= 'batch_size', got {self._max_size!r} instead"
+            )
+        if self._overflow not in self.overflow_policies:
+            raise ValueError(
+                f"expected 'overflow' to be one of {self.overflow_policies}"
+                f", got {self._overflow!r} instead"
+            )
+
+    @property
+    def plugin(self) -> Plugin:
+        """The plugin events are delivered to"""
+        return self._plugin
+
+    @property
+    def notify_timeout(self) -> None:
+        # queueing an event never blocks, the plugin's timeout applies to delivery
+        return None
+
+    async def notify(self, state: State, resource_attributes: AttributeDict) -> None:
+        """Queue the state change of a drone for delivery to the plugin"""
+        self.put(PluginEvent(state, AttributeDict(resource_attributes)))
+
+    def notify_circuit_state(self, site_name: str, state: CircuitState) -> None:
+        # changes of sites are rare and not queued
+        self._plugin.notify_circuit_state(site_name, state)
+
+    def notify_cache_update(self, statistics: CacheStatistics) -> None:
+        # statistics are cheap to aggregate and not queued
+        self._plugin.notify_cache_update(statistics)
+
+    def notify_spawn_state(self, name: str, queue_depth: int, rate: float) -> None:
+        # the latest state is cheap to set and not queued
+        self._plugin.notify_spawn_state(name, queue_depth, rate)
+
+    def notify_bulk_execution(self, statistics: BulkStatistics) -> None:
+        # statistics are cheap to aggregate and not queued
+        self._plugin.notify_bulk_execution(statistics)
+
+    def put(self, event: PluginEvent) -> None:
+        """Queue an ``event`` for delivery to the plugin without blocking"""
+        if len(self._events) >= self._max_size:
+            if not (self._overflow == "coalesce" and self._coalesce(event)):
+                self.dropped += 1
+                logger.debug(
+                    f"Dropped event of {event.resource_attributes.drone_uuid} for"
+                    f" {self._plugin.__class__.__name__}, queue is full"
+                )
+            return
+        self._events.append(event)
+        if len(self._events) >= self._batch_size:
+            self._batch_ready.set()
+        if self._flush_task is None:
+            self._flush_task = asyncio.ensure_future(self._flush())
+
+    def _coalesce(self, event: PluginEvent) -> bool:
+        """Replace the latest waiting event of the same drone by ``event``"""
+        drone_uuid = event.resource_attributes.drone_uuid
+        for index in range(len(self._events) - 1, -1, -1):
+            if self._events[index].resource_attributes.drone_uuid == drone_uuid:
+                self._events[index] = event
+                return True
+        return False
+
+    async def _flush(self) -> None:
+        """Deliver events to the plugin in batches while there are any"""
+        try:
+            while self._events:
+                try:
+                    await asyncio.wait_for(
+                        self._batch_ready.wait(), timeout=self._flush_interval
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                await self._deliver(self._get_batch())
+        finally:
+            self._flush_task = None
+
+    def _get_batch(self) -> List[PluginEvent]:
+        events = self._events
+        batch = [events.popleft() for _ in range(min(self._batch_size, len(events)))]
+        if len(events) < self._batch_size:
+            self._batch_ready.clear()
+        return batch
+
+    async def _deliver(self, batch: List[PluginEvent]) -> None:
+        plugin = self._plugin
+        try:
+            await asyncio.wait_for(
+                plugin.notify_many(batch), timeout=plugin.notify_timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Delivering {len(batch)} events to plugin"
+                f" {plugin.__class__.__name__} timed out after {plugin.notify_timeout}s"
+            )
+        except Exception as err:
+            logger.warning(
+                f"Delivering {len(batch)} events to plugin"
+                f" {plugin.__class__.__name__} failed: {err!r}"
+            )
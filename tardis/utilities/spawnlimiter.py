@@ -0,0 +1,151 @@
+from typing import Callable, List, Optional
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger("cobald.runtime.tardis.utilities.spawnlimiter")
+
+
+class SpawnLimiter(object):
+    """
+    Token bucket limiting the rate at which new drones deploy their resources
+
+    :param rate: sustainable number of deployments per second
+    :param burst: number of deployments that may happen at once after a pause
+    :param min_rate: lowest rate to slow down to when the quota is exceeded,
+        defaults to 1/64th of the ``rate``
+    :param name: name of the limited deployments, e.g. the site and machine type
+
+    Drones acquire a token before deploying their resource and wait in first
+    come, first served order while no token is available. Tokens are refilled
+    at the current rate up to ``burst`` tokens.
+
+    Whenever the site reports its quota to be exceeded, the current rate is
+    halved down to ``min_rate`` via :py:meth:`~.throttle`. Deployments that
+    started before the last slow down fail together with the one causing it,
+    so their failures do not slow down any further. Every successful
+    deployment then raises the current rate again by a tenth of ``rate`` via
+    :py:meth:`~.recover`, until the sustainable ``rate`` is reached again.
+
+    Listeners added via :py:meth:`~.add_state_listener` are called with the
+    ``name``, the :py:attr:`~.queue_depth` and the current :py:attr:`~.rate`
+    whenever one of them changes.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        min_rate: Optional[float] = None,
+        name: str = "",
+    ):
+        self._name = name
+        self._rate = rate
+        self._burst = burst
+        self._min_rate = rate / 64 if min_rate is None else min_rate
+        self._current_rate = rate
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._queue_depth = 0
+        self._throttled = -float("inf")
+        self._lock: Optional[asyncio.Lock] = None
+        self._state_listeners: List[Callable[[str, int, float], None]] = []
+        self._verify_settings()
+
+    def _verify_settings(self):
+        if not self._rate > 0:
+            raise ValueError(f"expected 'rate' > 0, got {self._rate!r} instead")
+        if not isinstance(self._burst, int) or self._burst <= 0:
+            raise ValueError(
+                f"'burst' must be an integer above 0, got {self._burst!r} instead"
+            )
+        if not 0 < self._min_rate <= self._rate:
+            raise ValueError(
+                f"expected 0 < 'min_rate' <= 'rate', got {self._min_rate!r} instead"
+            )
+
+    @property
+    def name(self) -> str:
+        """Name of the limited deployments"""
+        return self._name
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of drones currently waiting to deploy their resource"""
+        return self._queue_depth
+
+    @property
+    def rate(self) -> float:
+        """Current number of deployments per second"""
+        return self._current_rate
+
+    def add_state_listener(self, listener: Callable[[str, int, float], None]):
+        """Add a ``listener`` called on every change of the queue depth or rate"""
+        self._state_listeners.append(listener)
+
+    async def acquire(self) -> None:
+        """Wait until the next deployment is permitted"""
+        # lazily create the lock in the running event loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        self._set_queue_depth(self._queue_depth + 1)
+        try:
+            async with self._lock:
+                while self._refill() < 1:
+                    await asyncio.sleep((1 - self._tokens) / self._current_rate)
+                self._tokens -= 1
+        finally:
+            self._set_queue_depth(self._queue_depth - 1)
+
+    def release(self) -> None:
+        """Return the token of a deployment that has not been attempted"""
+        self._tokens = min(self._burst, self._tokens + 1)
+
+    def throttle(self, started: Optional[float] = None) -> None:
+        """
+        Slow down deployments, since the quota of the site is exceeded
+
+        :param started: :py:func:`time.monotonic` time the failed deployment
+            started at, failures of deployments started before the last slow
+            down are ignored
+        """
+        if started is not None and started < self._throttled:
+            return
+        self._throttled = time.monotonic()
+        self._set_rate(max(self._min_rate, self._current_rate / 2))
+        # tokens accumulated so far must not bypass the slow down
+        self._tokens = 0.0
+        self._last_refill = self._throttled
+        logger.warning(
+            f"Quota exceeded, slowing down to {self._current_rate:.3g} deployments/s"
+            f" with {self._queue_depth} drones waiting"
+        )
+
+    def recover(self) -> None:
+        """Speed up deployments again, since a deployment was successful"""
+        if self._current_rate < self._rate:
+            self._set_rate(min(self._rate, self._current_rate + self._rate / 10))
+
+    def _set_queue_depth(self, queue_depth: int) -> None:
+        self._queue_depth = queue_depth
+        self._notify_state_listeners()
+
+    def _set_rate(self, rate: float) -> None:
+        self._current_rate = rate
+        self._notify_state_listeners()
+
+    def _notify_state_listeners(self) -> None:
+        for listener in self._state_listeners:
+            try:
+                listener(self._name, self._queue_depth, self._current_rate)
+            except Exception as err:
+                # monitoring must never break the deployment of drones
+                logger.warning(f"Spawn state listener {listener!r} failed: {err!r}")
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            self._burst, self._tokens + (now - self._last_refill) * self._current_rate
+        )
+        self._last_refill = now
+        return self._tokens
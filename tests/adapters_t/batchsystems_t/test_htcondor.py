@@ -1,11 +1,15 @@
+from tests.utilities.utilities import async_return
 from tests.utilities.utilities import run_async
 from tests.utilities.utilities import mock_executor_run_command
 from tardis.adapters.batchsystems.htcondor import HTCondorAdapter
+from tardis.adapters.batchsystems.htcondor import HTCondorSlotStatus
+from tardis.adapters.batchsystems.htcondor import HTCondorStatusUpdater
 from tardis.adapters.batchsystems.htcondor import htcondor_status_updater
 from tardis.interfaces.batchsystemadapter import MachineStatus
 from tardis.exceptions.executorexceptions import CommandExecutionFailure
 from tardis.utilities.attributedict import AttributeDict
 
+from datetime import timedelta
 from functools import partial
 from shlex import quote
 from unittest.mock import patch
@@ -55,14 +59,14 @@ class TestHTCondorAdapter(TestCase):
         self.command = (
             "condor_status -af:t Machine Name State Activity TardisDroneUuid "
             "'Real(TotalSlotCpus-Cpus)/TotalSlotCpus' "
-            "'Real(TotalSlotMemory-Memory)/TotalSlotMemory' -constraint PartitionableSlot=?=True"  # noqa: B950
+            "'Real(TotalSlotMemory-Memory)/TotalSlotMemory' -constraint 'PartitionableSlot=?=True'"  # noqa: B950
             " -pool my-htcondor.local -test"
         )
 
         self.command_wo_options = (
             "condor_status -af:t Machine Name State Activity TardisDroneUuid "
             "'Real(TotalSlotCpus-Cpus)/TotalSlotCpus' "
-            "'Real(TotalSlotMemory-Memory)/TotalSlotMemory' -constraint PartitionableSlot=?=True"  # noqa: B950
+            "'Real(TotalSlotMemory-Memory)/TotalSlotMemory' -constraint 'PartitionableSlot=?=True'"  # noqa: B950
         )
 
         self.setup_config_mock(options={"pool": "my-htcondor.local", "test": None})
@@ -80,11 +84,35 @@ class TestHTCondorAdapter(TestCase):
             "memory_ratio": "Real(TotalSlotMemory-Memory)/TotalSlotMemory",
         }
         self.config.BatchSystem.max_age = 10
+        self.config.BatchSystem.stale_while_revalidate = False
+        self.config.BatchSystem.refresh_ahead = None
+        self.config.BatchSystem.max_staleness = None
+        self.config.BatchSystem.only_tardis_slots = False
+        self.config.BatchSystem.delta_updates = False
         if options:
             self.config.BatchSystem.options = options
         else:
             self.config.BatchSystem.options = {}
 
+    @mock_executor_run_command(stdout=CONDOR_RETURN)
+    def test_add_status_listener(self):
+        changes = []
+        self.htcondor_adapter.add_status_listener(changes.append)
+        # the first status does not wake up all drones at once
+        run_async(self.htcondor_adapter.get_machine_status, drone_uuid="test")
+        self.assertEqual(changes, [])
+
+        # changes of the resource ratios are not a change of the machine status
+        self.htcondor_adapter._htcondor_status._last_update -= timedelta(days=1)
+        changed_return = CONDOR_RETURN.replace(
+            "test\tslot1@test\tUnclaimed", "test\tslot1@test\tOwner"
+        ).replace(f"Retiring\tundefined\t{CPU_RATIO}", "Retiring\tundefined\t0.5")
+        self.mock_executor.return_value.run_command.return_value = async_return(
+            return_value=AttributeDict(stdout=changed_return, stderr="", exit_code=0)
+        )
+        run_async(self.htcondor_adapter.get_machine_status, drone_uuid="test")
+        self.assertEqual(changes, [{"test"}])
+
     def test_disintegrate_machine(self):
         self.assertIsNone(
             run_async(self.htcondor_adapter.disintegrate_machine, drone_uuid="test")
@@ -167,7 +195,7 @@ class TestHTCondorAdapter(TestCase):
             run_async(
                 self.htcondor_adapter.get_resource_ratios, drone_uuid="not_exists"
             ),
-            [],
+            (),
         )
         self.mock_executor.return_value.run_command.assert_not_called()
         self.mock_executor.reset_mock()
@@ -176,7 +204,7 @@ class TestHTCondorAdapter(TestCase):
             run_async(
                 self.htcondor_adapter.get_resource_ratios, drone_uuid="test_undefined"
             ),
-            [],
+            (),
         )
         self.mock_executor.return_value.run_command.assert_not_called()
         self.mock_executor.reset_mock()
@@ -185,8 +213,28 @@ class TestHTCondorAdapter(TestCase):
             run_async(
                 self.htcondor_adapter.get_resource_ratios, drone_uuid="test_error"
             ),
-            [],
+            (),
+        )
+
+    @mock_executor_run_command(stdout=CONDOR_RETURN)
+    def test_slot_status(self):
+        run_async(self.htcondor_adapter._htcondor_status.update_status)
+        self.assertEqual(
+            self.htcondor_adapter._htcondor_status["test_drain"],
+            HTCondorSlotStatus(
+                name="slot1@test",
+                state="Drained",
+                activity="Retiring",
+                machine_status=MachineStatus.Draining,
+                resource_ratios=(self.cpu_ratio, self.memory_ratio),
+                allocation=self.cpu_ratio,
+                utilisation=self.memory_ratio,
+            ),
         )
+        slot_status = self.htcondor_adapter._htcondor_status["test_error"]
+        self.assertEqual(slot_status.resource_ratios, ())
+        self.assertEqual(slot_status.allocation, 0.0)
+        self.assertEqual(slot_status.utilisation, 0.0)
 
     @mock_executor_run_command(stdout=CONDOR_RETURN)
     def test_get_resource_ratios_without_options(self):
@@ -292,6 +340,86 @@ class TestHTCondorAdapter(TestCase):
         )
         self.mock_executor.return_value.run_command.assert_called_with(self.command)
 
+    @mock_executor_run_command(stdout=CONDOR_RETURN)
+    def test_only_tardis_slots(self):
+        self.config.BatchSystem.only_tardis_slots = True
+        htcondor_adapter = HTCondorAdapter()
+        run_async(htcondor_adapter.get_machine_status, drone_uuid="test_uuid")
+        self.mock_executor.return_value.run_command.assert_called_with(
+            self.command.replace(
+                "'PartitionableSlot=?=True'",
+                "'PartitionableSlot=?=True && TardisDroneUuid =!= undefined'",
+            )
+        )
+
+    def test_delta_updates(self):
+        self.config.BatchSystem.delta_updates = True
+        self.config.BatchSystem.full_update_interval = 15
+        htcondor_adapter = HTCondorAdapter()
+        status_updater = htcondor_adapter._htcondor_status._update_coroutine
+        self.assertIsInstance(status_updater, HTCondorStatusUpdater)
+        self.assertEqual(status_updater._full_update_interval, 15 * 60)
+        self.assertEqual(status_updater._attributes["LastHeardFrom"], "LastHeardFrom")
+
+    def test_htcondor_status_updater_delta(self):
+        commands, responses = [], []
+
+        async def run_command(command):
+            commands.append(command)
+            return AttributeDict(stdout=responses.pop(0), stderr="", exit_code=0)
+
+        self.mock_executor.return_value.run_command.side_effect = run_command
+        self.addCleanup(
+            setattr, self.mock_executor.return_value.run_command, "side_effect", None
+        )
+        attributes = AttributeDict(
+            Machine="Machine",
+            Name="Name",
+            State="State",
+            Activity="Activity",
+            TardisDroneUuid="TardisDroneUuid",
+            LastHeardFrom="LastHeardFrom",
+        )
+        status_updater = HTCondorStatusUpdater(
+            {}, attributes, self.mock_executor.return_value, full_update_interval=60
+        )
+
+        responses.append(
+            "a\tslot1@a\tUnclaimed\tIdle\tdrone-a\t100\n"
+            "b\tslot1@b\tUnclaimed\tIdle\tdrone-b\t105"
+        )
+        status = run_async(status_updater)
+        self.assertEqual(set(status), {"drone-a", "drone-b"})
+        self.assertEqual(
+            commands[-1],
+            "condor_status -af:t Machine Name State Activity TardisDroneUuid"
+            " LastHeardFrom -constraint 'PartitionableSlot=?=True'",
+        )
+
+        # only slots heard from since the last query are fetched and merged
+        responses.append("b\tslot1@b\tDrained\tRetiring\tdrone-b\t110")
+        delta_status = run_async(status_updater)
+        self.assertTrue(
+            commands[-1].endswith(
+                "-constraint 'PartitionableSlot=?=True && LastHeardFrom >= 105'"
+            )
+        )
+        self.assertEqual(set(delta_status), {"drone-a", "drone-b"})
+        self.assertEqual(delta_status["drone-b"].state, "Drained")
+        # the previous status is left untouched for comparison by listeners
+        self.assertEqual(status["drone-b"].state, "Unclaimed")
+
+        # no changes keep the status and the last time heard from
+        responses.append("")
+        self.assertEqual(run_async(status_updater), delta_status)
+        self.assertTrue(commands[-1].endswith("LastHeardFrom >= 110'"))
+
+        # a full query drops vanished slots
+        status_updater._last_full_update -= 60
+        responses.append("b\tslot1@b\tDrained\tIdle\tdrone-b\t170")
+        self.assertEqual(set(run_async(status_updater)), {"drone-b"})
+        self.assertTrue(commands[-1].endswith("-constraint 'PartitionableSlot=?=True'"))
+
     def test_machine_meta_data_translation_mapping(self):
         self.assertEqual(
             AttributeDict(Cores=1, Memory=1024, Disk=1024 * 1024),
@@ -1,8 +1,10 @@
 import logging
 
+from tests.utilities.utilities import async_return
 from tests.utilities.utilities import run_async
 from tests.utilities.utilities import mock_executor_run_command
 from tardis.adapters.batchsystems.slurm import SlurmAdapter
+from tardis.adapters.batchsystems.slurm import SlurmNodeStatus
 from tardis.utilities.attributedict import AttributeDict
 
 from tardis.adapters.batchsystems.slurm import slurm_status_updater
@@ -10,6 +12,7 @@ from tardis.interfaces.batchsystemadapter import MachineStatus
 
 from tardis.exceptions.executorexceptions import CommandExecutionFailure
 
+from datetime import timedelta
 from functools import partial
 
 from unittest.mock import patch
@@ -67,6 +70,9 @@ class TestSlurmAdapter(TestCase):
     def setup_config_mock(self, options=None):
         self.config = self.mock_config.return_value
         self.config.BatchSystem.max_age = 10
+        self.config.BatchSystem.stale_while_revalidate = False
+        self.config.BatchSystem.refresh_ahead = None
+        self.config.BatchSystem.max_staleness = None
         self.config.BatchSystem.executor = self.mock_executor.return_value
         if options:
             self.config.BatchSystem.options = options
@@ -127,9 +133,30 @@ class TestSlurmAdapter(TestCase):
 
         self.assertEqual(
             run_async(self.slurm_adapter.get_resource_ratios, drone_uuid="not_exists"),
-            {},
+            (),
         )
 
+    @mock_executor_run_command(
+        stdout=SINFO_RETURN + "\nidle 0/0/0/0 0 0 empty_m empty_m"
+    )
+    def test_node_status(self):
+        run_async(self.slurm_adapter._slurm_status.update_status)
+        self.assertEqual(
+            self.slurm_adapter._slurm_status["VM-1"],
+            SlurmNodeStatus(
+                machine="host-10-18-1-1",
+                state="mixed",
+                machine_status=MachineStatus.Available,
+                resource_ratios=(self.cpu_ratio, self.memory_ratio),
+                allocation=self.cpu_ratio,
+                utilisation=self.memory_ratio,
+            ),
+        )
+        # nodes without resources have no ratios instead of failing the update
+        node_status = self.slurm_adapter._slurm_status["empty_m"]
+        self.assertEqual(node_status.resource_ratios, ())
+        self.assertEqual(node_status.allocation, 0.0)
+
     @mock_executor_run_command(stdout=SINFO_RETURN)
     def test_get_resource_ratios_without_options(self):
         self.setup_config_mock()
@@ -158,6 +185,25 @@ class TestSlurmAdapter(TestCase):
             0.0,
         )
 
+    @mock_executor_run_command(stdout=SINFO_RETURN)
+    def test_add_status_listener(self):
+        changes = []
+        self.slurm_adapter.add_status_listener(changes.append)
+        # the first status does not wake up all drones at once
+        run_async(self.slurm_adapter.get_machine_status, drone_uuid="VM-1")
+        self.assertEqual(changes, [])
+
+        self.slurm_adapter._slurm_status._last_update -= timedelta(days=1)
+        self.mock_executor.return_value.run_command.return_value = async_return(
+            return_value=AttributeDict(
+                stdout=SINFO_RETURN.replace("draining   0/4", "drained    0/4"),
+                stderr="",
+                exit_code=0,
+            )
+        )
+        run_async(self.slurm_adapter.get_machine_status, drone_uuid="VM-1")
+        self.assertEqual(changes, [{"draining_m"}])
+
     @mock_executor_run_command(stdout=SINFO_RETURN)
     def test_get_machine_status(self):
         state_mapping = {
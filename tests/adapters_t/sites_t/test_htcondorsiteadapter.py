@@ -1,4 +1,4 @@
-from tardis.adapters.sites.htcondor import HTCondorAdapter
+from tardis.adapters.sites.htcondor import CondorSubmitRejected, HTCondorAdapter
 from tardis.exceptions.executorexceptions import CommandExecutionFailure
 from tardis.exceptions.tardisexceptions import TardisError
 from tardis.exceptions.tardisexceptions import TardisResourceStatusUpdateFailed
@@ -131,6 +131,8 @@ class TestHTCondorSiteAdapter(TestCase):
         test_site_config.executor = self.mock_executor.return_value
         test_site_config.bulk_size = 100
         test_site_config.bulk_delay = 0.01
+        test_site_config.bulk_min_delay = None
+        test_site_config.bulk_concurrent = None
         test_site_config.max_age = 10
 
         self.adapter = HTCondorAdapter(machine_type="test2large", site_name="TestSite")
@@ -261,6 +263,93 @@ class TestHTCondorSiteAdapter(TestCase):
             "condor_submit -verbose -maxjobs 1 -pool my_remote_pool -spool", args[0]
         )
 
+    @mock_executor_run_command(
+        stdout="Submitting job(s)\n** Proc 1351043.0:\n** Proc 1351043.1:\n"
+    )
+    def test_deploy_resources(self):
+        responses = run_async(
+            self.adapter.deploy_resources,
+            [
+                AttributeDict(
+                    drone_uuid=f"test-{index}",
+                    obs_machine_meta_data_translation_mapping=AttributeDict(
+                        Cores=1,
+                        Memory=1024,
+                        Disk=1024 * 1024,
+                    ),
+                )
+                for index in range(2)
+            ],
+        )
+        self.assertEqual(
+            [response.remote_resource_uuid for response in responses],
+            ["1351043.0", "1351043.1"],
+        )
+        args, _ = self.mock_executor.return_value.run_command.call_args
+        self.assertEqual("condor_submit -verbose -maxjobs 2 ", args[0])
+
+    def test_deploy_resources_bisect(self):
+        submitted = []
+
+        async def run_command(command, stdin_input):
+            if "test-bad" in stdin_input:
+                raise CommandExecutionFailure(
+                    message="Failed", stdout="", stderr="Failed", exit_code=1
+                )
+            start = len(submitted)
+            submitted.extend(range(start, start + stdin_input.count("queue 1")))
+            return AttributeDict(
+                stdout="".join(
+                    f"** Proc 1351043.{index}:\n" for index in submitted[start:]
+                ),
+                stderr="",
+                exit_code=0,
+            )
+
+        executor = self.mock_executor.return_value
+        executor.run_command.side_effect = run_command
+        self.addCleanup(setattr, executor.run_command, "side_effect", None)
+
+        # a bad JDL fails only its own drone instead of the entire bulk
+        resource_attributes = [
+            AttributeDict(
+                drone_uuid=drone_uuid,
+                obs_machine_meta_data_translation_mapping=AttributeDict(
+                    Cores=1,
+                    Memory=1024,
+                    Disk=1024 * 1024,
+                ),
+            )
+            for drone_uuid in ("test-0", "test-1", "test-bad", "test-3")
+        ]
+        responses = run_async(self.adapter.deploy_resources, resource_attributes)
+        self.assertIsInstance(responses[2], CommandExecutionFailure)
+        self.assertEqual(
+            [responses[index].remote_resource_uuid for index in (0, 1, 3)],
+            ["1351043.0", "1351043.1", "1351043.2"],
+        )
+
+        # an unavailable schedd is not bisected down to every drone
+        executor.run_command.reset_mock()
+        executor.run_command.side_effect = CommandExecutionFailure(
+            message="Failed", stdout="", stderr="Failed", exit_code=1
+        )
+        responses = run_async(self.adapter.deploy_resources, resource_attributes * 25)
+        self.assertEqual(executor.run_command.call_count, 3)
+        for response in responses:
+            self.assertIsInstance(response, CommandExecutionFailure)
+
+        # a lost connection may have submitted the jobs and is not retried
+        executor.run_command.reset_mock()
+        executor.run_command.side_effect = CommandExecutionFailure(
+            message="Failed", stdout="", stderr="SSH connection lost", exit_code=255
+        )
+        responses = run_async(self.adapter.deploy_resources, resource_attributes)
+        executor.run_command.assert_called_once()
+        for response in responses:
+            self.assertIsInstance(response, CommandExecutionFailure)
+            self.assertNotIsInstance(response, CondorSubmitRejected)
+
     def test_translate_resources_raises_logs(self):
         self.adapter = HTCondorAdapter(
             machine_type="testunkownresource", site_name="TestSite"
@@ -290,6 +379,25 @@ class TestHTCondorSiteAdapter(TestCase):
     def test_site_name(self):
         self.assertEqual(self.adapter.site_name, "TestSite")
 
+    def test_bulk_call_names(self):
+        self.assertEqual(
+            [
+                bulk_call.name
+                for bulk_call in (
+                    self.adapter._condor_submit,
+                    self.adapter._condor_suspend,
+                    self.adapter._condor_rm,
+                    self.adapter._condor_q,
+                )
+            ],
+            [
+                "testsite_test2large_condor_submit",
+                "testsite_test2large_condor_suspend",
+                "testsite_test2large_condor_rm",
+                "testsite_test2large_condor_q",
+            ],
+        )
+
     @mock_executor_run_command(stdout=CONDOR_Q_OUTPUT_IDLE)
     def test_resource_status_idle(self):
         response = run_async(
@@ -362,6 +470,55 @@ class TestHTCondorSiteAdapter(TestCase):
                     ),
                 )
 
+    @mock_executor_run_command(stdout=CONDOR_Q_OUTPUT_RUN)
+    def test_resource_status_many(self):
+        responses = run_async(
+            self.adapter.resource_status_many,
+            [
+                AttributeDict(remote_resource_uuid="1351043.0"),
+                AttributeDict(remote_resource_uuid="1351042.0"),
+            ],
+        )
+        self.assertEqual(
+            [response.resource_status for response in responses],
+            [ResourceStatus.Running, ResourceStatus.Deleted],
+        )
+        self.mock_executor.return_value.run_command.assert_called_with(
+            "condor_q 1351043.0 1351042.0 -af:t JobStatus ClusterId ProcId"
+        )
+
+    @mock_executor_run_command(stdout=CONDOR_Q_OUTPUT_RUN)
+    def test_resource_status_many_duplicates(self):
+        responses = run_async(
+            self.adapter.resource_status_many,
+            [
+                AttributeDict(remote_resource_uuid="1351043.0"),
+                AttributeDict(remote_resource_uuid="1351043.0"),
+            ],
+        )
+        self.assertEqual(
+            [response.resource_status for response in responses],
+            [ResourceStatus.Running, ResourceStatus.Running],
+        )
+        # the status of each job is queried only once
+        self.mock_executor.return_value.run_command.assert_called_with(
+            "condor_q 1351043.0 -af:t JobStatus ClusterId ProcId"
+        )
+
+    @mock_executor_run_command(
+        stdout="",
+        raise_exception=CommandExecutionFailure(
+            message="Failed", stdout="Failed", stderr="Failed", exit_code=2
+        ),
+    )
+    def test_resource_status_many_command_execution_error(self):
+        with self.assertLogs(level=logging.WARNING):
+            responses = run_async(
+                self.adapter.resource_status_many,
+                [AttributeDict(remote_resource_uuid="1351043.0")],
+            )
+        self.assertIsInstance(responses[0], CommandExecutionFailure)
+
     @mock_executor_run_command(stdout=CONDOR_Q_OUTPUT_DOES_NOT_EXISTS)
     def test_resource_status_already_deleted(self):
         response = run_async(
@@ -377,6 +534,35 @@ class TestHTCondorSiteAdapter(TestCase):
         )
         self.assertIsNone(response)
 
+    @mock_executor_run_command(
+        stdout="",
+        raise_exception=CommandExecutionFailure(
+            message=CONDOR_SUSPEND_FAILED_MESSAGE,
+            exit_code=2,
+            stderr=CONDOR_SUSPEND_FAILED_OUTPUT_NOT_FOUND,
+            stdout="",
+            stdin="",
+        ),
+    )
+    def test_stop_resources_failed_raise(self):
+        responses = run_async(
+            self.adapter.stop_resources,
+            [AttributeDict(remote_resource_uuid="1351043.0")],
+        )
+        self.assertIsInstance(responses[0], CommandExecutionFailure)
+
+    @mock_executor_run_command(stdout=CONDOR_SUSPEND_OUTPUT)
+    def test_stop_resources(self):
+        responses = run_async(
+            self.adapter.stop_resources,
+            [
+                AttributeDict(remote_resource_uuid="1351043.0"),
+                AttributeDict(remote_resource_uuid="1351044.0"),
+            ],
+        )
+        self.assertIsNone(responses[0])
+        self.assertIsInstance(responses[1], TardisResourceStatusUpdateFailed)
+
     @mock_executor_run_command(
         stdout="",
         raise_exception=CommandExecutionFailure(
@@ -436,6 +622,18 @@ class TestHTCondorSiteAdapter(TestCase):
         )
         self.assertIsNone(response)
 
+    @mock_executor_run_command(stdout=CONDOR_RM_OUTPUT)
+    def test_terminate_resources(self):
+        responses = run_async(
+            self.adapter.terminate_resources,
+            [
+                AttributeDict(remote_resource_uuid="1351043.0"),
+                AttributeDict(remote_resource_uuid="1351044.0"),
+            ],
+        )
+        self.assertIsNone(responses[0])
+        self.assertIsInstance(responses[1], TardisResourceStatusUpdateFailed)
+
     @mock_executor_run_command(stdout=CONDOR_RM_FAILED_OUTPUT)
     def test_terminate_resource_failed_redo(self):
         with self.assertRaises(TardisResourceStatusUpdateFailed):
@@ -168,6 +168,8 @@ class TestMoabAdapter(TestCase):
         self.test_site_config.MachineTypeConfiguration = self.machine_type_configuration
         self.test_site_config.executor = self.mock_executor.return_value
         self.test_site_config.bulk_delay = 0.01
+        self.test_site_config.bulk_min_delay = None
+        self.test_site_config.bulk_concurrent = None
 
         self.moab_adapter = MoabAdapter(machine_type="test2large", site_name="TestSite")
 
@@ -13,6 +13,10 @@ class TestBatchSystemAgent(TestCase):
         self.batch_system_adapter = create_autospec(BatchSystemAdapter)
         self.batch_system_agent = BatchSystemAgent(self.batch_system_adapter)
 
+    def test_add_status_listener(self):
+        self.batch_system_agent.add_status_listener(print)
+        self.batch_system_adapter.add_status_listener.assert_called_with(print)
+
     def test_disintegrate_machine(self):
         self.batch_system_adapter.disintegrate_machine.side_effect = async_return
         run_async(self.batch_system_agent.disintegrate_machine, drone_uuid="test")
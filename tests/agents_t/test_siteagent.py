@@ -1,11 +1,23 @@
 from tests.utilities.utilities import run_async
 from tests.utilities.utilities import async_return
+from tests.utilities.utilities import set_awaitable_return_value
 from tardis.agents.siteagent import SiteAgent
+from tardis.exceptions.tardisexceptions import TardisError
+from tardis.exceptions.tardisexceptions import TardisQuotaExceeded
+from tardis.exceptions.tardisexceptions import TardisResourceStatusUpdateFailed
+from tardis.exceptions.tardisexceptions import TardisSiteUnavailable
+from tardis.exceptions.tardisexceptions import TardisTimeout
 from tardis.interfaces.siteadapter import SiteAdapter
+from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.circuitbreaker import CircuitBreaker, CircuitState
 
+from contextlib import contextmanager, nullcontext
 from unittest import TestCase
 from unittest.mock import create_autospec
 from unittest.mock import PropertyMock
+from unittest.mock import patch
+
+import asyncio
 
 
 class TestSiteAgent(TestCase):
@@ -13,11 +25,43 @@ class TestSiteAgent(TestCase):
         self.site_adapter = create_autospec(SiteAdapter)
         self.site_agent = SiteAgent(self.site_adapter)
 
+    def test_add_status_listener(self):
+        self.site_agent.add_status_listener(print)
+        self.site_adapter.add_status_listener.assert_called_with(print)
+
     def test_deploy_resource(self):
         self.site_adapter.deploy_resource.side_effect = async_return
         run_async(self.site_agent.deploy_resource, resource_attributes="test")
         self.site_adapter.deploy_resource.assert_called_with(resource_attributes="test")
 
+    def test_circuit_breaker(self):
+        circuit_breaker = CircuitBreaker(name="TestSite", failure_threshold=2)
+        site_agent = SiteAgent(self.site_adapter, circuit_breaker=circuit_breaker)
+        self.site_adapter.handle_exceptions.return_value = nullcontext()
+        self.site_adapter.resource_status.side_effect = TardisTimeout
+        self.site_adapter.resource_status_many.side_effect = TardisTimeout
+
+        with self.assertRaises(TardisTimeout):
+            run_async(site_agent.resource_status, AttributeDict(drone_uuid="test"))
+        with self.assertLogs(level="WARNING"):
+            with self.assertRaises(TardisTimeout):
+                run_async(site_agent.resource_status_many, [AttributeDict()])
+        self.assertEqual(circuit_breaker.state, CircuitState.Open)
+
+        # the site adapter is not called anymore while the circuit is open
+        self.site_adapter.reset_mock()
+        for call, resource_attributes in (
+            (site_agent.deploy_resource, AttributeDict()),
+            (site_agent.resource_status, AttributeDict(drone_uuid="test")),
+            (site_agent.stop_resource, AttributeDict()),
+            (site_agent.terminate_resource, AttributeDict()),
+            (site_agent.stop_resources, [AttributeDict()]),
+        ):
+            with self.subTest(call=call.__name__):
+                with self.assertRaises(TardisSiteUnavailable):
+                    run_async(call, resource_attributes)
+        self.assertEqual(self.site_adapter.method_calls, [])
+
     def test_drone_uuid(self):
         self.site_adapter.drone_uuid.return_value = None
         self.site_agent.drone_uuid(uuid="test")
@@ -28,6 +72,16 @@ class TestSiteAgent(TestCase):
         self.assertEqual(self.site_agent.drone_heartbeat_interval(), 60)
         self.site_adapter.drone_heartbeat_interval.assert_called_with()
 
+    def test_drone_heartbeat_backoff(self):
+        self.site_adapter.drone_heartbeat_intervals = {"BootingState": 10}
+        self.site_adapter.drone_heartbeat_backoff = 2.0
+        self.site_adapter.drone_heartbeat_max_interval = 600
+        self.assertEqual(
+            self.site_agent.drone_heartbeat_intervals, {"BootingState": 10}
+        )
+        self.assertEqual(self.site_agent.drone_heartbeat_backoff, 2.0)
+        self.assertEqual(self.site_agent.drone_heartbeat_max_interval, 600)
+
     def test_drone_minimum_lifetime(self):
         self.site_adapter.drone_minimum_lifetime.return_value = None
         self.assertIsNone(self.site_agent.drone_minimum_lifetime())
@@ -57,6 +111,169 @@ class TestSiteAgent(TestCase):
         run_async(self.site_agent.resource_status, resource_attributes="test")
         self.site_adapter.resource_status.assert_called_with(resource_attributes="test")
 
+    def test_resource_status_many(self):
+        set_awaitable_return_value(
+            self.site_adapter.resource_status_many,
+            [AttributeDict(resource_status="test"), TardisResourceStatusUpdateFailed()],
+        )
+        self.site_adapter.handle_exceptions.return_value = nullcontext()
+        responses = run_async(self.site_agent.resource_status_many, ("a", "b"))
+        self.site_adapter.resource_status_many.assert_called_with(["a", "b"])
+        self.assertEqual(responses[0], AttributeDict(resource_status="test"))
+        self.assertIsInstance(responses[1], TardisResourceStatusUpdateFailed)
+
+    def test_bulk_exception_translation(self):
+        @contextmanager
+        def handle_exceptions():
+            try:
+                yield
+            except ValueError as err:
+                raise TardisError from err
+
+        self.site_adapter.handle_exceptions.side_effect = handle_exceptions
+        for bulk_method in ("deploy", "stop", "terminate"):
+            with self.subTest(bulk_method=bulk_method):
+                site_adapter_call = getattr(
+                    self.site_adapter, f"{bulk_method}_resources"
+                )
+                set_awaitable_return_value(site_adapter_call, [None, ValueError()])
+                site_agent_call = getattr(self.site_agent, f"{bulk_method}_resources")
+                responses = run_async(site_agent_call, ("a", "b"))
+                site_adapter_call.assert_called_with(["a", "b"])
+                self.assertIsInstance(responses[1], TardisError)
+                self.assertIsInstance(responses[1].__cause__, ValueError)
+
+                site_adapter_call.side_effect = ValueError
+                with self.assertRaises(TardisError):
+                    run_async(site_agent_call, ("a", "b"))
+
+    def test_bulk_call_names(self):
+        type(self.site_adapter).site_name = PropertyMock(return_value="TestSite")
+        type(self.site_adapter).machine_type = PropertyMock(return_value="Test123")
+        self.site_agent = SiteAgent(self.site_adapter, bulk_delay=0.01)
+        self.assertEqual(
+            [
+                bulk_call.name
+                for bulk_call in (
+                    self.site_agent._bulk_deploy,
+                    self.site_agent._bulk_stop,
+                    self.site_agent._bulk_terminate,
+                )
+            ],
+            [
+                "testsite_test123_deploy_resources",
+                "testsite_test123_stop_resources",
+                "testsite_test123_terminate_resources",
+            ],
+        )
+
+    def test_bulk_delay(self):
+        self.site_agent = SiteAgent(self.site_adapter, bulk_delay=0.01)
+        self.site_adapter.handle_exceptions.return_value = nullcontext()
+
+        async def bulk_call(resource_attributes):
+            return [
+                (
+                    TardisQuotaExceeded()
+                    if resource == "bad"
+                    else AttributeDict(a=resource)
+                )
+                for resource in resource_attributes
+            ]
+
+        async def call_at_once(site_agent_call):
+            return await asyncio.gather(
+                *(site_agent_call(resource) for resource in ("a", "bad", "b")),
+                return_exceptions=True,
+            )
+
+        for bulk_method in ("deploy", "stop", "terminate"):
+            with self.subTest(bulk_method=bulk_method):
+                site_adapter_call = getattr(
+                    self.site_adapter, f"{bulk_method}_resources"
+                )
+                site_adapter_call.side_effect = bulk_call
+                site_agent_call = getattr(self.site_agent, f"{bulk_method}_resource")
+                responses = run_async(call_at_once, site_agent_call)
+                # concurrent calls of drones are executed as one bulk call
+                site_adapter_call.assert_called_once_with(["a", "bad", "b"])
+                getattr(
+                    self.site_adapter, f"{bulk_method}_resource"
+                ).assert_not_called()
+                self.assertEqual(responses[0], AttributeDict(a="a"))
+                self.assertIsInstance(responses[1], TardisQuotaExceeded)
+                self.assertEqual(responses[2], AttributeDict(a="b"))
+
+    def test_prefetch_resource_status(self):
+        resources = [AttributeDict(drone_uuid=f"test-{i}") for i in range(3)]
+        set_awaitable_return_value(
+            self.site_adapter.resource_status_many,
+            [
+                AttributeDict(resource_status="test-0"),
+                TardisResourceStatusUpdateFailed(),
+                AttributeDict(resource_status="test-2"),
+            ],
+        )
+        set_awaitable_return_value(
+            self.site_adapter.resource_status, AttributeDict(resource_status="queried")
+        )
+        self.site_adapter.handle_exceptions.return_value = nullcontext()
+        run_async(self.site_agent.prefetch_resource_status, resources, max_age=60)
+        self.site_adapter.resource_status_many.assert_called_once_with(resources)
+
+        # prefetched status is used once instead of querying the site adapter
+        self.assertEqual(
+            run_async(self.site_agent.resource_status, resources[0]),
+            AttributeDict(resource_status="test-0"),
+        )
+        self.site_adapter.resource_status.assert_not_called()
+
+        # failed queries are not cached, but queried again
+        self.assertEqual(
+            run_async(self.site_agent.resource_status, resources[1]),
+            AttributeDict(resource_status="queried"),
+        )
+        self.assertEqual(self.site_adapter.resource_status.call_count, 1)
+
+        run_async(self.site_agent.resource_status, resources[0])
+        self.assertEqual(self.site_adapter.resource_status.call_count, 2)
+
+        # a failing bulk query discards outdated prefetched status
+        self.site_adapter.resource_status_many.side_effect = (
+            TardisResourceStatusUpdateFailed
+        )
+        with self.assertRaises(TardisResourceStatusUpdateFailed):
+            run_async(self.site_agent.prefetch_resource_status, resources, 60)
+        run_async(self.site_agent.resource_status, resources[2])
+        self.assertEqual(self.site_adapter.resource_status.call_count, 3)
+
+    @patch("tardis.agents.siteagent.time.monotonic")
+    def test_prefetch_resource_status_max_age(self, mocked_monotonic):
+        mocked_monotonic.return_value = 0
+        resources = [AttributeDict(drone_uuid=f"test-{i}") for i in range(2)]
+        set_awaitable_return_value(
+            self.site_adapter.resource_status_many,
+            [AttributeDict(resource_status="prefetched")] * 2,
+        )
+        set_awaitable_return_value(
+            self.site_adapter.resource_status, AttributeDict(resource_status="queried")
+        )
+        self.site_adapter.handle_exceptions.return_value = nullcontext()
+        run_async(self.site_agent.prefetch_resource_status, resources, max_age=10)
+
+        # prefetched status outdated by the next tick is queried again
+        mocked_monotonic.return_value = 10
+        self.assertEqual(
+            run_async(self.site_agent.resource_status, resources[0]),
+            AttributeDict(resource_status="queried"),
+        )
+        self.assertEqual(self.site_agent._resource_status_snapshot.keys(), {"test-1"})
+
+        # outdated status that is never used is discarded by the next prefetch
+        set_awaitable_return_value(self.site_adapter.resource_status_many, [])
+        run_async(self.site_agent.prefetch_resource_status, [], max_age=10)
+        self.assertEqual(self.site_agent._resource_status_snapshot, {})
+
     def test_site_name(self):
         type(self.site_adapter).site_name = PropertyMock(return_value="Test123")
         self.assertEqual(self.site_agent.site_name, "Test123")
@@ -1,7 +1,14 @@
+from tardis.configuration import factories
+from tardis.configuration.utilities import enable_lazy_yaml_load
 from tardis.configuration.utilities import enable_yaml_load
+from tardis.configuration.utilities import LazyFactory
+
+from cobald.daemon.plugins import YAMLTagSettings
 
 from unittest import TestCase
 
+import subprocess
+import sys
 import yaml
 
 
@@ -34,3 +41,60 @@ class TestEnableYAMLLoad(TestCase):
         instance = yaml.safe_load(kwargs_yml)
         self.assertEqual(instance.args, ())
         self.assertEqual(instance.kwargs, {"test": "test"})
+
+
+class TestEnableLazyYAMLLoad(TestCase):
+    def test_enable_lazy_yaml_load(self):
+        enable_lazy_yaml_load(
+            "!LazyTestDummy", "tests.configuration_t.test_utilities", "TestDummy"
+        )
+        instance = yaml.safe_load(
+            """
+        !LazyTestDummy
+        test: test
+        """
+        )
+        self.assertIsInstance(instance, TestDummy)
+        self.assertEqual(instance.kwargs, {"test": "test"})
+
+    def test_configuration_imports(self):
+        # executors are only imported once their YAML tag is used
+        code = (
+            "import sys, tardis.configuration.configuration;"
+            "print('tardis.utilities.executors.sshexecutor' in sys.modules)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], check=True, capture_output=True, text=True
+        )
+        self.assertEqual(result.stdout.strip(), "False")
+
+
+class TestLazyFactory(TestCase):
+    def test_call(self):
+        factory = LazyFactory("tests.configuration_t.test_utilities", "TestDummy")
+        self.assertIs(factory.factory, TestDummy)
+        instance = factory("test", test="test")
+        self.assertIsInstance(instance, TestDummy)
+        self.assertEqual(instance.args, ("test",))
+        self.assertEqual(instance.kwargs, {"test": "test"})
+        self.assertEqual(
+            repr(factory),
+            "LazyFactory('tests.configuration_t.test_utilities', 'TestDummy')",
+        )
+
+    def test_yaml_tag_settings(self):
+        self.assertFalse(YAMLTagSettings.fetch(LazyFactory("os", "getcwd")).eager)
+        self.assertTrue(
+            YAMLTagSettings.fetch(LazyFactory("os", "getcwd", eager=True)).eager
+        )
+
+    def test_entry_point_factories(self):
+        for name in dir(factories):
+            factory = getattr(factories, name)
+            if not isinstance(factory, LazyFactory):
+                continue
+            with self.subTest(name=name):
+                self.assertEqual(
+                    YAMLTagSettings.fetch(factory).eager,
+                    YAMLTagSettings.fetch(factory.factory).eager,
+                )
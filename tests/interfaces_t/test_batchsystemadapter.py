@@ -11,6 +11,9 @@ class TestBatchSystemAdapter(TestCase):
     def setUp(self) -> None:
         self.batch_system_adapter = BatchSystemAdapter()
 
+    def test_add_status_listener(self):
+        self.assertIsNone(self.batch_system_adapter.add_status_listener(print))
+
     def test_disintegrate_machine(self):
         with self.assertRaises(NotImplementedError):
             run_async(self.batch_system_adapter.disintegrate_machine, "test-123")
@@ -0,0 +1,42 @@
+from tardis.interfaces.plugin import Plugin
+from tardis.utilities.attributedict import AttributeDict
+
+from tests.utilities.utilities import run_async
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, call, patch
+
+
+class TestPlugin(TestCase):
+    mock_config_patcher = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.mock_config_patcher = patch("tardis.interfaces.plugin.Configuration")
+        cls.mock_config = cls.mock_config_patcher.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.mock_config_patcher.stop()
+
+    @patch.multiple(Plugin, __abstractmethods__=set())
+    def setUp(self) -> None:
+        self.config = self.mock_config.return_value
+        self.config.Plugins = AttributeDict(Plugin=AttributeDict())
+        self.plugin = Plugin()
+
+    def test_notify_timeout(self):
+        self.assertIsNone(self.plugin.notify_timeout)
+
+        self.config.Plugins.Plugin.notify_timeout = 10
+        del self.plugin.notify_timeout  # reset cached_property's cache
+        self.assertEqual(self.plugin.notify_timeout, 10)
+
+        del self.config.Plugins
+        del self.plugin.notify_timeout
+        self.assertIsNone(self.plugin.notify_timeout)
+
+    def test_notify_many(self):
+        with patch.object(Plugin, "notify", new_callable=AsyncMock) as notify:
+            run_async(self.plugin.notify_many, [("a", 1), ("b", 2)])
+        self.assertEqual(notify.mock_calls, [call("a", 1), call("b", 2)])
@@ -1,3 +1,4 @@
+from tardis.exceptions.tardisexceptions import TardisResourceStatusUpdateFailed
 from tardis.interfaces.siteadapter import SiteAdapter
 from tardis.utilities.attributedict import AttributeDict
 
@@ -8,6 +9,7 @@ from unittest import TestCase
 from unittest.mock import patch
 from pydantic.error_wrappers import ValidationError
 
+import asyncio
 import logging
 
 
@@ -42,6 +44,9 @@ class TestSiteAdapter(TestCase):
         self.site_adapter._site_name = "TestSite"
         self.site_adapter._machine_type = "TestMachineType"
 
+    def test_add_status_listener(self):
+        self.assertIsNone(self.site_adapter.add_status_listener(print))
+
     def test_configuration(self):
         self.assertEqual(self.site_adapter.configuration, self.config.TestSite)
 
@@ -93,6 +98,57 @@ class TestSiteAdapter(TestCase):
             # noinspection PyStatementEffect
             self.site_adapter.drone_heartbeat_interval
 
+    def test_drone_heartbeat_backoff(self):
+        self.assertEqual(self.site_adapter.drone_heartbeat_intervals, {})
+        self.assertEqual(self.site_adapter.drone_heartbeat_backoff, 1.0)
+        self.assertIsNone(self.site_adapter.drone_heartbeat_max_interval)
+
+        # lru_cache needs to be cleared before manipulating site configuration
+        # noinspection PyUnresolvedReferences
+        SiteAdapter.site_configuration.fget.cache_clear()
+
+        self.config.Sites[0]["drone_heartbeat_intervals"] = {"BootingState": 10}
+        self.config.Sites[0]["drone_heartbeat_backoff"] = 2
+        self.config.Sites[0]["drone_heartbeat_max_interval"] = 600
+        self.assertEqual(
+            self.site_adapter.drone_heartbeat_intervals, {"BootingState": 10}
+        )
+        self.assertEqual(self.site_adapter.drone_heartbeat_backoff, 2.0)
+        self.assertEqual(self.site_adapter.drone_heartbeat_max_interval, 600)
+
+        # noinspection PyUnresolvedReferences
+        SiteAdapter.site_configuration.fget.cache_clear()
+
+        # backoff without a maximum interval would grow without bounds
+        del self.config.Sites[0]["drone_heartbeat_max_interval"]
+        with self.assertRaises(ValidationError):
+            # noinspection PyStatementEffect
+            self.site_adapter.drone_heartbeat_backoff
+
+        # noinspection PyUnresolvedReferences
+        SiteAdapter.site_configuration.fget.cache_clear()
+
+        self.config.Sites[0]["drone_heartbeat_backoff"] = 0.5
+        with self.assertRaises(ValidationError):
+            # noinspection PyStatementEffect
+            self.site_adapter.drone_heartbeat_backoff
+
+    def test_drone_heartbeat_intervals_unknown_state(self):
+        # lru_cache needs to be cleared before manipulating site configuration
+        # noinspection PyUnresolvedReferences
+        SiteAdapter.site_configuration.fget.cache_clear()
+
+        # a misspelled state would silently fall back to the default interval
+        self.config.Sites[0]["drone_heartbeat_intervals"] = {
+            "BootingState": 10,
+            "AvailabeState": 600,
+        }
+        with self.assertRaises(ValidationError) as validation_error:
+            # noinspection PyStatementEffect
+            self.site_adapter.drone_heartbeat_intervals
+        self.assertIn("AvailabeState", str(validation_error.exception))
+        self.assertNotIn("BootingState", str(validation_error.exception))
+
     def test_drone_minimum_lifetime(self):
         self.assertEqual(self.site_adapter.drone_minimum_lifetime, None)
 
@@ -213,6 +269,18 @@ class TestSiteAdapter(TestCase):
                 quota=1,
                 drone_minimum_lifetime=None,
                 drone_heartbeat_interval=60,
+                drone_heartbeat_intervals={},
+                drone_heartbeat_backoff=1.0,
+                drone_heartbeat_max_interval=None,
+                drone_heartbeat_jitter=0.1,
+                drone_concurrent_updates=None,
+                drone_heartbeat_tick=None,
+                drone_restore_ramp=0,
+                drone_bulk_delay=None,
+                drone_spawn_rate=None,
+                drone_spawn_burst=1,
+                circuit_breaker_threshold=None,
+                circuit_breaker_cool_down=60,
             ),
         )
 
@@ -229,6 +297,18 @@ class TestSiteAdapter(TestCase):
                 quota=inf,
                 drone_minimum_lifetime=None,
                 drone_heartbeat_interval=60,
+                drone_heartbeat_intervals={},
+                drone_heartbeat_backoff=1.0,
+                drone_heartbeat_max_interval=None,
+                drone_heartbeat_jitter=0.1,
+                drone_concurrent_updates=None,
+                drone_heartbeat_tick=None,
+                drone_restore_ramp=0,
+                drone_bulk_delay=None,
+                drone_spawn_rate=None,
+                drone_spawn_burst=1,
+                circuit_breaker_threshold=None,
+                circuit_breaker_cool_down=60,
             ),
         )
 
@@ -246,6 +326,15 @@ class TestSiteAdapter(TestCase):
                     quota=inf,
                     drone_minimum_lifetime=None,
                     drone_heartbeat_interval=60,
+                    drone_heartbeat_jitter=0.1,
+                    drone_concurrent_updates=None,
+                    drone_heartbeat_tick=None,
+                    drone_restore_ramp=0,
+                    drone_bulk_delay=None,
+                    drone_spawn_rate=None,
+                    drone_spawn_burst=1,
+                    circuit_breaker_threshold=None,
+                    circuit_breaker_cool_down=60,
                 ),
             )
 
@@ -273,3 +362,30 @@ class TestSiteAdapter(TestCase):
     def test_terminate_resource(self):
         with self.assertRaises(NotImplementedError):
             run_async(self.site_adapter.terminate_resource, dict())
+
+    def test_bulk_resource_calls(self):
+        for bulk_method, method in (
+            ("deploy_resources", "deploy_resource"),
+            ("resource_status_many", "resource_status"),
+            ("stop_resources", "stop_resource"),
+            ("terminate_resources", "terminate_resource"),
+        ):
+            with self.subTest(bulk_method=bulk_method):
+                with patch.object(SiteAdapter, method) as single_call:
+                    single_call.side_effect = [
+                        "success",
+                        TardisResourceStatusUpdateFailed,
+                    ]
+                    results = run_async(
+                        getattr(self.site_adapter, bulk_method), ("a", "b")
+                    )
+                self.assertEqual(results[0], "success")
+                self.assertIsInstance(results[1], TardisResourceStatusUpdateFailed)
+                self.assertEqual(single_call.call_count, 2)
+
+    def test_bulk_resource_calls_cancelled(self):
+        with patch.object(SiteAdapter, "resource_status") as single_call:
+            single_call.side_effect = ["success", asyncio.CancelledError]
+            # cancellations provide no result and are not passed on as one
+            with self.assertRaises(asyncio.CancelledError):
+                run_async(self.site_adapter.resource_status_many, ("a", "b"))
@@ -0,0 +1,39 @@
+from tardis.interfaces.batchsystemadapter import MachineStatus
+from tardis.interfaces.siteadapter import ResourceStatus
+from tardis.resources.dronestates import AvailableState
+from tardis.resources.dronestates import BootingState
+from tardis.resources.dronestates import CleanupState
+from tardis.resources.dronestates import IntegrateState
+from tardis.resources.dronestates import IntegratingState
+from tardis.utilities.pipeline import PipelineProcessor
+
+from unittest import TestCase
+
+
+class TestState(TestCase):
+    def test_transition_table(self):
+        table = BootingState.transition_table()
+        self.assertIsInstance(table[ResourceStatus.Booting], BootingState)
+        self.assertIsInstance(table[ResourceStatus.Running], IntegrateState)
+        self.assertIs(BootingState.transition_table(), table)
+
+    def test_transition_table_by_machine_status(self):
+        table = IntegratingState.transition_table()
+        self.assertIsInstance(
+            table[ResourceStatus.Running][MachineStatus.Available], AvailableState
+        )
+        # next states independent of the machine status apply to all of them
+        for machine_status in MachineStatus:
+            with self.subTest(machine_status=machine_status):
+                self.assertIsInstance(
+                    table[ResourceStatus.Booting][machine_status], BootingState
+                )
+                self.assertIsInstance(
+                    table[ResourceStatus.Error][machine_status], CleanupState
+                )
+
+    def test_pipeline_processor(self):
+        pipeline_processor = AvailableState.pipeline_processor()
+        self.assertIsInstance(pipeline_processor, PipelineProcessor)
+        self.assertIs(AvailableState.pipeline_processor(), pipeline_processor)
+        self.assertIsNot(IntegratingState.pipeline_processor(), pipeline_processor)
@@ -1,8 +1,12 @@
 from tardis.plugins.prometheusmonitoring import PrometheusMonitoring
 from tardis.resources.dronestates import RequestState
+from tardis.utilities.asyncbulkcall import BulkStatistics
+from tardis.utilities.asynccachemap import CacheStatistics
 from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.circuitbreaker import CircuitState
 from tardis.interfaces.siteadapter import ResourceStatus
 
+from aioprometheus.collectors import REGISTRY
 from datetime import datetime
 from unittest import TestCase
 from unittest.mock import Mock
@@ -32,6 +36,10 @@ class TestPrometheusMonitoring(TestCase):
 
         self.plugin = PrometheusMonitoring()
 
+    def tearDown(self):
+        # metrics are registered globally, allow creating the plugin again
+        REGISTRY.clear()
+
     @patch("tardis.plugins.prometheusmonitoring.logging", Mock())
     def test_notify(self):
         test_state = RequestState()
@@ -71,6 +79,55 @@ class TestPrometheusMonitoring(TestCase):
         )
         self.assert_gauges([1, 0, 0, 1, 2])
 
+    @patch("tardis.plugins.prometheusmonitoring.logging", Mock())
+    def test_notify_circuit_state(self):
+        self.plugin.notify_circuit_state("test-site", CircuitState.Open)
+        self.plugin.notify_circuit_state("other-site", CircuitState.HalfOpen)
+        circuit_state = self.plugin._circuit_state
+        self.assertEqual(circuit_state.get({"site_name": "test-site"}), 2)
+        self.assertEqual(circuit_state.get({"site_name": "other-site"}), 1)
+
+        self.plugin.notify_circuit_state("test-site", CircuitState.Closed)
+        self.assertEqual(circuit_state.get({"site_name": "test-site"}), 0)
+
+    def test_notify_cache_update(self):
+        last_update = datetime.now()
+        self.plugin.notify_cache_update(
+            CacheStatistics("condor_status", False, 3, last_update)
+        )
+        labels = {"cache": "condor_status"}
+        self.assertEqual(self.plugin._cache_valid.get(labels), 0)
+        self.assertEqual(self.plugin._cache_failures.get(labels), 3)
+        self.assertEqual(
+            self.plugin._cache_last_update.get(labels), last_update.timestamp()
+        )
+
+    def test_notify_spawn_state(self):
+        self.plugin.notify_spawn_state("testsite_test", 3, 0.5)
+        labels = {"pool": "testsite_test"}
+        self.assertEqual(self.plugin._spawn_queue_depth.get(labels), 3)
+        self.assertEqual(self.plugin._spawn_rate.get(labels), 0.5)
+
+    def test_notify_bulk_execution(self):
+        self.plugin.notify_bulk_execution(
+            BulkStatistics("condor_q", 10, 5, 0.5, 2.0, None)
+        )
+        self.plugin.notify_bulk_execution(
+            BulkStatistics("condor_q", 3, 0, 0.1, 0.2, RuntimeError())
+        )
+        labels = {"command": "condor_q"}
+        self.assertEqual(self.plugin._bulk_commands.get(labels), 2)
+        self.assertEqual(self.plugin._bulk_failures.get(labels), 1)
+        self.assertEqual(self.plugin._bulk_tasks.get(labels), 13)
+        self.assertEqual(self.plugin._bulk_queue_depth.get(labels), 0)
+        bulk_size = self.plugin._bulk_size.get(labels)
+        self.assertEqual((bulk_size[5], bulk_size[10]), (1, 2))
+        self.assertEqual(bulk_size["sum"], 13)
+        bulk_wait = self.plugin._bulk_wait.get(labels)
+        self.assertEqual((bulk_wait[0.25], bulk_wait["count"]), (1, 2))
+        bulk_latency = self.plugin._bulk_latency.get(labels)
+        self.assertEqual((bulk_latency[1.0], bulk_latency[2.5]), (1, 2))
+
     def assert_gauges(self, values):
         assert all(
             [
@@ -178,6 +178,29 @@ class TestSqliteRegistry(TestCase):
         SqliteRegistry()
 
     @patch("tardis.plugins.sqliteregistry.logging", Mock())
+    def test_drain_requests(self):
+        drone_uuid = self.test_resource_attributes["drone_uuid"]
+        run_async(self.registry.notify, RequestState(), self.test_resource_attributes)
+        self.assertFalse(self.registry.drain_requested(drone_uuid))
+
+        self.registry.add_drain_request(drone_uuid)
+        self.assertTrue(self.registry.drain_requested(drone_uuid))
+
+        # any state change of the drone supersedes the drain request
+        run_async(
+            self.registry.notify, BootingState(), self.test_updated_resource_attributes
+        )
+        self.assertFalse(self.registry.drain_requested(drone_uuid))
+
+        # drain requests are loaded from the database
+        self.registry.execute(
+            """UPDATE Resources SET state_id = (SELECT state_id
+            FROM ResourceStates WHERE state = 'DrainState')""",
+            {},
+        )
+        self.assertTrue(SqliteRegistry().drain_requested(drone_uuid))
+        self.assertTrue(self.registry.drain_requested(drone_uuid))
+
     def test_get_resource_state(self):
         self.registry.add_site(self.test_site_name)
         self.registry.add_machine_types(self.test_site_name, self.test_machine_type)
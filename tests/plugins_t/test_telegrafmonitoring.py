@@ -96,3 +96,35 @@ class TestTelegrafMonitoring(TestCase):
             "tardis_data", test_result, tags=test_tags
         )
         self.mock_aiotelegraf.Client.return_value.close.assert_called_with()
+
+    @patch("tardis.plugins.telegrafmonitoring.logging", Mock())
+    def test_notify_many(self):
+        events = [
+            (
+                RequestState(),
+                AttributeDict(
+                    site_name="test-site",
+                    machine_type="test_machine_type",
+                    drone_uuid=f"test_drone_uuid_{index}",
+                    created=datetime.now(),
+                    updated=datetime.now(),
+                ),
+            )
+            for index in range(3)
+        ]
+        telegraf_client = self.mock_aiotelegraf.Client.return_value
+        telegraf_client.reset_mock()
+        telegraf_client.connect.return_value = async_return()
+        telegraf_client.close.return_value = async_return()
+
+        run_async(self.plugin.notify_many, events)
+        # all events are sent via a single connection
+        telegraf_client.connect.assert_called_once_with()
+        telegraf_client.close.assert_called_once_with()
+        self.assertEqual(
+            [
+                kwargs["tags"]["drone_uuid"]
+                for _, kwargs in telegraf_client.metric.call_args_list
+            ],
+            [f"test_drone_uuid_{index}" for index in range(3)],
+        )
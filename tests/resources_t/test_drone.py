@@ -8,14 +8,18 @@ from tardis.interfaces.plugin import Plugin
 from tardis.interfaces.siteadapter import ResourceStatus
 from tardis.interfaces.state import State
 from tardis.resources.drone import Drone
-from tardis.resources.dronestates import DrainState, DownState, RequestState
+from tardis.resources.dronestates import BootingState, DrainState, DownState
+from tardis.resources.dronestates import RequestState
 from tardis.plugins.sqliteregistry import SqliteRegistry
 from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.heartbeatscheduler import HeartbeatScheduler
 
-from logging import DEBUG
+from logging import DEBUG, WARNING
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+import asyncio
+
 
 class TestDrone(TestCase):
     mock_batch_system_agent_patcher = None
@@ -40,8 +44,12 @@ class TestDrone(TestCase):
         self.mock_site_agent.machine_meta_data = AttributeDict(Cores=8)
         self.mock_site_agent.drone_minimum_lifetime = None
         self.mock_site_agent.drone_heartbeat_interval = 60
+        self.mock_site_agent.drone_heartbeat_intervals = {}
+        self.mock_site_agent.drone_heartbeat_backoff = 1.0
+        self.mock_site_agent.drone_heartbeat_max_interval = None
         self.mock_plugin = MagicMock(spec=Plugin)()
         self.mock_plugin.notify.return_value = async_return()
+        self.mock_plugin.notify_timeout = None
         self.drone = Drone(
             site_agent=self.mock_site_agent,
             batch_system_agent=self.mock_batch_system_agent,
@@ -84,6 +92,23 @@ class TestDrone(TestCase):
         delattr(self.drone.resource_attributes, "drone_uuid")
         self.assertIsNone(run_async(self.drone.database_state))
 
+    def test_drain_requested(self):
+        self.assertFalse(self.drone.drain_requested())
+
+        sql_registry = MagicMock(spec=SqliteRegistry)
+        self.drone.register_plugins(sql_registry)
+        self.drone.__dict__.pop("_database")  # reset cached_property's cache
+        sql_registry.drain_requested.return_value = True
+
+        self.assertTrue(self.drone.drain_requested())
+        sql_registry.drain_requested.assert_called_once_with(
+            self.drone.resource_attributes.drone_uuid
+        )
+
+        # testing AttributeError
+        del self.drone.resource_attributes.drone_uuid
+        self.assertFalse(self.drone.drain_requested())
+
     def test_demand(self):
         self.assertEqual(self.drone.demand, 8)
         self.drone.demand = 0
@@ -94,6 +119,21 @@ class TestDrone(TestCase):
         self.mock_site_agent.drone_heartbeat_interval = 10
         self.assertEqual(self.drone.heartbeat_interval, 10)
 
+        run_async(self.drone.set_state, DrainState())
+        self.mock_site_agent.drone_heartbeat_intervals = {"DrainState": 5}
+        self.assertEqual(self.drone.heartbeat_interval, 5)
+
+        self.mock_site_agent.drone_heartbeat_backoff = 2.0
+        self.mock_site_agent.drone_heartbeat_max_interval = 30
+        self.drone._unchanged_heartbeats = 2
+        self.assertEqual(self.drone.heartbeat_interval, 20)
+        self.drone._unchanged_heartbeats = 3
+        self.assertEqual(self.drone.heartbeat_interval, 30)
+
+        # the maximum interval does not shorten longer intervals of a state
+        self.mock_site_agent.drone_heartbeat_intervals = {"DrainState": 60}
+        self.assertEqual(self.drone.heartbeat_interval, 60)
+
     def test_life_time(self):
         self.assertIsNone(self.drone.minimum_lifetime, None)
         self.mock_site_agent.drone_minimum_lifetime = 3600
@@ -135,9 +175,9 @@ class TestDrone(TestCase):
             self.drone.resource_attributes.resource_status, ResourceStatus.Booting
         )
 
-    @patch("tardis.resources.drone.asyncio.sleep")
-    def test_run(self, mocked_asyncio_sleep):
-        mocked_asyncio_sleep.side_effect = async_return
+    @patch("tardis.resources.drone.HeartbeatScheduler.sleep")
+    def test_run(self, mocked_heartbeat_sleep):
+        mocked_heartbeat_sleep.side_effect = async_return
         mocked_down_state = MagicMock(spec=DownState)
         mocked_down_state.run.return_value = async_return()
 
@@ -153,10 +193,10 @@ class TestDrone(TestCase):
         with self.assertLogs(level=DEBUG):
             run_async(self.drone.run)
 
-        # duration skipped via asyncio.sleep
-        # use the `sum` to avoid `asyncio.sleep(0)` context switches to skew the result
-        mock_elapsed = sum(args[0] for args, _ in mocked_asyncio_sleep.call_args_list)
-        self.assertEqual(mock_elapsed, self.mock_site_agent.drone_heartbeat_interval)
+        # duration skipped via the heartbeat scheduler
+        mocked_heartbeat_sleep.assert_called_once_with(
+            self.mock_site_agent.drone_heartbeat_interval, key=self.drone
+        )
 
         self.assertIsInstance(self.drone.state, DownState)
         self.assertEqual(self.drone.demand, 0)
@@ -164,6 +204,128 @@ class TestDrone(TestCase):
         mocked_state.run.assert_called_once()
         mocked_down_state.run.assert_called_once()
 
+    @patch("tardis.resources.drone.HeartbeatScheduler.sleep")
+    @patch("tardis.resources.dronestates.RequestState.run")
+    def test_run_spawn_limiter(self, mocked_request_run, mocked_heartbeat_sleep):
+        mocked_heartbeat_sleep.side_effect = async_return
+        mocked_down_state = MagicMock(spec=DownState)
+        mocked_down_state.run.return_value = async_return()
+
+        async def mocked_run(drone):
+            await drone.set_state(mocked_down_state)
+
+        mocked_request_run.side_effect = mocked_run
+
+        heartbeat_scheduler = HeartbeatScheduler(concurrent=1)
+        slot_taken = []
+
+        async def acquire():
+            slot_taken.append(heartbeat_scheduler._concurrent.locked())
+
+        spawn_limiter = MagicMock()
+        spawn_limiter.acquire.side_effect = acquire
+        self.drone = Drone(
+            site_agent=self.mock_site_agent,
+            batch_system_agent=self.mock_batch_system_agent,
+            heartbeat_scheduler=heartbeat_scheduler,
+            spawn_limiter=spawn_limiter,
+        )
+        with self.assertLogs(level=DEBUG):
+            run_async(self.drone.run)
+
+        # drones waiting for a deployment must not take an update slot
+        self.assertEqual(slot_taken, [False])
+        mocked_request_run.assert_called_once_with(self.drone)
+
+    @patch("tardis.resources.drone.HeartbeatScheduler.sleep")
+    def test_run_restored(self, mocked_heartbeat_sleep):
+        mocked_heartbeat_sleep.side_effect = async_return
+        calls = []
+
+        async def restore(drone):
+            calls.append(("restore", drone))
+
+        async def mocked_run(drone):
+            calls.append(("run", drone))
+            await drone.set_state(DownState())
+
+        mocked_state = MagicMock(spec=State)
+        mocked_state.run.side_effect = mocked_run
+
+        drone = Drone(
+            site_agent=self.mock_site_agent,
+            batch_system_agent=self.mock_batch_system_agent,
+            state=mocked_state,
+            restore=restore,
+        )
+        with self.assertLogs(level=DEBUG):
+            run_async(drone.run)
+
+        # restored drones wait for the restore before their first state update
+        self.assertEqual(calls, [("restore", drone), ("run", drone)])
+
+    @patch("tardis.resources.drone.HeartbeatScheduler.sleep")
+    def test_run_heartbeat_backoff(self, mocked_heartbeat_sleep):
+        mocked_heartbeat_sleep.side_effect = async_return
+        mocked_down_state = MagicMock(spec=DownState)
+        mocked_down_state.run.return_value = async_return()
+
+        async def mocked_run(drone):
+            if mocked_state.run.call_count > 4:
+                await drone.set_state(mocked_down_state)
+
+        mocked_state = MagicMock(spec=State)
+        mocked_state.run.side_effect = mocked_run
+
+        run_async(self.drone.set_state, mocked_state)
+        self.mock_site_agent.drone_heartbeat_interval = 10
+        self.mock_site_agent.drone_heartbeat_backoff = 2.0
+        self.mock_site_agent.drone_heartbeat_max_interval = 40
+        with self.assertLogs(level=DEBUG):
+            run_async(self.drone.run)
+
+        self.assertEqual(
+            [args[0] for args, _ in mocked_heartbeat_sleep.call_args_list],
+            [20, 40, 40, 40, 10],
+        )
+
+    @patch("tardis.resources.drone.HeartbeatScheduler.sleep")
+    def test_run_heartbeat_backoff_same_state(self, mocked_heartbeat_sleep):
+        mocked_heartbeat_sleep.side_effect = async_return
+        resource_status = [ResourceStatus.Booting] * 4 + [ResourceStatus.Deleted]
+
+        async def mocked_resource_status(resource_attributes):
+            return AttributeDict(resource_status=resource_status.pop(0))
+
+        self.mock_site_agent.resource_status.side_effect = mocked_resource_status
+        self.addCleanup(
+            setattr, self.mock_site_agent.resource_status, "side_effect", None
+        )
+
+        run_async(self.drone.set_state, BootingState())
+        self.mock_site_agent.drone_heartbeat_interval = 10
+        self.mock_site_agent.drone_heartbeat_backoff = 2.0
+        self.mock_site_agent.drone_heartbeat_max_interval = 40
+        with self.assertLogs(level=DEBUG):
+            run_async(self.drone.run)
+
+        # every transition creates a new BootingState, which is no state change
+        self.assertEqual(
+            [args[0] for args, _ in mocked_heartbeat_sleep.call_args_list],
+            [20, 40, 40, 40, 10],
+        )
+
+    def test_heartbeat_scheduler(self):
+        self.assertIsInstance(self.drone.heartbeat_scheduler, HeartbeatScheduler)
+
+        heartbeat_scheduler = HeartbeatScheduler(concurrent=1)
+        drone = Drone(
+            site_agent=self.mock_site_agent,
+            batch_system_agent=self.mock_batch_system_agent,
+            heartbeat_scheduler=heartbeat_scheduler,
+        )
+        self.assertEqual(drone.heartbeat_scheduler, heartbeat_scheduler)
+
     def test_register_plugins(self):
         self.assertEqual(self.drone._plugins, [])
         self.drone.register_plugins(self.mock_plugin)
@@ -203,3 +365,50 @@ class TestDrone(TestCase):
         self.mock_plugin.notify.assert_called_with(
             self.drone.state, self.drone.resource_attributes
         )
+
+    def test_notify_plugins_isolated(self):
+        notified = []
+
+        class SlowPlugin(Plugin):
+            notify_timeout = 0.01
+
+            async def notify(self, state, resource_attributes):
+                await asyncio.sleep(1)
+
+        class FailingPlugin(Plugin):
+            notify_timeout = None
+
+            async def notify(self, state, resource_attributes):
+                raise RuntimeError("notification failed")
+
+        class GoodPlugin(Plugin):
+            notify_timeout = None
+
+            async def notify(self, state, resource_attributes):
+                notified.append(state)
+
+        for plugin in (SlowPlugin(), FailingPlugin(), GoodPlugin()):
+            self.drone.register_plugins(plugin)
+
+        with self.assertLogs(level=WARNING) as logs:
+            run_async(self.drone.set_state, DownState())
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(notified, [self.drone.state])
+
+    def test_notify_plugins_concurrently(self):
+        active, max_active = 0, 0
+
+        class SlowPlugin(Plugin):
+            notify_timeout = None
+
+            async def notify(self, state, resource_attributes):
+                nonlocal active, max_active
+                active += 1
+                max_active = max(active, max_active)
+                await asyncio.sleep(0.01)
+                active -= 1
+
+        for _ in range(3):
+            self.drone.register_plugins(SlowPlugin())
+        run_async(self.drone.notify_plugins)
+        self.assertEqual(max_active, 3)
@@ -17,14 +17,17 @@ from tardis.resources.dronestates import ShutDownState
 from tardis.resources.dronestates import ShuttingDownState
 from tardis.resources.dronestates import CleanupState
 from tardis.resources.dronestates import DownState
+from tardis.resources.dronestates import prefetch_resource_status
+from tardis.resources.dronestates import wake_drones
 from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.heartbeatscheduler import HeartbeatScheduler
 from tests.utilities.utilities import async_return
 from tests.utilities.utilities import run_async
 
 from functools import partial
 from datetime import datetime, timedelta
 from unittest import TestCase
-from unittest.mock import patch
+from unittest.mock import ANY, MagicMock, patch
 
 import asyncio
 import logging
@@ -56,6 +59,7 @@ class TestDroneStates(TestCase):
         self.drone.demand = 8.0
         self.drone._supply = 8.0
         self.drone.minimum_lifetime = 3600
+        self.drone.spawn_limiter = None
         self.drone.set_state.side_effect = partial(mock_set_state, self.drone)
         self.drone.site_agent.deploy_resource.return_value = async_return(
             return_value=AttributeDict()
@@ -136,6 +140,35 @@ class TestDroneStates(TestCase):
             CleanupState,
         )
 
+    def test_request_state_spawn_limiter(self):
+        spawn_limiter = self.drone.spawn_limiter = MagicMock()
+
+        # the drone has acquired a token before running the state
+        self.drone.state.return_value = RequestState()
+        run_async(self.drone.state.return_value.run, self.drone)
+        self.assertIsInstance(self.drone.state, BootingState)
+        spawn_limiter.acquire.assert_not_called()
+        spawn_limiter.release.assert_not_called()
+        spawn_limiter.recover.assert_called_once()
+
+        # drones stay in RequestState and slow down while the quota is exceeded
+        self.run_side_effects(
+            RequestState(),
+            self.drone.site_agent.deploy_resource,
+            (TardisQuotaExceeded,),
+            RequestState,
+        )
+        spawn_limiter.throttle.assert_called_once_with(started=ANY)
+
+        # drones without demand are not deployed and return their token
+        self.drone.site_agent.deploy_resource.reset_mock()
+        self.drone.demand = 0
+        self.drone.state.return_value = RequestState()
+        run_async(self.drone.state.return_value.run, self.drone)
+        self.assertIsInstance(self.drone.state, DownState)
+        spawn_limiter.release.assert_called_once()
+        self.drone.site_agent.deploy_resource.assert_not_called()
+
     def test_booting_state(self):
         matrix = [
             (ResourceStatus.Booting, None, BootingState),
@@ -195,7 +228,7 @@ class TestDroneStates(TestCase):
         self.run_the_matrix(matrix, initial_state=IntegratingState)
 
     def test_available_state(self):
-        self.drone.database_state.return_value = async_return()
+        self.drone.drain_requested.return_value = False
 
         matrix = [
             (ResourceStatus.Running, MachineStatus.Available, AvailableState),
@@ -226,7 +259,7 @@ class TestDroneStates(TestCase):
         self.assertIsInstance(self.drone.state, DrainState)
 
         # Test remote draining procedure via REST service and database
-        self.drone.database_state.return_value = async_return(return_value=DrainState)
+        self.drone.drain_requested.return_value = True
         self.drone.state.return_value = AvailableState()
         run_async(self.drone.state.return_value.run, self.drone)
         self.assertIsInstance(self.drone.state, DrainState)
@@ -360,3 +393,42 @@ class TestDroneStates(TestCase):
         self.drone.state.return_value = DownState()
         run_async(self.drone.state.return_value.run, self.drone)
         self.assertEqual(self.drone.demand, 0.0)
+
+    def test_wake_drones(self):
+        heartbeat_scheduler = HeartbeatScheduler()
+        drones = [MagicMock() for _ in range(3)]
+        for index, drone in enumerate(drones):
+            drone.resource_attributes = AttributeDict(drone_uuid=f"test-{index}")
+
+        async def heartbeats():
+            sleepers = [
+                asyncio.ensure_future(heartbeat_scheduler.sleep(1024, key=drone))
+                for drone in drones
+            ]
+            await asyncio.sleep(0)
+            wake_drones(heartbeat_scheduler, {"test-0", "test-2", "test-3"})
+            await asyncio.sleep(0)
+            done = [sleeper.done() for sleeper in sleepers]
+            for sleeper in sleepers:
+                sleeper.cancel()
+            heartbeat_scheduler._timer.cancel()
+            return done
+
+        self.assertEqual(run_async(heartbeats), [True, False, True])
+
+    def test_prefetch_resource_status(self):
+        site_agent = MagicMock()
+        site_agent.prefetch_resource_status.side_effect = async_return
+
+        drones = []
+        for state in (AvailableState(), RequestState(), CleanupState()):
+            drone = MagicMock()
+            drone.state = state
+            drone.site_agent = site_agent
+            drone.resource_attributes = AttributeDict(drone_uuid=str(state))
+            drones.append(drone)
+
+        run_async(prefetch_resource_status, drones, max_age=5)
+        site_agent.prefetch_resource_status.assert_called_once_with(
+            [drones[0].resource_attributes, drones[2].resource_attributes], 5
+        )
@@ -1,13 +1,24 @@
+from tardis.interfaces.siteadapter import SiteConfigurationModel
 from tardis.resources.dronestates import RequestState
+from tardis.resources.dronestates import prefetch_resource_status
 from tardis.resources.poolfactory import create_composite_pool
+from tardis.resources.poolfactory import create_circuit_breaker
 from tardis.resources.poolfactory import create_drone
+from tardis.resources.poolfactory import create_heartbeat_scheduler
+from tardis.resources.poolfactory import create_spawn_limiter
 from tardis.resources.poolfactory import get_drones_to_restore
 from tardis.resources.poolfactory import load_plugins
 from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.circuitbreaker import CircuitBreaker, CircuitState
+from tardis.utilities.plugineventqueue import PluginEventQueue
+from tardis.utilities.spawnlimiter import SpawnLimiter
 
+from pydantic.error_wrappers import ValidationError
 from unittest import TestCase
 from unittest.mock import ANY, MagicMock, call, patch
 
+import sys
+
 
 class TestPoolFactory(TestCase):
     mock_config_patcher = None
@@ -43,6 +54,8 @@ class TestPoolFactory(TestCase):
         sqlite_registry = self.mock_sqliteregistry.return_value
         sqlite_registry.get_resources.return_value = [{"state": "RequestState"}]
 
+    @patch("tardis.resources.poolfactory.add_cache_listener")
+    @patch("tardis.resources.poolfactory.add_bulk_listener")
     @patch("tardis.resources.poolfactory.FactoryPool")
     @patch("tardis.resources.poolfactory.Logger")
     @patch("tardis.resources.poolfactory.Standardiser")
@@ -55,6 +68,8 @@ class TestPoolFactory(TestCase):
         mock_standardiser,
         mock_logger,
         mock_factory_pool,
+        mock_add_bulk_listener,
+        mock_add_cache_listener,
     ):
         mock_batch_system_adapter = AttributeDict(TestBatchSystemAdapter=MagicMock())
         mock_site_adapter = AttributeDict(TestSiteAdapter=MagicMock())
@@ -84,6 +99,21 @@ class TestPoolFactory(TestCase):
             machine_type=machine_type, site_name=site_name
         )
 
+        # drones are woken up by status changes of both adapters
+        for adapter in (
+            mock_batch_system_adapter.TestBatchSystemAdapter,
+            mock_site_adapter.TestSiteAdapter,
+        ):
+            adapter.return_value.add_status_listener.assert_called_once_with(ANY)
+
+        # plugins monitor bulk commands and caches
+        mock_add_bulk_listener.assert_called_once_with(
+            self.mock_sqliteregistry.SqliteRegistry().notify_bulk_execution
+        )
+        mock_add_cache_listener.assert_called_once_with(
+            self.mock_sqliteregistry.SqliteRegistry().notify_cache_update
+        )
+
         self.assertEqual(mock_factory_pool.mock_calls, [call(factory=ANY)])
 
         self.assertEqual(
@@ -130,13 +160,110 @@ class TestPoolFactory(TestCase):
                     state=None,
                     created=None,
                     updated=None,
+                    heartbeat_scheduler=None,
+                    restore=None,
+                    spawn_limiter=None,
                 )
             ],
         )
 
+    def test_create_heartbeat_scheduler(self):
+        heartbeat_scheduler = create_heartbeat_scheduler(
+            SiteConfigurationModel(**self.config.Sites[0])
+        )
+        self.assertEqual(heartbeat_scheduler._jitter, 0.1)
+        self.assertEqual(heartbeat_scheduler._concurrency, sys.maxsize)
+        self.assertIsNone(heartbeat_scheduler._tick)
+        self.assertIsNone(heartbeat_scheduler._prepare)
+
+        heartbeat_scheduler = create_heartbeat_scheduler(
+            SiteConfigurationModel(
+                **self.config.Sites[0],
+                drone_heartbeat_jitter=0.5,
+                drone_concurrent_updates=10,
+                drone_heartbeat_tick=5,
+            )
+        )
+        self.assertEqual(heartbeat_scheduler._jitter, 0.5)
+        self.assertEqual(heartbeat_scheduler._concurrency, 10)
+        self.assertEqual(heartbeat_scheduler._tick, 5)
+        self.assertEqual(heartbeat_scheduler._prepare.func, prefetch_resource_status)
+        self.assertEqual(heartbeat_scheduler._prepare.keywords, {"max_age": 5})
+
+        with self.assertRaises(ValidationError):
+            create_heartbeat_scheduler(
+                SiteConfigurationModel(
+                    **self.config.Sites[0], drone_concurrent_updates=0
+                )
+            )
+
+    def test_create_circuit_breaker(self):
+        plugin = MagicMock()
+        site_configuration = SiteConfigurationModel(**self.config.Sites[0])
+        self.assertIsNone(create_circuit_breaker(site_configuration, {}))
+
+        circuit_breaker = create_circuit_breaker(
+            SiteConfigurationModel(
+                **self.config.Sites[0],
+                circuit_breaker_threshold=5,
+                circuit_breaker_cool_down=120,
+            ),
+            {"TestPlugin": plugin},
+        )
+        self.assertIsInstance(circuit_breaker, CircuitBreaker)
+        self.assertEqual(circuit_breaker.name, "TestSite")
+        self.assertEqual(circuit_breaker._failure_threshold, 5)
+        self.assertEqual(circuit_breaker._cool_down, 120)
+
+        # plugins are notified about state changes
+        circuit_breaker._set_state(CircuitState.HalfOpen)
+        plugin.notify_circuit_state.assert_called_once_with(
+            "TestSite", CircuitState.HalfOpen
+        )
+
+    def test_create_spawn_limiter(self):
+        plugins = {"TestPlugin": MagicMock()}
+        site_configuration = SiteConfigurationModel(**self.config.Sites[0])
+        self.assertIsNone(create_spawn_limiter(site_configuration, "test", plugins))
+
+        spawn_limiter = create_spawn_limiter(
+            SiteConfigurationModel(
+                **self.config.Sites[0], drone_spawn_rate=0.5, drone_spawn_burst=10
+            ),
+            "Test",
+            plugins,
+        )
+        self.assertIsInstance(spawn_limiter, SpawnLimiter)
+        self.assertEqual(spawn_limiter.rate, 0.5)
+        self.assertEqual(spawn_limiter._burst, 10)
+        self.assertEqual(spawn_limiter.name, "testsite_test")
+
+        spawn_limiter.throttle()
+        plugins["TestPlugin"].notify_spawn_state.assert_called_once_with(
+            spawn_limiter.name, 0, 0.25
+        )
+
     def test_load_plugins(self):
         self.assertEqual(load_plugins(), {"SqliteRegistry": self.mock_sqliteregistry()})
 
+        self.config.Plugins.SqliteRegistry.event_queue = AttributeDict(batch_size=10)
+        # the registry is queried by drones and must not be decoupled from them
+        with self.assertRaises(ValueError):
+            load_plugins()
+        del self.config.Plugins.SqliteRegistry.event_queue
+
+        mock_plugin = AttributeDict(TestPlugin=MagicMock())
+        self.config.Plugins = AttributeDict(
+            TestPlugin=AttributeDict(event_queue=AttributeDict(batch_size=10))
+        )
+        with patch(
+            "tardis.resources.poolfactory.import_module", return_value=mock_plugin
+        ):
+            event_queue = load_plugins()["TestPlugin"]
+        self.assertIsInstance(event_queue, PluginEventQueue)
+        self.assertEqual(event_queue.plugin, mock_plugin.TestPlugin())
+        self.assertEqual(event_queue._batch_size, 10)
+
         self.mock_config.side_effect = AttributeError
         self.assertEqual(load_plugins(), {})
         self.mock_config.side_effect = None
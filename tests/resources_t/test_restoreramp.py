@@ -0,0 +1,55 @@
+from tardis.resources.restoreramp import RestoreRamp
+
+from tests.utilities.utilities import run_async
+
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import asyncio
+import logging
+import time
+
+
+class TestRestoreRamp(TestCase):
+    def setUp(self):
+        self.drones = [MagicMock(name=f"drone-{index}") for index in range(4)]
+        self.restore_ramp = RestoreRamp(ramp=0.2)
+        self.restore_ramp.add_drones(self.drones)
+
+    def restore(self):
+        started = {}
+
+        async def restore(drone):
+            await self.restore_ramp(drone)
+            started[drone] = time.monotonic()
+
+        async def restore_all():
+            start = time.monotonic()
+            await asyncio.gather(*(restore(drone) for drone in self.drones))
+            return {drone: due - start for drone, due in started.items()}
+
+        return run_async(restore_all)
+
+    @patch("tardis.resources.restoreramp.prefetch_resource_status")
+    def test_ramp(self, mocked_prefetch_resource_status):
+        started = self.restore()
+        # resource status of all drones is queried in bulk, once
+        mocked_prefetch_resource_status.assert_called_once_with(
+            self.drones, max_age=self.restore_ramp._ramp
+        )
+        # drones are started evenly spread over the ramp
+        for index, drone in enumerate(self.drones):
+            with self.subTest(drone=index):
+                self.assertAlmostEqual(started[drone], index * 0.05, delta=0.04)
+        self.assertEqual(self.restore_ramp._delays, {})
+
+    @patch("tardis.resources.restoreramp.prefetch_resource_status")
+    def test_warm_up_failure(self, mocked_prefetch_resource_status):
+        mocked_prefetch_resource_status.side_effect = RuntimeError("query failed")
+        with self.assertLogs(level=logging.WARNING):
+            started = self.restore()
+        self.assertEqual(set(started), set(self.drones))
+
+    def test_sanity_checks(self):
+        with self.assertRaises(ValueError):
+            RestoreRamp(ramp=-1)
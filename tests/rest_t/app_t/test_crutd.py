@@ -106,3 +106,29 @@ class TestCRUD(TestCase):
     JOIN MachineTypes MT ON R.machine_type_id = MT.machine_type_id""",
             {},
         )
+
+    def test_set_state_to_draining(self):
+        async def mocked_async_execute(sql_query: str, bind_parameters: dict):
+            return []
+
+        self.sql_registry_mock.async_execute.side_effect = mocked_async_execute
+
+        self.assertEqual(
+            [],
+            run_async(
+                crud.set_state_to_draining,
+                sql_registry=self.sql_registry_mock,
+                drone_uuid="test-01234567ab",
+            ),
+        )
+
+        self.sql_registry_mock.async_execute.assert_called_with(
+            """
+    UPDATE Resources
+    SET state_id = (SELECT state_id FROM ResourceStates WHERE state = 'DrainState')
+    WHERE drone_uuid = :drone_uuid""",
+            {"drone_uuid": "test-01234567ab"},
+        )
+        self.sql_registry_mock.add_drain_request.assert_called_once_with(
+            "test-01234567ab"
+        )
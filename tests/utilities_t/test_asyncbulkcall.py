@@ -1,10 +1,15 @@
 import asyncio
+import logging
 import time
 import sys
+from functools import partial
 from platform import python_implementation
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
-from tardis.utilities.asyncbulkcall import AsyncBulkCall
+from tardis.utilities.asyncbulkcall import AdaptiveBulkController
+from tardis.utilities.asyncbulkcall import AsyncBulkCall, BulkPriority
+from tardis.utilities.asyncbulkcall import add_bulk_listener, remove_bulk_listener
 
 from tests.utilities.utilities import run_async
 
@@ -22,6 +27,21 @@ class CallCounter:
         return [(i, this_call) for i in tasks]
 
 
+class ConcurrencyCounter:
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.sizes = []
+
+    async def __call__(self, *tasks):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        self.sizes.append(len(tasks))
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        return tasks
+
+
 class TestAsyncBulkCall(TestCase):
     @staticmethod
     async def execute(execution: AsyncBulkCall, count: int, delay=None):
@@ -77,6 +97,65 @@ class TestAsyncBulkCall(TestCase):
             await asyncio.sleep(0.01)  # pause to allow for cleanup
             assert execution._dispatch_task is None
 
+    def test_call_many(self):
+        """Test that many tasks are executed in bulks right away"""
+        for size in (1, 3, 10, 2129):
+            with self.subTest(size=size):
+                # use large delay to only trigger on size
+                execution = AsyncBulkCall(CallCounter(), size=size, delay=256)
+                before = time.monotonic()
+                result = run_async(execution.call_many, range(size * 3 + 5))
+                self.assertLess(time.monotonic() - before, 1)
+                self.assertEqual(result, [(i, i // size) for i in range(size * 3 + 5)])
+
+    def test_call_many_failure(self):
+        """Test that failed bulks provide their exception in place of the result"""
+
+        async def fail_odd(*tasks):
+            if any(task % 2 for task in tasks):
+                raise ValueError(tasks)
+            return tasks
+
+        execution = AsyncBulkCall(fail_odd, size=2, delay=256)
+        result = run_async(execution.call_many, (0, 2, 4, 5))
+        self.assertEqual(result[:2], [0, 2])
+        for failed in result[2:]:
+            self.assertIsInstance(failed, ValueError)
+        self.assertEqual(run_async(execution.call_many, ()), [])
+
+    def test_cancelled_caller(self):
+        """Test that callers no longer waiting do not affect the other tasks"""
+
+        async def cancel_first():
+            execution = AsyncBulkCall(CallCounter(), size=3, delay=0.01)
+            first, second = (
+                asyncio.ensure_future(execution(task)) for task in range(2)
+            )
+            await asyncio.sleep(0)
+            first.cancel()
+            return await asyncio.wait_for(second, timeout=1)
+
+        self.assertEqual(run_async(cancel_first), (1, 0))
+
+    def test_cancelled_command(self):
+        """Test that a cancelled command cancels its tasks instead of hanging"""
+
+        async def cancel(*tasks):
+            raise asyncio.CancelledError()
+
+        async def wait_for_tasks():
+            execution = AsyncBulkCall(cancel, size=3, delay=0.01)
+            return await asyncio.wait_for(
+                asyncio.gather(*(execution(task) for task in range(2))), timeout=1
+            )
+
+        with self.assertRaises(asyncio.CancelledError):
+            run_async(wait_for_tasks)
+
+        execution = AsyncBulkCall(cancel, size=3, delay=256)
+        with self.assertRaises(asyncio.CancelledError):
+            run_async(execution.call_many, range(2))
+
     def test_sanity_checks(self):
         """Test against illegal settings"""
         for wrong_size in (0, -1, 0.5, 2j, "15"):
@@ -87,6 +166,27 @@ class TestAsyncBulkCall(TestCase):
             with self.subTest(delay=wrong_delay):
                 with self.assertRaises((ValueError, TypeError)):
                     AsyncBulkCall(CallCounter(), size=100, delay=wrong_delay)
+        for wrong_priority_delays in ({BulkPriority.High: -1}, {"High": 1.0}):
+            with self.subTest(priority_delays=wrong_priority_delays):
+                with self.assertRaises(ValueError):
+                    AsyncBulkCall(
+                        CallCounter(),
+                        size=100,
+                        delay=1.0,
+                        priority_delays=wrong_priority_delays,
+                    )
+        for wrong_min_delay in (-1, 2.0):
+            with self.subTest(min_delay=wrong_min_delay):
+                with self.assertRaises(ValueError):
+                    AsyncBulkCall(
+                        CallCounter(), size=100, delay=1.0, min_delay=wrong_min_delay
+                    )
+        for wrong_bisect in ((ValueError, None), (BaseException,), ("ValueError",)):
+            with self.subTest(bisect=wrong_bisect):
+                with self.assertRaises(ValueError):
+                    AsyncBulkCall(
+                        CallCounter(), size=100, delay=1.0, bisect=wrong_bisect
+                    )
         for wrong_concurrency in (0, 2.3, -5, 17j, "10"):
             with self.subTest(delay=wrong_concurrency):
                 with self.assertRaises(ValueError):
@@ -96,3 +196,276 @@ class TestAsyncBulkCall(TestCase):
                         delay=1.0,
                         concurrent=wrong_concurrency,
                     )
+
+    def test_concurrent(self):
+        """Test that concurrent commands are limited and free their slots"""
+
+        async def execute(execution, count):
+            return await asyncio.wait_for(
+                self.execute(execution, count, delay=0.001), timeout=5
+            )
+
+        for concurrent in (1, 2, 5):
+            with self.subTest(concurrent=concurrent):
+                command = ConcurrencyCounter()
+                execution = AsyncBulkCall(
+                    command, size=4, delay=0.001, concurrent=concurrent
+                )
+                # many more bulks than commands may run at once
+                result = run_async(execute, execution, 100)
+                self.assertEqual(result, list(range(100)))
+                self.assertEqual(command.max_active, concurrent)
+                self.assertEqual(execution._concurrent._value, concurrent)
+                # tasks queue up into full bulks while commands are busy
+                self.assertIn(4, command.sizes)
+
+    def test_concurrent_failure(self):
+        """Test that failed commands free their slots"""
+
+        async def fail(*tasks):
+            raise ValueError(tasks)
+
+        async def execute(execution):
+            tasks = [asyncio.ensure_future(execution(i)) for i in range(10)]
+            return await asyncio.wait_for(
+                asyncio.gather(*tasks, return_exceptions=True), timeout=5
+            )
+
+        execution = AsyncBulkCall(fail, size=1, delay=0.001, concurrent=1)
+        for failed in run_async(execute, execution):
+            self.assertIsInstance(failed, ValueError)
+        self.assertEqual(execution._concurrent._value, 1)
+
+    def test_priority_order(self):
+        """Test that tasks of higher priority are executed first"""
+
+        async def execute():
+            execution = AsyncBulkCall(CallCounter(), size=2, delay=256)
+            priorities = (BulkPriority.Low, BulkPriority.Normal, BulkPriority.High)
+            tasks = [
+                asyncio.ensure_future(execution(i, priority=priority))
+                for i, priority in enumerate(priorities * 2)
+            ]
+            return await asyncio.gather(*tasks)
+
+        # High (2, 5) first, then Normal (1, 4), then Low (0, 3)
+        self.assertEqual(
+            run_async(execute), [(0, 2), (1, 1), (2, 0), (3, 2), (4, 1), (5, 0)]
+        )
+
+    def test_priority_delays(self):
+        """Test that high priority tasks flush a bulk early"""
+
+        async def execute():
+            execution = AsyncBulkCall(
+                CallCounter(),
+                size=2**32,
+                delay=256,
+                priority_delays={BulkPriority.High: 0.05},
+            )
+            low = [
+                asyncio.ensure_future(execution(i, priority=BulkPriority.Low))
+                for i in range(5)
+            ]
+            await asyncio.sleep(0.01)
+            before = time.monotonic()
+            high = await execution(5, priority=BulkPriority.High)
+            flushed = time.monotonic() - before
+            # the routine tasks are executed in the same bulk
+            return flushed, high, await asyncio.gather(*low)
+
+        flushed, high, low = run_async(execute)
+        self.assertLess(flushed, 1)
+        self.assertEqual(high, (5, 0))
+        self.assertEqual(low, [(i, 0) for i in range(5)])
+
+    def test_adaptive_low_load(self):
+        """Test that single tasks do not wait the full delay at low load"""
+        execution = AsyncBulkCall(CallCounter(), size=100, delay=256, min_delay=0.01)
+        before = time.monotonic()
+        self.assertEqual(run_async(self.execute, execution, count=1), [(0, 0)])
+        self.assertLess(time.monotonic() - before, 1)
+
+    def test_adaptive_high_load(self):
+        """Test that tasks are collected into bulks at high load"""
+
+        async def slow_command(*tasks):
+            await asyncio.sleep(0.05)
+            return tasks
+
+        async def execute(execution, count):
+            # warm up the controller with a first command execution
+            await execution(-1)
+            return await self.execute(execution, count)
+
+        execution = AsyncBulkCall(slow_command, size=100, delay=256, min_delay=0.01)
+        self.assertEqual(run_async(execute, execution, 150), list(range(150)))
+        self.assertEqual(execution._controller.size, 100)
+        self.assertGreaterEqual(execution._controller.delay, 0.05)
+
+    def test_deduplicate(self):
+        """Test that identical tasks share one slot in the bulk"""
+        command = CallCounter()
+        received = []
+
+        async def recording_command(*tasks):
+            received.append(tasks)
+            return await command(*tasks)
+
+        execution = AsyncBulkCall(
+            recording_command, size=100, delay=0.01, key=lambda task: task // 2
+        )
+        result = run_async(self.execute, execution, count=6)
+        self.assertEqual(received, [(0, 2, 4)])
+        self.assertEqual(result, [(0, 0), (0, 0), (2, 0), (2, 0), (4, 0), (4, 0)])
+
+        received.clear()
+        self.assertEqual(
+            run_async(execution.call_many, (1, 0, 3)), [(1, 1), (1, 1), (3, 1)]
+        )
+        self.assertEqual(received, [(1, 3)])
+
+    def test_deduplicate_failure(self):
+        """Test that identical tasks share the failure of their execution"""
+
+        async def fail(*tasks):
+            raise ValueError(tasks)
+
+        execution = AsyncBulkCall(fail, size=100, delay=256, key=lambda task: task)
+        result = run_async(execution.call_many, (0, 0))
+        self.assertIs(result[0], result[1])
+        self.assertIsInstance(result[0], ValueError)
+
+    def test_item_failure(self):
+        """Test that exceptions provided as results fail only their task"""
+
+        async def fail_odd(*tasks):
+            return [ValueError(task) if task % 2 else task for task in tasks]
+
+        execution = AsyncBulkCall(fail_odd, size=100, delay=256)
+        result = run_async(execution.call_many, range(4))
+        self.assertEqual(result[::2], [0, 2])
+        for failed in result[1::2]:
+            self.assertIsInstance(failed, ValueError)
+
+    def test_bisect(self):
+        """Test that failed bulks are retried in halves to isolate bad tasks"""
+        received = []
+
+        async def fail_bad(*tasks):
+            received.append(tasks)
+            if "bad" in tasks:
+                raise ValueError(tasks)
+            return tasks
+
+        execution = AsyncBulkCall(fail_bad, size=100, delay=256, bisect=(ValueError,))
+        tasks = (0, 1, 2, "bad", 4)
+        result = run_async(execution.call_many, tasks)
+        self.assertEqual(result[:3] + result[4:], [0, 1, 2, 4])
+        self.assertIsInstance(result[3], ValueError)
+        self.assertEqual(
+            received, [tasks, (0, 1), (2, "bad", 4), (2,), ("bad", 4), ("bad",), (4,)]
+        )
+
+        # failures of the command itself are not bisected down to every task
+        async def fail_all(*tasks):
+            received.append(tasks)
+            raise ValueError(tasks)
+
+        received.clear()
+        execution = AsyncBulkCall(fail_all, size=100, delay=256, bisect=(ValueError,))
+        result = run_async(execution.call_many, range(100))
+        self.assertEqual(
+            received, [tuple(range(100)), tuple(range(50)), tuple(range(50, 100))]
+        )
+        for failed in result:
+            self.assertIsInstance(failed, ValueError)
+
+        # other failures still fail the entire bulk
+        received.clear()
+        execution = AsyncBulkCall(fail_bad, size=100, delay=256, bisect=(KeyError,))
+        result = run_async(execution.call_many, tasks)
+        self.assertEqual(received, [tasks])
+        for failed in result:
+            self.assertIsInstance(failed, ValueError)
+
+    def test_statistics(self):
+        """Test that bulk listeners receive the statistics of each bulk"""
+
+        async def fail_odd(*tasks):
+            if any(task % 2 for task in tasks):
+                raise ValueError(tasks)
+            return tasks
+
+        statistics = []
+        add_bulk_listener(statistics.append)
+        self.addCleanup(remove_bulk_listener, statistics.append)
+
+        execution = AsyncBulkCall(fail_odd, size=2, delay=0.01)
+        self.assertEqual(execution.name, "fail_odd")
+        run_async(self.execute, execution, count=1)
+        run_async(execution.call_many, (0, 2, 5))
+        self.assertEqual(
+            [(stats.command, stats.size, type(stats.error)) for stats in statistics],
+            [
+                ("fail_odd", 1, type(None)),
+                ("fail_odd", 2, type(None)),
+                ("fail_odd", 1, ValueError),
+            ],
+        )
+        self.assertEqual([stats.queue_depth for stats in statistics], [0, 0, 0])
+        self.assertGreaterEqual(statistics[0].wait, 0.005)
+        for stats in statistics:
+            self.assertGreaterEqual(stats.latency, 0)
+
+        # commands wrapped by partial are named after the wrapped function
+        execution = AsyncBulkCall(partial(fail_odd), size=1, delay=0.01)
+        self.assertEqual(execution.name, "fail_odd")
+        execution = AsyncBulkCall(CallCounter(), size=1, delay=0.01, name="counter")
+        self.assertEqual(execution.name, "counter")
+
+    def test_statistics_listener_failure(self):
+        """Test that failing bulk listeners do not break execution"""
+        listener = MagicMock(side_effect=RuntimeError)
+        add_bulk_listener(listener)
+        self.addCleanup(remove_bulk_listener, listener)
+
+        execution = AsyncBulkCall(CallCounter(), size=10, delay=0.01)
+        with self.assertLogs(level=logging.WARNING):
+            result = run_async(self.execute, execution, count=3)
+        self.assertEqual(result, [(i, 0) for i in range(3)])
+        listener.assert_called_once()
+
+
+class TestAdaptiveBulkController(TestCase):
+    @patch("tardis.utilities.asyncbulkcall.time")
+    def test_low_load(self, mock_time):
+        controller = AdaptiveBulkController(max_size=100, max_delay=10, min_delay=1)
+        self.assertEqual((controller.size, controller.delay), (1, 1))
+        controller.executed(5)
+        # one task every 10 seconds
+        for now in range(0, 100, 10):
+            mock_time.monotonic.return_value = now
+            controller.arrived()
+        self.assertAlmostEqual(controller.rate, 0.1)
+        self.assertEqual((controller.size, controller.delay), (1, 1))
+
+    @patch("tardis.utilities.asyncbulkcall.time")
+    def test_high_load(self, mock_time):
+        controller = AdaptiveBulkController(max_size=100, max_delay=10, min_delay=1)
+        # ten tasks per second
+        for now in range(100):
+            mock_time.monotonic.return_value = now / 10
+            controller.arrived()
+        # commands not taking long are not worth collecting tasks for long
+        controller.executed(0.1)
+        self.assertEqual((controller.size, controller.delay), (20, 1))
+        # slow commands collect about as many tasks as arrive while executing
+        for _ in range(50):
+            controller.executed(4)
+        self.assertAlmostEqual(controller.delay, 4, places=3)
+        self.assertEqual(controller.size, 80)
+        # bounded by the configured maximum size and delay
+        for _ in range(50):
+            controller.executed(60)
+        self.assertEqual((controller.size, controller.delay), (100, 10))
@@ -1,5 +1,6 @@
 from tardis.exceptions.executorexceptions import CommandExecutionFailure
-from tardis.utilities.asynccachemap import AsyncCacheMap
+from tardis.utilities.asynccachemap import AsyncCacheMap, CacheStatistics
+from tardis.utilities.asynccachemap import add_cache_listener, remove_cache_listener
 
 from tests.utilities.utilities import run_async
 
@@ -7,7 +8,10 @@ from json.decoder import JSONDecodeError
 from datetime import datetime
 from datetime import timedelta
 from unittest import TestCase
+from unittest.mock import MagicMock
 
+import asyncio
+import gc
 import logging
 
 
@@ -100,3 +104,311 @@ class TestAsyncCacheMap(TestCase):
 
         # Test different class
         self.assertFalse(self.async_cache_map == self.test_data)
+
+    def test_change_listener(self):
+        changes, state_changes = [], []
+        self.async_cache_map.add_change_listener(changes.append)
+        self.async_cache_map.add_change_listener(
+            state_changes.append, view=lambda value: str(value)[:1]
+        )
+        # the first update provides data, but does not change any
+        self.update_status()
+        self.assertEqual((changes, state_changes), ([], []))
+
+        self.test_data = {"testA": 124, "testB": "Random String", "testC": 1}
+        self.async_cache_map._last_update -= timedelta(days=1)
+        self.update_status()
+        self.assertEqual(changes, [{"testA", "testC"}])
+        self.assertEqual(state_changes, [{"testC"}])
+
+        # unchanged data does not notify listeners
+        self.async_cache_map._last_update -= timedelta(days=1)
+        self.update_status()
+        self.assertEqual((len(changes), len(state_changes)), (1, 1))
+
+    def test_change_listener_failing(self):
+        def listener(changed):
+            raise RuntimeError(changed)
+
+        self.async_cache_map.add_change_listener(listener)
+        self.update_status()
+        self.test_data = {"testA": 124}
+        self.async_cache_map._last_update -= timedelta(days=1)
+        with self.assertLogs(level=logging.WARNING):
+            self.update_status()
+        self.assertEqual(len(self.async_cache_map), len(self.test_data))
+
+    def test_stale_while_revalidate(self):
+        async def test():
+            updates, release = [], asyncio.Event()
+
+            async def slow_update_function():
+                updates.append(len(updates))
+                if len(updates) > 1:
+                    await release.wait()
+                return {"update": len(updates)}
+
+            cache_map = AsyncCacheMap(
+                update_coroutine=slow_update_function,
+                max_age=60,
+                stale_while_revalidate=True,
+            )
+            # the first update is waited for since there is no data yet
+            await cache_map.update_status()
+            self.assertEqual(dict(cache_map), {"update": 1})
+
+            # expired data is provided while a single update runs in the background
+            cache_map._last_update = datetime.now() - timedelta(seconds=61)
+            for _ in range(3):
+                await asyncio.wait_for(cache_map.update_status(), timeout=1)
+                await asyncio.sleep(0)
+                self.assertEqual(dict(cache_map), {"update": 1})
+            self.assertEqual(updates, [0, 1])
+
+            release.set()
+            await cache_map._revalidate_task
+            self.assertEqual(dict(cache_map), {"update": 2})
+            self.assertIsNone(cache_map._revalidate_task)
+            self.assertTrue(
+                datetime.now() - cache_map.last_update < timedelta(seconds=1)
+            )
+
+        run_async(test)
+
+    def test_stale_while_revalidate_failing(self):
+        async def test():
+            cache_map = AsyncCacheMap(
+                update_coroutine=self.update_function, stale_while_revalidate=True
+            )
+            await cache_map.update_status()
+
+            cache_map._update_coroutine = self.command_failing_update_function
+            cache_map._last_update = datetime.fromtimestamp(1)
+            with self.assertLogs(level=logging.WARNING):
+                await cache_map.update_status()
+                await cache_map._revalidate_task
+            # expired data is kept if the update fails
+            self.assertEqual(dict(cache_map), self.test_data)
+
+            async def broken_update_function():
+                raise RuntimeError("broken")
+
+            cache_map._update_coroutine = broken_update_function
+            # skip the backoff after the failed update
+            cache_map._retry_after = datetime.fromtimestamp(0)
+            with self.assertLogs(level=logging.WARNING):
+                await cache_map.update_status()
+                await cache_map._revalidate_task
+            self.assertEqual(dict(cache_map), self.test_data)
+            self.assertIsNone(cache_map._revalidate_task)
+
+        run_async(test)
+
+    def test_refresh_ahead(self):
+        async def test():
+            updates = []
+
+            async def counting_update_function():
+                updates.append(len(updates))
+                return {"update": len(updates)}
+
+            cache_map = AsyncCacheMap(
+                update_coroutine=counting_update_function,
+                max_age=0.1,
+                refresh_ahead=0.5,
+            )
+            await cache_map.update_status()
+            self.assertEqual(updates, [0])
+            # data is refreshed in the background before it expires
+            await asyncio.sleep(0.35)
+            self.assertGreaterEqual(len(updates), 4)
+            self.assertEqual(dict(cache_map), {"update": len(updates)})
+            self.assertLess(cache_map.age, 0.1)
+            # no additional refresher is started
+            await cache_map.update_status()
+            refresh_task = cache_map._refresh_task
+            await cache_map.update_status()
+            self.assertIs(cache_map._refresh_task, refresh_task)
+            cache_map.close()
+
+        run_async(test)
+
+    def test_refresh_ahead_failing(self):
+        async def test():
+            cache_map = AsyncCacheMap(
+                update_coroutine=self.update_function, max_age=0.1, refresh_ahead=0.5
+            )
+            await cache_map.update_status()
+            updates = []
+
+            async def broken_update_function():
+                updates.append(len(updates))
+                raise RuntimeError("broken")
+
+            cache_map._update_coroutine = broken_update_function
+            with self.assertLogs(level=logging.WARNING):
+                await asyncio.sleep(0.35)
+            # failed refreshes are retried on schedule and keep the data
+            self.assertIn(len(updates), range(3, 9))
+            self.assertEqual(dict(cache_map), self.test_data)
+            self.assertGreater(cache_map.age, 0.3)
+            cache_map.close()
+
+        run_async(test)
+
+    def test_close(self):
+        async def test():
+            updates = []
+
+            async def counting_update_function():
+                updates.append(len(updates))
+                return {"update": len(updates)}
+
+            cache_map = AsyncCacheMap(
+                update_coroutine=counting_update_function,
+                max_age=0.1,
+                refresh_ahead=0.5,
+            )
+            await cache_map.update_status()
+            refresh_task = cache_map._refresh_task
+            cache_map.close()
+            await asyncio.sleep(0.2)
+            self.assertTrue(refresh_task.cancelled())
+            self.assertEqual(updates, [0])
+            # closed caches are still updated on demand, but not in the background
+            await cache_map.update_status()
+            self.assertEqual(updates, [0, 1])
+            self.assertIsNone(cache_map._refresh_task)
+
+        run_async(test)
+
+    def test_refresh_ahead_dropped(self):
+        """Test that the refresher stops once the cache is no longer used"""
+
+        async def test():
+            cache_map = AsyncCacheMap(
+                update_coroutine=self.update_function, max_age=0.1, refresh_ahead=0.5
+            )
+            await cache_map.update_status()
+            refresh_task = cache_map._refresh_task
+            del cache_map
+            gc.collect()
+            await asyncio.wait_for(refresh_task, timeout=1)
+
+        run_async(test)
+
+    def test_refresh_ahead_sanity_checks(self):
+        for wrong_refresh_ahead in (0, 1, -0.5, 2):
+            with self.subTest(refresh_ahead=wrong_refresh_ahead):
+                with self.assertRaises(ValueError):
+                    AsyncCacheMap(
+                        update_coroutine=self.update_function,
+                        refresh_ahead=wrong_refresh_ahead,
+                    )
+
+    def test_backoff(self):
+        updates = []
+
+        async def failing_update_function():
+            updates.append(len(updates))
+            return await self.command_failing_update_function()
+
+        cache_map = AsyncCacheMap(
+            update_coroutine=failing_update_function, max_age=60, min_backoff=10
+        )
+        with self.assertLogs(level=logging.WARNING):
+            run_async(cache_map.update_status)
+        self.assertEqual(cache_map.consecutive_failures, 1)
+        # callers do not retry the update while backing off
+        for _ in range(3):
+            run_async(cache_map.update_status)
+        self.assertEqual(updates, [0])
+
+        # backoff doubles with every consecutive failure, up to max_age
+        for failures, backoff in ((2, 20), (3, 40), (4, 60), (5, 60)):
+            cache_map._retry_after = datetime.now()
+            with self.assertLogs(level=logging.WARNING):
+                run_async(cache_map.update_status)
+            self.assertEqual(cache_map.consecutive_failures, failures)
+            self.assertAlmostEqual(
+                (cache_map._retry_after - datetime.now()).total_seconds(),
+                backoff,
+                delta=1,
+            )
+
+        # a successful update resets the backoff
+        cache_map._update_coroutine = self.update_function
+        cache_map._retry_after = datetime.now()
+        run_async(cache_map.update_status)
+        self.assertEqual(cache_map.consecutive_failures, 0)
+        self.assertEqual(dict(cache_map), self.test_data)
+
+    def test_max_staleness(self):
+        cache_map = AsyncCacheMap(
+            update_coroutine=self.update_function, max_age=60, max_staleness=120
+        )
+        self.assertFalse(cache_map.valid)
+        run_async(cache_map.update_status)
+        self.assertTrue(cache_map.valid)
+
+        cache_map._update_coroutine = self.command_failing_update_function
+        cache_map._last_update = datetime.now() - timedelta(seconds=90)
+        with self.assertLogs(level=logging.WARNING):
+            run_async(cache_map.update_status)
+        self.assertTrue(cache_map.valid)
+
+        # outdated data is kept, but flagged as invalid
+        cache_map._last_update = datetime.now() - timedelta(seconds=150)
+        cache_map._retry_after = datetime.now()
+        with self.assertLogs(level=logging.ERROR):
+            run_async(cache_map.update_status)
+        self.assertFalse(cache_map.valid)
+        self.assertEqual(dict(cache_map), self.test_data)
+
+    def test_statistics(self):
+        """Test that cache listeners receive the statistics of each update"""
+        statistics = []
+        add_cache_listener(statistics.append)
+        self.addCleanup(remove_cache_listener, statistics.append)
+        cache_map = AsyncCacheMap(
+            update_coroutine=self.update_function, max_age=60, max_staleness=120
+        )
+        self.assertEqual(cache_map.name, "update_function")
+        run_async(cache_map.update_status)
+        self.assertEqual(
+            statistics,
+            [CacheStatistics("update_function", True, 0, cache_map.last_update)],
+        )
+
+        # failed updates are reported with the data kept from before
+        statistics.clear()
+        cache_map = AsyncCacheMap(
+            update_coroutine=self.command_failing_update_function, name="test"
+        )
+        with self.assertLogs(level=logging.WARNING):
+            run_async(cache_map.update_status)
+        self.assertEqual(
+            statistics, [CacheStatistics("test", True, 1, datetime.fromtimestamp(0))]
+        )
+
+    def test_statistics_listener_failure(self):
+        """Test that failing cache listeners do not break updates"""
+        listener = MagicMock(side_effect=RuntimeError)
+        add_cache_listener(listener)
+        self.addCleanup(remove_cache_listener, listener)
+        with self.assertLogs(level=logging.WARNING):
+            self.update_status()
+        listener.assert_called_once()
+        self.assertEqual(dict(self.async_cache_map), self.test_data)
+
+    def test_backoff_sanity_checks(self):
+        for wrong_settings in (
+            dict(min_backoff=0),
+            dict(min_backoff=-1),
+            dict(max_age=60, max_staleness=30),
+        ):
+            with self.subTest(**wrong_settings):
+                with self.assertRaises(ValueError):
+                    AsyncCacheMap(
+                        update_coroutine=self.update_function, **wrong_settings
+                    )
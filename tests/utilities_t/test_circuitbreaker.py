@@ -0,0 +1,143 @@
+from tardis.exceptions.executorexceptions import CommandExecutionFailure
+from tardis.exceptions.tardisexceptions import TardisDroneCrashed
+from tardis.exceptions.tardisexceptions import TardisResourceStatusUpdateFailed
+from tardis.exceptions.tardisexceptions import TardisSiteUnavailable
+from tardis.exceptions.tardisexceptions import TardisTimeout
+from tardis.utilities.circuitbreaker import CircuitBreaker, CircuitState
+
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+import asyncio
+import logging
+
+
+class TestCircuitBreaker(TestCase):
+    def setUp(self):
+        self.circuit_breaker = CircuitBreaker(
+            name="TestSite", failure_threshold=2, cool_down=10
+        )
+        self.changes = []
+        self.circuit_breaker.add_state_listener(
+            lambda name, state: self.changes.append((name, state))
+        )
+
+    def call(self, exception=None):
+        with self.circuit_breaker.guard():
+            if exception is not None:
+                raise exception
+
+    def trip(self):
+        with self.assertLogs(level=logging.WARNING):
+            for exception in (TardisTimeout(), CommandExecutionFailure("test")):
+                with self.assertRaises(type(exception)):
+                    self.call(exception)
+
+    def test_verify_settings(self):
+        for settings in (
+            dict(failure_threshold=0),
+            dict(failure_threshold=1.5),
+            dict(failure_threshold=1, cool_down=0),
+        ):
+            with self.subTest(**settings):
+                with self.assertRaises(ValueError):
+                    CircuitBreaker(name="TestSite", **settings)
+
+    def test_trip(self):
+        self.call()
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Closed)
+        self.trip()
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Open)
+        self.assertEqual(self.changes, [("TestSite", CircuitState.Open)])
+
+        # calls are short-circuited while open
+        with self.assertRaises(TardisSiteUnavailable):
+            self.call()
+
+    def test_consecutive_failures(self):
+        """Test that only consecutive failures trip the circuit breaker"""
+        for exception in (TardisTimeout, TardisDroneCrashed, TardisTimeout):
+            with self.assertRaises(exception):
+                self.call(exception)
+        self.call()
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Closed)
+        self.assertEqual(self.changes, [])
+
+    def test_site_failures(self):
+        """Test that only failures of the entire site trip the circuit breaker"""
+        # a single resource failing, e.g. a job that has already vanished
+        for _ in range(3):
+            with self.assertRaises(TardisResourceStatusUpdateFailed):
+                self.call(TardisResourceStatusUpdateFailed())
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Closed)
+
+        # a failed command translated by the site adapter
+        with self.assertLogs(level=logging.WARNING):
+            for _ in range(2):
+                with self.assertRaises(TardisResourceStatusUpdateFailed):
+                    with self.circuit_breaker.guard():
+                        try:
+                            raise CommandExecutionFailure("test")
+                        except CommandExecutionFailure as cef:
+                            raise TardisResourceStatusUpdateFailed from cef
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Open)
+
+    def test_state_listener_failure(self):
+        """Test that failing state listeners do not break the guarded calls"""
+        self.circuit_breaker.add_state_listener(MagicMock(side_effect=RuntimeError))
+        with self.assertLogs(level=logging.WARNING):
+            for _ in range(2):
+                with self.assertRaises(TardisTimeout):
+                    self.call(TardisTimeout)
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Open)
+        self.assertEqual(self.changes, [("TestSite", CircuitState.Open)])
+
+    @patch("tardis.utilities.circuitbreaker.time")
+    def test_probe(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        self.trip()
+
+        mock_time.monotonic.return_value = 10
+        with self.circuit_breaker.guard():
+            # only a single call is let through as probe
+            self.assertEqual(self.circuit_breaker.state, CircuitState.HalfOpen)
+            with self.assertRaises(TardisSiteUnavailable):
+                self.call()
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Closed)
+        self.assertEqual(
+            self.changes,
+            [
+                ("TestSite", CircuitState.Open),
+                ("TestSite", CircuitState.HalfOpen),
+                ("TestSite", CircuitState.Closed),
+            ],
+        )
+
+    @patch("tardis.utilities.circuitbreaker.time")
+    def test_probe_failed(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        self.trip()
+
+        mock_time.monotonic.return_value = 10
+        with self.assertLogs(level=logging.WARNING):
+            with self.assertRaises(TardisTimeout):
+                self.call(TardisTimeout)
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Open)
+
+        # the cool down starts over after a failed probe
+        mock_time.monotonic.return_value = 15
+        with self.assertRaises(TardisSiteUnavailable):
+            self.call()
+
+    @patch("tardis.utilities.circuitbreaker.time")
+    def test_probe_cancelled(self, mock_time):
+        mock_time.monotonic.return_value = 0
+        self.trip()
+
+        mock_time.monotonic.return_value = 10
+        with self.assertRaises(asyncio.CancelledError):
+            self.call(asyncio.CancelledError)
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Open)
+        # the next call probes instead
+        self.call()
+        self.assertEqual(self.circuit_breaker.state, CircuitState.Closed)
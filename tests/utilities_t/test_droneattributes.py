@@ -0,0 +1,102 @@
+from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.droneattributes import DroneAttributes
+from unittest import TestCase
+
+import copy
+import pickle
+
+
+class TestDroneAttributes(TestCase):
+    def setUp(self):
+        self.test_attributes = DroneAttributes(drone_uuid="test-0123456789", test=1)
+
+    def test_index_access(self):
+        self.assertEqual(self.test_attributes["drone_uuid"], "test-0123456789")
+        self.assertEqual(self.test_attributes["test"], 1)
+        for missing in ("updated", "another_test"):
+            with self.subTest(key=missing):
+                with self.assertRaises(KeyError):
+                    self.test_attributes[missing]
+
+    def test_access_via_attribute(self):
+        self.assertEqual(self.test_attributes.drone_uuid, "test-0123456789")
+        self.assertEqual(self.test_attributes.test, 1)
+        for missing in ("updated", "another_test"):
+            with self.subTest(key=missing):
+                with self.assertRaises(AttributeError):
+                    getattr(self.test_attributes, missing)
+
+    def test_set_via_index(self):
+        self.test_attributes["drone_uuid"] = "test-abcdef0123"
+        self.assertEqual(self.test_attributes["drone_uuid"], "test-abcdef0123")
+        self.test_attributes["another_test"] = 4
+        self.assertEqual(self.test_attributes["another_test"], 4)
+
+    def test_set_via_attribute(self):
+        self.test_attributes.drone_uuid = "test-abcdef0123"
+        self.assertEqual(self.test_attributes.drone_uuid, "test-abcdef0123")
+        self.test_attributes.another_test = 4
+        self.assertEqual(self.test_attributes.another_test, 4)
+
+    def test_del_via_index(self):
+        for key in ("drone_uuid", "test"):
+            with self.subTest(key=key):
+                del self.test_attributes[key]
+                with self.assertRaises(KeyError):
+                    self.test_attributes[key]
+                with self.assertRaises(KeyError):
+                    del self.test_attributes[key]
+
+    def test_del_via_attribute(self):
+        for key in ("drone_uuid", "test"):
+            with self.subTest(key=key):
+                delattr(self.test_attributes, key)
+                with self.assertRaises(AttributeError):
+                    getattr(self.test_attributes, key)
+                with self.assertRaises(AttributeError):
+                    delattr(self.test_attributes, key)
+
+    def test_mapping(self):
+        self.assertEqual(len(self.test_attributes), 2)
+        self.assertIn("drone_uuid", self.test_attributes)
+        self.assertNotIn("updated", self.test_attributes)
+        self.assertNotIn([], self.test_attributes)
+        self.assertEqual(
+            self.test_attributes, {"drone_uuid": "test-0123456789", "test": 1}
+        )
+        self.assertEqual(
+            AttributeDict(self.test_attributes),
+            AttributeDict(drone_uuid="test-0123456789", test=1),
+        )
+        self.test_attributes.update(updated=None, another_test=2)
+        self.assertEqual(
+            list(self.test_attributes),
+            ["updated", "drone_uuid", "test", "another_test"],
+        )
+        self.assertEqual(
+            repr(self.test_attributes),
+            repr(
+                dict(
+                    updated=None,
+                    drone_uuid="test-0123456789",
+                    test=1,
+                    another_test=2,
+                )
+            ),
+        )
+
+    def test_copy(self):
+        for duplicate in (
+            self.test_attributes.copy(),
+            copy.copy(self.test_attributes),
+            pickle.loads(pickle.dumps(self.test_attributes)),
+        ):
+            with self.subTest(duplicate=duplicate):
+                self.assertIsInstance(duplicate, DroneAttributes)
+                self.assertEqual(duplicate, self.test_attributes)
+                duplicate.test = 2
+                self.assertEqual(self.test_attributes.test, 1)
+
+    def test_compact(self):
+        with self.assertRaises(AttributeError):
+            self.test_attributes.__dict__
@@ -0,0 +1,160 @@
+from tardis.utilities.heartbeatscheduler import HeartbeatScheduler
+
+from tests.utilities.utilities import run_async
+
+from unittest import TestCase
+
+import asyncio
+import logging
+import time
+
+
+class TestHeartbeatScheduler(TestCase):
+    def test_sleep(self):
+        """Test that heartbeats are due after their interval"""
+        heartbeat_scheduler = HeartbeatScheduler()
+        before = time.monotonic()
+        run_async(heartbeat_scheduler.sleep, 0.1)
+        self.assertGreaterEqual(time.monotonic() - before, 0.09)
+        self.assertEqual(heartbeat_scheduler.pending, 0)
+
+    def test_sleep_order(self):
+        """Test that heartbeats of many drones are released in due order"""
+        heartbeat_scheduler = HeartbeatScheduler()
+        woken = []
+
+        async def heartbeat(index, interval):
+            await heartbeat_scheduler.sleep(interval)
+            woken.append(index)
+
+        async def heartbeats():
+            intervals = [0.05, 0.01, 0.03, 0.0, 0.02, 0.04]
+            await asyncio.gather(
+                *(
+                    heartbeat(index, interval)
+                    for index, interval in enumerate(intervals)
+                )
+            )
+
+        run_async(heartbeats)
+        self.assertEqual(woken, [3, 1, 4, 2, 5, 0])
+        self.assertIsNone(heartbeat_scheduler._timer)
+
+    def test_sleep_cancelled(self):
+        """Test that cancelled heartbeats do not stall the scheduler"""
+        heartbeat_scheduler = HeartbeatScheduler()
+
+        async def heartbeats():
+            cancelled = asyncio.ensure_future(heartbeat_scheduler.sleep(0.01))
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            await heartbeat_scheduler.sleep(0.02)
+            return cancelled.cancelled()
+
+        self.assertTrue(run_async(heartbeats))
+
+    def test_wake(self):
+        """Test that heartbeats can be woken up ahead of time"""
+        heartbeat_scheduler = HeartbeatScheduler()
+
+        async def heartbeats():
+            sleepers = [
+                asyncio.ensure_future(heartbeat_scheduler.sleep(1024, key=key))
+                for key in range(4)
+            ]
+            await asyncio.sleep(0)
+            woken = heartbeat_scheduler.wake(lambda key: key % 2)
+            await asyncio.sleep(0)
+            done = [sleeper.done() for sleeper in sleepers]
+            # waking again does not count already released heartbeats
+            self.assertEqual(heartbeat_scheduler.wake(lambda key: key % 2), 0)
+            for sleeper in sleepers:
+                sleeper.cancel()
+            heartbeat_scheduler._timer.cancel()
+            return woken, done
+
+        self.assertEqual(run_async(heartbeats), (2, [False, True, False, True]))
+
+    def test_jitter(self):
+        """Test that heartbeats are spread by the jitter"""
+        heartbeat_scheduler = HeartbeatScheduler(jitter=1.0)
+
+        async def heartbeats():
+            for _ in range(64):
+                asyncio.ensure_future(heartbeat_scheduler.sleep(1024))
+            await asyncio.sleep(0)
+            now = asyncio.get_running_loop().time()
+            return [due - now for due, *_ in heartbeat_scheduler._heartbeats]
+
+        intervals = run_async(heartbeats)
+        self.assertTrue(all(0 <= interval <= 1024 for interval in intervals))
+        self.assertGreater(len(set(intervals)), 1)
+        for *_, heartbeat in heartbeat_scheduler._heartbeats:
+            heartbeat.cancel()
+        heartbeat_scheduler._timer.cancel()
+
+    def test_tick(self):
+        """Test that heartbeats are aligned to ticks and prepared as cohort"""
+        cohorts = []
+
+        async def prepare(keys):
+            cohorts.append(sorted(keys))
+
+        heartbeat_scheduler = HeartbeatScheduler(tick=0.05, prepare=prepare)
+
+        async def heartbeats():
+            await asyncio.gather(
+                *(heartbeat_scheduler.sleep(0, key=key) for key in range(3))
+            )
+
+        run_async(heartbeats)
+        self.assertEqual(cohorts, [[0, 1, 2]])
+        ticks = heartbeat_scheduler._timer_due / 0.05
+        self.assertAlmostEqual(ticks, round(ticks))
+
+    def test_prepare_failure(self):
+        """Test that heartbeats are released even if preparing them fails"""
+
+        async def prepare(keys):
+            raise RuntimeError("prepare failed")
+
+        heartbeat_scheduler = HeartbeatScheduler(prepare=prepare)
+        with self.assertLogs(level=logging.WARNING):
+            run_async(heartbeat_scheduler.sleep, 0.01, key="test")
+        self.assertEqual(heartbeat_scheduler.pending, 0)
+
+    def test_update(self):
+        """Test that concurrent state updates are limited"""
+        heartbeat_scheduler = HeartbeatScheduler(concurrent=2)
+        active, max_active = 0, 0
+
+        async def state_update(result):
+            nonlocal active, max_active
+            active += 1
+            max_active = max(active, max_active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return result
+
+        async def updates():
+            return await asyncio.gather(
+                *(heartbeat_scheduler.update(state_update, index) for index in range(8))
+            )
+
+        self.assertEqual(run_async(updates), list(range(8)))
+        self.assertEqual(max_active, 2)
+
+    def test_sanity_checks(self):
+        """Test against illegal settings"""
+        for wrong_jitter in (-0.1, 1.5):
+            with self.subTest(jitter=wrong_jitter):
+                with self.assertRaises(ValueError):
+                    HeartbeatScheduler(jitter=wrong_jitter)
+        for wrong_tick in (0, -1.0):
+            with self.subTest(tick=wrong_tick):
+                with self.assertRaises(ValueError):
+                    HeartbeatScheduler(tick=wrong_tick)
+        for wrong_concurrency in (0, 2.3, -5, "10"):
+            with self.subTest(concurrent=wrong_concurrency):
+                with self.assertRaises(ValueError):
+                    HeartbeatScheduler(concurrent=wrong_concurrency)
@@ -0,0 +1,177 @@
+from tardis.interfaces.plugin import Plugin
+from tardis.utilities.asyncbulkcall import BulkStatistics
+from tardis.utilities.asynccachemap import CacheStatistics
+from tardis.utilities.attributedict import AttributeDict
+from tardis.utilities.circuitbreaker import CircuitState
+from tardis.utilities.plugineventqueue import PluginEvent, PluginEventQueue
+
+from tests.utilities.utilities import run_async
+
+from datetime import datetime
+from unittest import TestCase
+
+import asyncio
+import logging
+
+
+class RecordingPlugin(Plugin):
+    notify_timeout = None
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.circuit_states = []
+        self.bulk_statistics = []
+        self.cache_statistics = []
+        self.spawn_states = []
+
+    async def notify(self, state, resource_attributes):
+        raise AssertionError("events must be delivered in batches")
+
+    async def notify_many(self, events):
+        await asyncio.sleep(self.delay)
+        self.batches.append(
+            [
+                (state, resource_attributes.drone_uuid)
+                for state, resource_attributes in events
+            ]
+        )
+
+    def notify_circuit_state(self, site_name, state):
+        self.circuit_states.append((site_name, state))
+
+    def notify_bulk_execution(self, statistics):
+        self.bulk_statistics.append(statistics)
+
+    def notify_cache_update(self, statistics):
+        self.cache_statistics.append(statistics)
+
+    def notify_spawn_state(self, name, queue_depth, rate):
+        self.spawn_states.append((name, queue_depth, rate))
+
+
+class TestPluginEventQueue(TestCase):
+    @staticmethod
+    async def notify_all(event_queue, events, settle=0.05):
+        for state, drone_uuid in events:
+            await event_queue.notify(state, AttributeDict(drone_uuid=drone_uuid))
+        await asyncio.sleep(settle)
+
+    def test_batch_size(self):
+        """Test that full batches are delivered without waiting"""
+        plugin = RecordingPlugin()
+        event_queue = PluginEventQueue(plugin, batch_size=2, flush_interval=256)
+        events = [(f"state-{index}", "test") for index in range(4)]
+        run_async(self.notify_all, event_queue, events)
+        self.assertEqual(plugin.batches, [events[:2], events[2:]])
+        self.assertIsNone(event_queue._flush_task)
+
+    def test_flush_interval(self):
+        """Test that incomplete batches are delivered after the flush interval"""
+        plugin = RecordingPlugin()
+        event_queue = PluginEventQueue(plugin, batch_size=100, flush_interval=0.01)
+        events = [(f"state-{index}", "test") for index in range(3)]
+        run_async(self.notify_all, event_queue, events)
+        self.assertEqual(plugin.batches, [events])
+
+    def test_snapshot(self):
+        """Test that events hold a copy of the resource attributes"""
+        plugin = RecordingPlugin()
+        event_queue = PluginEventQueue(plugin, flush_interval=256)
+        resource_attributes = AttributeDict(drone_uuid="test")
+        run_async(event_queue.notify, "state", resource_attributes)
+        resource_attributes.drone_uuid = "changed"
+        self.assertEqual(
+            list(event_queue._events), [PluginEvent("state", {"drone_uuid": "test"})]
+        )
+        event_queue._flush_task.cancel()
+
+    def test_overflow_drop(self):
+        """Test that events exceeding the queue size are dropped and counted"""
+        plugin = RecordingPlugin(delay=0.01)
+        event_queue = PluginEventQueue(
+            plugin, batch_size=1, flush_interval=256, max_size=2
+        )
+        events = [(f"state-{index}", "test") for index in range(5)]
+        run_async(self.notify_all, event_queue, events)
+        self.assertEqual(plugin.batches, [[events[0]], [events[1]]])
+        self.assertEqual(event_queue.dropped, 3)
+
+    def test_overflow_coalesce(self):
+        """Test that events exceeding the queue size replace events of the drone"""
+        plugin = RecordingPlugin(delay=0.01)
+        event_queue = PluginEventQueue(
+            plugin, batch_size=2, flush_interval=256, max_size=2, overflow="coalesce"
+        )
+        events = [
+            ("booting", "drone-a"),
+            ("booting", "drone-b"),
+            ("available", "drone-a"),
+            ("booting", "drone-c"),
+        ]
+        run_async(self.notify_all, event_queue, events)
+        self.assertEqual(plugin.batches, [[events[2], events[1]]])
+        self.assertEqual(event_queue.dropped, 1)
+
+    def test_delivery_failure(self):
+        """Test that failed deliveries do not stall the queue"""
+
+        class FailingPlugin(RecordingPlugin):
+            notify_timeout = 0.01
+
+            async def notify_many(self, events):
+                if not self.batches:
+                    self.batches.append(None)
+                    raise RuntimeError("delivery failed")
+                await super().notify_many(events)
+
+        plugin = FailingPlugin()
+        event_queue = PluginEventQueue(plugin, batch_size=1, flush_interval=256)
+        events = [(f"state-{index}", "test") for index in range(2)]
+        with self.assertLogs(level=logging.WARNING):
+            run_async(self.notify_all, event_queue, events)
+        self.assertEqual(plugin.batches, [None, [events[1]]])
+
+        plugin.delay = 1
+        with self.assertLogs(level=logging.WARNING):
+            run_async(self.notify_all, event_queue, events[:1])
+
+    def test_notify_circuit_state(self):
+        plugin = RecordingPlugin()
+        event_queue = PluginEventQueue(plugin)
+        event_queue.notify_circuit_state("TestSite", CircuitState.Open)
+        self.assertEqual(plugin.circuit_states, [("TestSite", CircuitState.Open)])
+
+    def test_notify_bulk_execution(self):
+        plugin = RecordingPlugin()
+        event_queue = PluginEventQueue(plugin)
+        statistics = BulkStatistics("condor_q", 10, 0, 0.5, 1.0, None)
+        event_queue.notify_bulk_execution(statistics)
+        self.assertEqual(plugin.bulk_statistics, [statistics])
+
+    def test_notify_cache_update(self):
+        plugin = RecordingPlugin()
+        event_queue = PluginEventQueue(plugin)
+        statistics = CacheStatistics("condor_status", True, 0, datetime.now())
+        event_queue.notify_cache_update(statistics)
+        self.assertEqual(plugin.cache_statistics, [statistics])
+
+    def test_notify_spawn_state(self):
+        plugin = RecordingPlugin()
+        event_queue = PluginEventQueue(plugin)
+        event_queue.notify_spawn_state("testsite_test", 3, 0.5)
+        self.assertEqual(plugin.spawn_states, [("testsite_test", 3, 0.5)])
+
+    def test_sanity_checks(self):
+        """Test against illegal settings"""
+        plugin = RecordingPlugin()
+        for wrong_settings in (
+            dict(batch_size=0),
+            dict(batch_size=1.5),
+            dict(flush_interval=0),
+            dict(max_size=10, batch_size=20),
+            dict(overflow="ignore"),
+        ):
+            with self.subTest(**wrong_settings):
+                with self.assertRaises(ValueError):
+                    PluginEventQueue(plugin, **wrong_settings)
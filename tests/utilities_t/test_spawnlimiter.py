@@ -0,0 +1,111 @@
+from tardis.utilities.spawnlimiter import SpawnLimiter
+
+from tests.utilities.utilities import run_async
+
+from unittest import TestCase
+from unittest.mock import MagicMock, call
+
+import asyncio
+import logging
+import time
+
+
+class TestSpawnLimiter(TestCase):
+    def test_verify_settings(self):
+        for settings in (
+            dict(rate=0),
+            dict(rate=1, burst=0),
+            dict(rate=1, burst=1.5),
+            dict(rate=1, min_rate=2),
+        ):
+            with self.subTest(**settings):
+                with self.assertRaises(ValueError):
+                    SpawnLimiter(**settings)
+
+    def test_acquire(self):
+        """Test that deployments are limited to the rate after a burst"""
+        spawn_limiter = SpawnLimiter(rate=100, burst=5)
+        queue_depths = []
+
+        async def acquire():
+            await spawn_limiter.acquire()
+            queue_depths.append(spawn_limiter.queue_depth)
+
+        async def deploy():
+            await asyncio.gather(*(acquire() for _ in range(10)))
+
+        before = time.monotonic()
+        run_async(deploy)
+        # 5 deployments as burst, 5 more at 100 per second
+        self.assertGreaterEqual(time.monotonic() - before, 0.04)
+        # drones beyond the burst queue up
+        self.assertEqual(queue_depths, [0, 0, 0, 0, 0, 4, 3, 2, 1, 0])
+        self.assertEqual(spawn_limiter.queue_depth, 0)
+
+    def test_release(self):
+        spawn_limiter = SpawnLimiter(rate=0.001, burst=1)
+        run_async(spawn_limiter.acquire)
+        spawn_limiter.release()
+        run_async(asyncio.wait_for, spawn_limiter.acquire(), 0.1)
+
+    def test_throttle_recover(self):
+        spawn_limiter = SpawnLimiter(rate=1, min_rate=0.2)
+        with self.assertLogs(level=logging.WARNING):
+            spawn_limiter.throttle()
+        self.assertEqual(spawn_limiter.rate, 0.5)
+        # tokens accumulated before are dropped when slowing down
+        self.assertEqual(spawn_limiter._tokens, 0.0)
+
+        with self.assertLogs(level=logging.WARNING):
+            for _ in range(3):
+                spawn_limiter.throttle()
+        self.assertEqual(spawn_limiter.rate, 0.2)
+
+        spawn_limiter.recover()
+        self.assertAlmostEqual(spawn_limiter.rate, 0.3)
+        for _ in range(10):
+            spawn_limiter.recover()
+        self.assertEqual(spawn_limiter.rate, 1)
+
+    def test_throttle_once(self):
+        """Test that deployments failing together slow down only once"""
+        spawn_limiter = SpawnLimiter(rate=1)
+        started = time.monotonic()
+        with self.assertLogs(level=logging.WARNING):
+            for _ in range(3):
+                spawn_limiter.throttle(started=started)
+        self.assertEqual(spawn_limiter.rate, 0.5)
+
+        # deployments started after the slow down may slow down further
+        with self.assertLogs(level=logging.WARNING):
+            spawn_limiter.throttle(started=time.monotonic())
+        self.assertEqual(spawn_limiter.rate, 0.25)
+
+    def test_state_listener(self):
+        spawn_limiter = SpawnLimiter(rate=1, name="test")
+        listener = MagicMock()
+        spawn_limiter.add_state_listener(listener)
+
+        run_async(spawn_limiter.acquire)
+        self.assertEqual(
+            listener.call_args_list, [call("test", 1, 1), call("test", 0, 1)]
+        )
+
+        listener.reset_mock()
+        with self.assertLogs(level=logging.WARNING):
+            spawn_limiter.throttle()
+        listener.assert_called_once_with("test", 0, 0.5)
+        listener.reset_mock()
+        spawn_limiter.recover()
+        listener.assert_called_once_with("test", 0, 0.6)
+
+    def test_state_listener_failure(self):
+        """Test that failing state listeners do not break deployments"""
+        spawn_limiter = SpawnLimiter(rate=1)
+        spawn_limiter.add_state_listener(MagicMock(side_effect=RuntimeError))
+        with self.assertLogs(level=logging.WARNING):
+            run_async(spawn_limiter.acquire)
+        self.assertEqual(spawn_limiter.queue_depth, 0)
+        with self.assertLogs(level=logging.WARNING):
+            spawn_limiter.throttle()
+        self.assertEqual(spawn_limiter.rate, 0.5)